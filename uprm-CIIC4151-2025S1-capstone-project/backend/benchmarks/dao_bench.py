@@ -0,0 +1,306 @@
+"""
+DAO micro-benchmarks with query plan capture.
+
+Calls the read methods of ReportsDAO, LocationsDAO, AdministratorsDAO,
+DepartmentsDAO and PinnedReportsDAO directly against a seeded database (see benchmarks.seed),
+records their latency distribution, and captures
+EXPLAIN (ANALYZE, BUFFERS) for every statement they run. Sequential scans
+on large tables are flagged, so a query that stops using its indexes shows
+up here before it shows up in production:
+
+    python -m benchmarks.dao_bench --iterations 30 --plans plans/ --output dao.json
+
+--fail-on-seqscan exits with status 1 when any flagged scan is found;
+--only ReportsDAO.get_department_stats,... restricts the run.
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+import psycopg2
+import psycopg2.extensions
+from flask import Flask
+
+from benchmarks.load_test import _ms, percentile
+from benchmarks.seed import SEARCH_TERMS
+from counts import report_counts
+from dao.d_administrators import AdministratorsDAO
+from dao.d_departments import DepartmentsDAO
+from dao.d_locations import LocationsDAO
+from dao.d_pinned_reports import PinnedReportsDAO
+from dao.d_reports import ReportsDAO
+from load import init_app, load_db
+from report_grid import report_grid
+
+# Tables with at least this many (estimated) rows count as large
+LARGE_TABLE_ROWS = 10000
+
+
+class ExplainingCursor(psycopg2.extensions.cursor):
+    """
+    Cursor that runs EXPLAIN (ANALYZE, BUFFERS) before each read statement.
+
+    Plans are appended to `captured`. Writes are executed normally, since
+    EXPLAIN ANALYZE would run them twice.
+    """
+
+    captured = []
+
+    def execute(self, query, vars=None):
+        if self.name is None and _is_read(query):
+            self._explain(query, vars)
+        return super().execute(query, vars)
+
+    def _explain(self, query, vars):
+        super().execute("SAVEPOINT dao_bench_explain")
+        try:
+            super().execute("EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) " + query, vars)
+            plan = self.fetchone()[0][0]
+            super().execute("RELEASE SAVEPOINT dao_bench_explain")
+        except psycopg2.Error as e:
+            super().execute("ROLLBACK TO SAVEPOINT dao_bench_explain")
+            plan = {"error": str(e).strip()}
+        self.captured.append({"sql": " ".join(query.split()), "plan": plan})
+
+
+def _is_read(query):
+    head = query.lstrip().split(None, 1)[0].upper() if query.strip() else ""
+    return head in ("SELECT", "WITH")
+
+
+def _walk(node):
+    yield node
+    for child in node.get("Plans", []):
+        yield from _walk(child)
+
+
+def seq_scans(plan, large_tables):
+    """Relations scanned sequentially in a plan that are in large_tables."""
+    if "Plan" not in plan:
+        return []
+    return sorted(
+        {
+            node["Relation Name"]
+            for node in _walk(plan["Plan"])
+            if node["Node Type"] == "Seq Scan" and node.get("Relation Name") in large_tables
+        }
+    )
+
+
+class Fixtures:
+    """Representative ids and values picked from the seeded data."""
+
+    def __init__(self, conn):
+        with conn.cursor() as cur:
+            cur.execute("""
+                SELECT a.id, a.department
+                FROM administrators a
+                JOIN reports r ON r.validated_by = a.id
+                GROUP BY a.id
+                ORDER BY COUNT(*) DESC
+                LIMIT 1
+            """)
+            self.admin_id, self.department = cur.fetchone()
+            cur.execute("SELECT user_id FROM reporter_counters ORDER BY report_count DESC LIMIT 1")
+            self.user_id = cur.fetchone()[0]
+            cur.execute(
+                "SELECT user_id FROM pinned_reports GROUP BY user_id ORDER BY COUNT(*) DESC LIMIT 1"
+            )
+            row = cur.fetchone()
+            self.pinned_user_id = row[0] if row else self.user_id
+            cur.execute("SELECT percentile_disc(0.5) WITHIN GROUP (ORDER BY id) FROM reports")
+            self.report_id = cur.fetchone()[0]
+            cur.execute("""
+                SELECT l.id, l.latitude, l.longitude
+                FROM location l
+                JOIN reports r ON r.location = l.id
+                GROUP BY l.id
+                ORDER BY COUNT(*) DESC
+                LIMIT 1
+            """)
+            self.location_id, lat, lon = cur.fetchone()
+            self.latitude, self.longitude = float(lat), float(lon)
+        self.search = SEARCH_TERMS[0]
+
+
+# (DAO class, method, f(fixtures) -> positional args)
+CASES = [
+    (ReportsDAO, "get_reports_paginated", lambda f: (20, 0)),
+    (ReportsDAO, "get_total_report_count", lambda f: ()),
+    (ReportsDAO, "get_report_by_id", lambda f: (f.report_id,)),
+    (ReportsDAO, "get_report_detail", lambda f: (f.report_id, f.user_id)),
+    (ReportsDAO, "search_reports", lambda f: (f.search,)),
+    (ReportsDAO, "get_reports_by_user", lambda f: (f.user_id, 20, 0)),
+    (ReportsDAO, "get_user_reports_count", lambda f: (f.user_id,)),
+    (ReportsDAO, "get_overview_stats", lambda f: ()),
+    (ReportsDAO, "get_department_stats", lambda f: (f.department,)),
+    (ReportsDAO, "get_admin_dashboard", lambda f: ()),
+    (ReportsDAO, "get_report_location_counts", lambda f: ()),
+    (ReportsDAO, "get_pending_reports", lambda f: (20, 0)),
+    (ReportsDAO, "get_pending_reports_count", lambda f: ()),
+    (ReportsDAO, "get_assigned_reports", lambda f: (f.admin_id, 20, 0)),
+    (ReportsDAO, "get_assigned_reports_count", lambda f: (f.admin_id,)),
+    (LocationsDAO, "get_locations_paginated", lambda f: (20, 0)),
+    (LocationsDAO, "get_location_by_id", lambda f: (f.location_id,)),
+    (LocationsDAO, "get_locations_by_coordinates", lambda f: (f.latitude, f.longitude, 5)),
+    (LocationsDAO, "get_locations_with_reports_count", lambda f: (20, 0)),
+    (LocationsDAO, "get_location_usage_stats", lambda f: ()),
+    (LocationsDAO, "search_locations_nearby", lambda f: (f.latitude, f.longitude, 5, 20)),
+    (LocationsDAO, "get_location_details", lambda f: (f.location_id,)),
+    (AdministratorsDAO, "get_administrators_paginated", lambda f: (20, 0)),
+    (AdministratorsDAO, "get_administrator_by_id", lambda f: (f.admin_id,)),
+    (AdministratorsDAO, "get_administrators_by_department", lambda f: (f.department,)),
+    (AdministratorsDAO, "get_available_administrators", lambda f: ()),
+    (AdministratorsDAO, "get_admin_stats", lambda f: (f.admin_id,)),
+    (AdministratorsDAO, "get_all_admin_stats", lambda f: ()),
+    (AdministratorsDAO, "get_admin_info_for_user", lambda f: (f.admin_id,)),
+    (AdministratorsDAO, "get_administrator_performance_report", lambda f: ()),
+    (AdministratorsDAO, "get_reports_for_admin", lambda f: (f.department, 50)),
+    (DepartmentsDAO, "get_all_departments_with_admin_info", lambda f: ()),
+    (DepartmentsDAO, "get_department_with_admin_info", lambda f: (f.department,)),
+    (DepartmentsDAO, "get_departments_by_admin", lambda f: (f.admin_id,)),
+    (DepartmentsDAO, "get_department_stats", lambda f: (f.department,)),
+    (DepartmentsDAO, "get_all_departments_stats", lambda f: ()),
+    (PinnedReportsDAO, "get_pinned_reports_by_user", lambda f: (f.pinned_user_id, 20, 0)),
+    (PinnedReportsDAO, "get_pinned_reports_count_by_user", lambda f: (f.pinned_user_id,)),
+    (PinnedReportsDAO, "get_all_pinned_reports", lambda f: (20, 0)),
+    (PinnedReportsDAO, "get_total_pinned_reports_count", lambda f: ()),
+]
+
+
+def _large_tables(conn, min_rows):
+    with conn.cursor() as cur:
+        cur.execute(
+            """
+            SELECT c.relname
+            FROM pg_class c
+            JOIN pg_namespace n ON n.oid = c.relnamespace
+            WHERE c.relkind = 'r' AND n.nspname = 'public' AND c.reltuples >= %s
+            """,
+            (min_rows,),
+        )
+        return {row[0] for row in cur.fetchall()}
+
+
+def _reset_caches():
+    report_counts.invalidate()
+    report_grid.reset()
+
+
+def run_case(dao_cls, method, args, iterations, warmup):
+    """
+    Capture the plans of one cold call, then time `iterations` calls.
+
+    Returns:
+        tuple: (latencies in seconds, captured plans)
+    """
+    conn = load_db()
+    dao = dao_cls()
+    call = getattr(dao, method)
+
+    _reset_caches()
+    ExplainingCursor.captured = []
+    original = conn.cursor_factory
+    conn.cursor_factory = ExplainingCursor
+    try:
+        call(*args)
+    finally:
+        conn.cursor_factory = original
+        conn.rollback()
+    plans = ExplainingCursor.captured
+
+    for _ in range(warmup):
+        call(*args)
+    latencies = []
+    for _ in range(iterations):
+        began = time.perf_counter()
+        call(*args)
+        latencies.append(time.perf_counter() - began)
+    conn.rollback()
+    latencies.sort()
+    return latencies, plans
+
+
+def _summarize(latencies, plans, large_tables):
+    flagged = sorted({t for p in plans for t in seq_scans(p["plan"], large_tables)})
+    return {
+        "iterations": len(latencies),
+        "p50_ms": _ms(percentile(latencies, 50)),
+        "p95_ms": _ms(percentile(latencies, 95)),
+        "p99_ms": _ms(percentile(latencies, 99)),
+        "mean_ms": _ms(sum(latencies) / len(latencies)) if latencies else None,
+        "queries": len(plans),
+        "plan_ms": round(sum(p["plan"].get("Execution Time", 0) for p in plans), 2),
+        "shared_hit": sum(p["plan"].get("Plan", {}).get("Shared Hit Blocks", 0) for p in plans),
+        "shared_read": sum(p["plan"].get("Plan", {}).get("Shared Read Blocks", 0) for p in plans),
+        "seq_scans": flagged,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--iterations", type=int, default=20)
+    parser.add_argument("--warmup", type=int, default=2)
+    parser.add_argument("--large-rows", type=int, default=LARGE_TABLE_ROWS)
+    parser.add_argument("--only", help="comma-separated Dao.method names to run")
+    parser.add_argument("--plans", help="directory for the captured EXPLAIN JSON per method")
+    parser.add_argument("--output", help="write results as JSON")
+    parser.add_argument("--fail-on-seqscan", action="store_true")
+    opts = parser.parse_args()
+
+    only = {n.strip() for n in opts.only.split(",")} if opts.only else None
+    cases = [c for c in CASES if only is None or f"{c[0].__name__}.{c[1]}" in only]
+    if not cases:
+        parser.error("no benchmark matches --only")
+    if opts.plans:
+        os.makedirs(opts.plans, exist_ok=True)
+
+    app = Flask(__name__)
+    init_app(app)
+    results = {}
+    with app.app_context():
+        conn = load_db()
+        large_tables = _large_tables(conn, opts.large_rows)
+        fixtures = Fixtures(conn)
+        conn.rollback()
+
+        print(f"large tables: {', '.join(sorted(large_tables)) or '-'}")
+        print(
+            f"{'method':<55} {'p50':>8} {'p95':>8} {'p99':>8} {'mean':>8} "
+            f"{'queries':>7} {'hit':>7} {'read':>6}  seq scans"
+        )
+        for dao_cls, method, build_args in cases:
+            name = f"{dao_cls.__name__}.{method}"
+            try:
+                latencies, plans = run_case(
+                    dao_cls, method, build_args(fixtures), opts.iterations, opts.warmup
+                )
+            except Exception as e:
+                load_db().rollback()
+                results[name] = {"error": str(e).strip()}
+                print(f"{name:<55} ERROR {e}")
+                continue
+
+            r = results[name] = _summarize(latencies, plans, large_tables)
+            print(
+                f"{name:<55} {r['p50_ms']:>8} {r['p95_ms']:>8} {r['p99_ms']:>8} "
+                f"{r['mean_ms']:>8} {r['queries']:>7} {r['shared_hit']:>7} "
+                f"{r['shared_read']:>6}  {'SEQ SCAN ' + ', '.join(r['seq_scans']) if r['seq_scans'] else ''}"
+            )
+            if opts.plans:
+                with open(os.path.join(opts.plans, f"{name}.json"), "w") as f:
+                    json.dump(plans, f, indent=2, default=str)
+
+    if opts.output:
+        with open(opts.output, "w") as f:
+            json.dump({"iterations": opts.iterations, "results": results}, f, indent=2)
+
+    if opts.fail_on_seqscan and any(r.get("seq_scans") for r in results.values()):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,267 @@
+"""
+HTTP load test for the REST API.
+
+Drives each scenario against a running server (e.g. gunicorn on a database
+filled by benchmarks.seed) with N concurrent clients, each on its own
+keep-alive connection, and reports p50/p95/p99 latency and throughput:
+
+    python -m benchmarks.load_test --url http://localhost:5000 \\
+        --concurrency 16 --duration 30 --output results.json
+
+A previous --output file can be passed as --baseline; the run then exits
+with status 1 when any scenario's p95 regressed by more than
+--max-regression (default 20%).
+"""
+
+import argparse
+import http.client
+import json
+import math
+import random
+import struct
+import sys
+import threading
+import time
+import uuid
+import zlib
+from urllib.parse import urlencode, urlsplit
+
+from benchmarks.seed import BENCH_EMAIL, BENCH_PASSWORD, LAT_RANGE, LON_RANGE, SEARCH_TERMS
+
+
+def _png(rng, size=64):
+    """A small PNG with random pixels, so every upload is new content."""
+    raw = b"".join(b"\x00" + rng.randbytes(size * 3) for _ in range(size))
+
+    def chunk(kind, data):
+        body = kind + data
+        return struct.pack(">I", len(data)) + body + struct.pack(">I", zlib.crc32(body))
+
+    header = struct.pack(">IIBBBBB", size, size, 8, 2, 0, 0, 0)
+    return (
+        b"\x89PNG\r\n\x1a\n"
+        + chunk(b"IHDR", header)
+        + chunk(b"IDAT", zlib.compress(raw))
+        + chunk(b"IEND", b"")
+    )
+
+
+def _multipart(field, filename, content, content_type):
+    boundary = uuid.uuid4().hex
+    body = (
+        f"--{boundary}\r\n"
+        f'Content-Disposition: form-data; name="{field}"; filename="{filename}"\r\n'
+        f"Content-Type: {content_type}\r\n\r\n"
+    ).encode() + content + f"\r\n--{boundary}--\r\n".encode()
+    return body, {"Content-Type": f"multipart/form-data; boundary={boundary}"}
+
+
+# Each scenario builds (method, path, body, headers) for one request
+def _reports(rng, opts):
+    return "GET", f"/reports?{urlencode({'page': rng.randint(1, 50), 'limit': 20})}", None, {}
+
+
+def _search(rng, opts):
+    query = {"q": rng.choice(SEARCH_TERMS), "limit": 20}
+    return "GET", f"/reports/search?{urlencode(query)}", None, {}
+
+
+def _nearby(rng, opts):
+    query = {
+        "latitude": round(rng.uniform(*LAT_RANGE), 6),
+        "longitude": round(rng.uniform(*LON_RANGE), 6),
+        "radius": rng.choice([1, 5, 10]),
+    }
+    return "GET", f"/locations/nearby?{urlencode(query)}", None, {}
+
+
+def _dashboard(rng, opts):
+    return "GET", "/admin/dashboard", None, {}
+
+
+def _login(rng, opts):
+    body = {"email": BENCH_EMAIL.format(rng.randint(1, opts.users)), "password": BENCH_PASSWORD}
+    return "POST", "/login", json.dumps(body).encode(), {"Content-Type": "application/json"}
+
+
+def _upload(rng, opts):
+    body, headers = _multipart("image", "bench.png", _png(rng), "image/png")
+    return "POST", "/upload", body, headers
+
+
+SCENARIOS = {
+    "reports": _reports,
+    "search": _search,
+    "nearby": _nearby,
+    "dashboard": _dashboard,
+    "login": _login,
+    "upload": _upload,
+}
+
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return None
+    rank = max(1, math.ceil(pct / 100.0 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+class _Client:
+    """One keep-alive connection, reopened after errors."""
+
+    def __init__(self, url, timeout):
+        parts = urlsplit(url)
+        self.https = parts.scheme == "https"
+        self.host = parts.netloc
+        self.prefix = parts.path.rstrip("/")
+        self.timeout = timeout
+        self.conn = None
+
+    def request(self, method, path, body, headers):
+        if self.conn is None:
+            cls = http.client.HTTPSConnection if self.https else http.client.HTTPConnection
+            self.conn = cls(self.host, timeout=self.timeout)
+        try:
+            self.conn.request(method, self.prefix + path, body=body, headers=headers)
+            response = self.conn.getresponse()
+            response.read()
+            return response.status
+        except (OSError, http.client.HTTPException):
+            self.close()
+            raise
+
+    def close(self):
+        if self.conn is not None:
+            self.conn.close()
+            self.conn = None
+
+
+def _ms(seconds):
+    return None if seconds is None else round(seconds * 1000, 2)
+
+
+def run_scenario(name, opts):
+    """
+    Run one scenario for opts.duration seconds after opts.warmup seconds.
+
+    Returns:
+        dict: requests, errors, throughput (req/s) and latency percentiles (ms)
+    """
+    build = SCENARIOS[name]
+    latencies = []
+    errors = []
+    lock = threading.Lock()
+    start = time.perf_counter()
+    measure_from = start + opts.warmup
+    deadline = measure_from + opts.duration
+
+    def worker(index):
+        rng = random.Random(f"{opts.seed}:{name}:{index}")
+        client = _Client(opts.url, opts.timeout)
+        mine, failed = [], 0
+        try:
+            while True:
+                method, path, body, headers = build(rng, opts)
+                began = time.perf_counter()
+                if began >= deadline:
+                    break
+                try:
+                    ok = client.request(method, path, body, headers) < 400
+                except (OSError, http.client.HTTPException):
+                    ok = False
+                if began < measure_from:
+                    continue
+                if ok:
+                    mine.append(time.perf_counter() - began)
+                else:
+                    failed += 1
+        finally:
+            client.close()
+            with lock:
+                latencies.extend(mine)
+                errors.append(failed)
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(opts.concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    latencies.sort()
+    return {
+        "requests": len(latencies),
+        "errors": sum(errors),
+        "throughput": round(len(latencies) / opts.duration, 1),
+        "p50_ms": _ms(percentile(latencies, 50)),
+        "p95_ms": _ms(percentile(latencies, 95)),
+        "p99_ms": _ms(percentile(latencies, 99)),
+        "max_ms": _ms(latencies[-1] if latencies else None),
+    }
+
+
+def compare(results, baseline, max_regression):
+    """Scenarios whose p95 grew by more than max_regression (a fraction)."""
+    regressions = []
+    for name, current in results.items():
+        before = baseline.get(name, {}).get("p95_ms")
+        after = current.get("p95_ms")
+        if before and after and after > before * (1 + max_regression):
+            regressions.append((name, before, after))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--url", default="http://localhost:5000")
+    parser.add_argument(
+        "--scenarios", default=",".join(SCENARIOS),
+        help=f"comma-separated subset of: {', '.join(SCENARIOS)}",
+    )
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--duration", type=float, default=20, help="measured seconds per scenario")
+    parser.add_argument("--warmup", type=float, default=3, help="unmeasured seconds per scenario")
+    parser.add_argument("--timeout", type=float, default=30)
+    parser.add_argument("--users", type=int, default=5000, help="bench users seeded (for /login)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="write results as JSON")
+    parser.add_argument("--baseline", help="JSON results of an earlier run to compare against")
+    parser.add_argument("--max-regression", type=float, default=0.2)
+    opts = parser.parse_args()
+
+    names = [n.strip() for n in opts.scenarios.split(",") if n.strip()]
+    unknown = [n for n in names if n not in SCENARIOS]
+    if unknown:
+        parser.error(f"unknown scenarios: {', '.join(unknown)}")
+
+    header = f"{'scenario':<10} {'reqs':>7} {'errors':>6} {'req/s':>8} {'p50':>8} {'p95':>8} {'p99':>8} {'max':>8}"
+    print(f"{opts.url}  concurrency={opts.concurrency}  duration={opts.duration}s (ms)")
+    print(header)
+    results = {}
+    for name in names:
+        r = results[name] = run_scenario(name, opts)
+        print(
+            f"{name:<10} {r['requests']:>7} {r['errors']:>6} {r['throughput']:>8} "
+            + " ".join(f"{r[k] if r[k] is not None else '-':>8}" for k in ("p50_ms", "p95_ms", "p99_ms", "max_ms"))
+        )
+
+    if opts.output:
+        with open(opts.output, "w") as f:
+            json.dump(
+                {"concurrency": opts.concurrency, "duration": opts.duration, "results": results},
+                f,
+                indent=2,
+            )
+
+    if opts.baseline:
+        with open(opts.baseline) as f:
+            baseline = json.load(f)["results"]
+        regressions = compare(results, baseline, opts.max_regression)
+        for name, before, after in regressions:
+            print(f"REGRESSION {name}: p95 {before}ms -> {after}ms")
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,276 @@
+"""
+Seed a local database with benchmark-sized data.
+
+Adds users, administrators, locations, reports and pinned reports on top of
+the sample data from tables.sql. Rows are generated server-side with
+generate_series and a fixed random seed, so the same arguments always
+produce the same data set. The counter/rollup triggers are switched off
+during the bulk insert and the tables are rebuilt afterwards.
+
+Run from backend/ against a disposable database (DATABASE_URL):
+
+    python -m benchmarks.seed --reset --reports 300000
+
+Every seeded user can log in with BENCH_PASSWORD; their emails are
+bench-<n>@bench.local for n = 1..--users.
+"""
+
+import argparse
+import os
+import time
+
+BENCH_PASSWORD = "benchmark"
+BENCH_EMAIL = "bench-{}@bench.local"
+TABLES_SQL = os.path.join(os.path.dirname(os.path.dirname(__file__)), "tables.sql")
+
+DEPARTMENTS = ["DTOP", "LUMA", "AAA", "DDS"]
+CATEGORIES = [
+    "pothole", "street_light", "traffic_signal", "road_damage", "sanitation",
+    "flooding", "water_outage", "wandering_waste", "electrical_hazard",
+    "sinkhole", "fallen_tree", "pipe_leak", "other",
+]
+# Words used in titles/descriptions; the load test searches for them too
+SEARCH_TERMS = [
+    "bache", "poste", "semáforo", "inundación", "tubería", "árbol", "cable",
+    "basura", "agua", "luz", "carretera", "calle", "avenida", "puente",
+    "pothole", "streetlight", "flooding", "leak", "sinkhole", "outage",
+]
+# Puerto Rico bounding box
+LAT_RANGE = (17.92, 18.52)
+LON_RANGE = (-67.27, -65.59)
+
+# Reports inserted per statement (keeps progress output and WAL bursts small)
+INSERT_BATCH = 50000
+REPORT_TRIGGERS = ("trg_report_counters", "trg_report_rollups")
+
+
+def _seed_users(cur, users, admins):
+    start = time.perf_counter()
+    cur.execute(
+        """
+        INSERT INTO users (email, password, admin, created_at)
+        SELECT format(%(email)s, n), %(password)s, n <= %(admins)s,
+               now() - random() * interval '730 days'
+        FROM generate_series(1, %(users)s) AS n
+        ON CONFLICT (email) DO NOTHING
+        """,
+        {
+            "email": BENCH_EMAIL.replace("{}", "%s"),
+            # Stored as UsersDAO.create_user stores it, so /login accepts it
+            "password": BENCH_PASSWORD,
+            "admins": admins,
+            "users": users,
+        },
+    )
+    cur.execute(
+        """
+        INSERT INTO administrators (id, department)
+        SELECT id, (%(departments)s::varchar[])[1 + (id %% %(n)s)]
+        FROM users
+        WHERE admin AND email LIKE '%%@bench.local'
+        ON CONFLICT (id) DO NOTHING
+        """,
+        {"departments": DEPARTMENTS, "n": len(DEPARTMENTS)},
+    )
+    print(f"users: {users} ({admins} administrators) in {time.perf_counter() - start:.1f}s")
+
+
+def _seed_locations(cur, locations):
+    start = time.perf_counter()
+    cur.execute(
+        """
+        INSERT INTO location (city, latitude, longitude, country)
+        SELECT 'Bench ' || n,
+               %(lat0)s + random() * (%(lat1)s - %(lat0)s),
+               %(lon0)s + random() * (%(lon1)s - %(lon0)s),
+               'Puerto Rico'
+        FROM generate_series(1, %(n)s) AS n
+        """,
+        {
+            "lat0": LAT_RANGE[0], "lat1": LAT_RANGE[1],
+            "lon0": LON_RANGE[0], "lon1": LON_RANGE[1],
+            "n": locations,
+        },
+    )
+    print(f"locations: {locations} in {time.perf_counter() - start:.1f}s")
+
+
+def _ids(cur, query):
+    cur.execute(query)
+    return [row[0] for row in cur.fetchall()]
+
+
+def _seed_reports(cur, reports):
+    """Insert reports with a realistic status mix and assigned admins."""
+    user_ids = _ids(cur, "SELECT id FROM users WHERE NOT admin ORDER BY id")
+    admin_ids = _ids(cur, "SELECT id FROM administrators ORDER BY id")
+    location_ids = _ids(cur, "SELECT id FROM location ORDER BY id")
+
+    query = """
+        WITH base AS (
+            SELECT n,
+                   random() AS s, random() AS c, random() AS u, random() AS l,
+                   random() AS v, random() AS r, random() AS w1, random() AS w2,
+                   random() AS w3, random() AS rt,
+                   now() - random() * interval '730 days' AS created_at
+            FROM generate_series(1, %(n)s) AS n
+        ), picked AS (
+            SELECT base.*,
+                   CASE
+                       WHEN s < 0.35 THEN 'open'
+                       WHEN s < 0.55 THEN 'in_progress'
+                       WHEN s < 0.85 THEN 'resolved'
+                       WHEN s < 0.95 THEN 'closed'
+                       ELSE 'denied'
+                   END AS status,
+                   %(words)s::text[] AS words
+            FROM base
+        )
+        INSERT INTO reports (
+            title, description, status, category, created_by, validated_by,
+            resolved_by, created_at, resolved_at, location, rating
+        )
+        SELECT
+            initcap(words[1 + floor(w1 * array_length(words, 1))::int]) || ' en '
+                || words[1 + floor(w2 * array_length(words, 1))::int] || ' #' || n,
+            'Reporte de ' || words[1 + floor(w2 * array_length(words, 1))::int]
+                || ' cerca de ' || words[1 + floor(w3 * array_length(words, 1))::int]
+                || '. Se necesita atención.',
+            status,
+            (%(categories)s::varchar[])[1 + floor(c * %(n_categories)s)::int],
+            (%(users)s::int[])[1 + floor(u * %(n_users)s)::int],
+            CASE WHEN status <> 'open'
+                 THEN (%(admins)s::int[])[1 + floor(v * %(n_admins)s)::int] END,
+            CASE WHEN status = 'resolved'
+                 THEN (%(admins)s::int[])[1 + floor(r * %(n_admins)s)::int] END,
+            created_at,
+            CASE WHEN status = 'resolved'
+                 THEN created_at + r * interval '30 days' END,
+            (%(locations)s::int[])[1 + floor(l * %(n_locations)s)::int],
+            CASE WHEN status = 'resolved' AND rt < 0.5
+                 THEN 1 + floor(rt * 10)::int END
+        FROM picked
+    """
+    params = {
+        "words": SEARCH_TERMS,
+        "categories": CATEGORIES, "n_categories": len(CATEGORIES),
+        "users": user_ids, "n_users": len(user_ids),
+        "admins": admin_ids, "n_admins": len(admin_ids),
+        "locations": location_ids, "n_locations": len(location_ids),
+    }
+
+    start = time.perf_counter()
+    done = 0
+    while done < reports:
+        batch = min(INSERT_BATCH, reports - done)
+        cur.execute(query, {**params, "n": batch})
+        done += batch
+        print(f"reports: {done}/{reports} ({time.perf_counter() - start:.1f}s)")
+
+    cur.execute("""
+        UPDATE users u SET total_reports = c.n
+        FROM (SELECT created_by, COUNT(*) AS n FROM reports GROUP BY created_by) c
+        WHERE u.id = c.created_by
+    """)
+
+
+def _seed_pinned(cur, pinned):
+    start = time.perf_counter()
+    cur.execute(
+        """
+        INSERT INTO pinned_reports (user_id, report_id, pinned_at)
+        SELECT u.ids[1 + floor(random() * array_length(u.ids, 1))::int],
+               1 + floor(random() * r.max_id)::int,
+               now() - random() * interval '365 days'
+        FROM generate_series(1, %(n)s),
+             (SELECT array_agg(id) AS ids FROM users) u,
+             (SELECT max(id) AS max_id FROM reports) r
+        ON CONFLICT DO NOTHING
+        """,
+        {"n": pinned},
+    )
+    print(f"pinned reports: {cur.rowcount} in {time.perf_counter() - start:.1f}s")
+
+
+def seed(users, admins, locations, reports, pinned, random_seed=0.42, reset=False):
+    """
+    Load benchmark data into the database pointed to by DATABASE_URL.
+
+    Args:
+        users (int): Bench users to create (the first `admins` are administrators)
+        admins (int): Administrators among them, spread over every department
+        locations (int): Locations inside Puerto Rico
+        reports (int): Reports to insert
+        pinned (int): Pinned (user, report) pairs to attempt
+        random_seed (float): Seed for PostgreSQL's random(), in [-1, 1]
+        reset (bool): Recreate every table from tables.sql first, and apply
+            the migrations (see migrate.py) once the data is loaded
+    """
+    # Imported here so load_test can reuse the constants above without a
+    # database driver installed on the load-generating machine
+    from dao.d_reports import ReportsDAO
+    from load import load_db, release_db
+    from migrate import migrate_up
+
+    conn = load_db()
+    try:
+        with conn.cursor() as cur:
+            if reset:
+                with open(TABLES_SQL) as f:
+                    cur.execute(f.read())
+                conn.commit()
+                print("tables.sql loaded")
+
+            cur.execute("SELECT setseed(%s)", (random_seed,))
+            _seed_users(cur, users, admins)
+            _seed_locations(cur, locations)
+
+            for trigger in REPORT_TRIGGERS:
+                cur.execute(f"ALTER TABLE reports DISABLE TRIGGER {trigger}")
+            _seed_reports(cur, reports)
+            for trigger in REPORT_TRIGGERS:
+                cur.execute(f"ALTER TABLE reports ENABLE TRIGGER {trigger}")
+
+            _seed_pinned(cur, pinned)
+        conn.commit()
+
+        dao = ReportsDAO()
+        try:
+            dao.reconcile_report_counters()
+        finally:
+            dao.close()
+        print("counters and rollups rebuilt")
+
+        conn.autocommit = True
+        if reset:
+            # Indexes are built after the bulk insert, which is cheaper
+            migrate_up(conn)
+        with conn.cursor() as cur:
+            cur.execute("ANALYZE")
+    finally:
+        release_db(conn)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--users", type=int, default=5000)
+    parser.add_argument("--admins", type=int, default=40)
+    parser.add_argument("--locations", type=int, default=2000)
+    parser.add_argument("--reports", type=int, default=300000)
+    parser.add_argument("--pinned", type=int, default=50000)
+    parser.add_argument("--seed", type=float, default=0.42, help="random seed in [-1, 1]")
+    parser.add_argument(
+        "--reset", action="store_true", help="drop and recreate every table first"
+    )
+    args = parser.parse_args()
+    if not 0 < args.admins < args.users:
+        parser.error("--admins must be between 1 and --users - 1")
+
+    seed(
+        args.users, args.admins, args.locations, args.reports, args.pinned,
+        random_seed=args.seed, reset=args.reset,
+    )
+
+
+if __name__ == "__main__":
+    main()
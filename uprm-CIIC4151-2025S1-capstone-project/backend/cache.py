@@ -0,0 +1,200 @@
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+from urllib.parse import quote, urlencode
+
+from flask import make_response, request
+from werkzeug.http import quote_etag, unquote_etag
+
+from constants import HTTP_STATUS
+
+# Response cache settings (override through the environment)
+CACHE_BACKEND = os.getenv("CACHE_BACKEND", "memory")  # memory | redis | none
+CACHE_TTL = float(os.getenv("CACHE_TTL", "30"))
+CACHE_MAX_ENTRIES = int(os.getenv("CACHE_MAX_ENTRIES", "2048"))
+REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+# Admin -> department lookups change rarely; writes invalidate locally
+ADMIN_SCOPE_TTL = float(os.getenv("ADMIN_SCOPE_TTL", "300"))
+
+# Invalidation tags shared by routes and DAOs
+TAG_REPORTS = "reports"
+TAG_STATS = "stats"
+TAG_LOCATIONS = "locations"
+TAG_DEPARTMENTS = "departments"
+
+
+class MemoryBackend:
+    """In-process LRU cache with per-entry TTL."""
+
+    def __init__(self, max_entries=CACHE_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._generations = {}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            value, expires_at = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl):
+        with self._lock:
+            self._entries[key] = (value, time.monotonic() + ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def generation(self, tag):
+        with self._lock:
+            return self._generations.get(tag, 0)
+
+    def bump(self, tag):
+        with self._lock:
+            self._generations[tag] = self._generations.get(tag, 0) + 1
+
+
+class RedisBackend:
+    """Redis-compatible backend, shared by every worker process."""
+
+    def __init__(self, url=REDIS_URL):
+        import redis  # optional dependency, only needed for CACHE_BACKEND=redis
+
+        self._client = redis.Redis.from_url(url)
+
+    def get(self, key):
+        return self._client.get(f"cache:{key}")
+
+    def set(self, key, value, ttl):
+        self._client.set(f"cache:{key}", value, ex=max(1, int(ttl)))
+
+    def generation(self, tag):
+        return int(self._client.get(f"cache:gen:{tag}") or 0)
+
+    def bump(self, tag):
+        self._client.incr(f"cache:gen:{tag}")
+
+
+class ResponseCache:
+    """
+    Route-level response cache.
+
+    Entries are keyed by path + query string + the current generation of
+    each tag, so invalidate(tag) makes older entries unreachable in O(1);
+    they then age out through LRU/TTL.
+    """
+
+    def __init__(self, backend_name=CACHE_BACKEND, ttl=CACHE_TTL):
+        self.ttl = ttl
+        self.backend = None
+        if backend_name == "memory":
+            self.backend = MemoryBackend()
+        elif backend_name == "redis":
+            try:
+                self.backend = RedisBackend()
+            except ImportError:
+                print("CACHE_BACKEND=redis but redis is not installed; using memory cache")
+                self.backend = MemoryBackend()
+
+    def _key(self, tags):
+        # Escaped, so a value containing "&" or "=" cannot pose as other args
+        args = urlencode(sorted(request.args.items(multi=True)))
+        gens = ",".join(f"{tag}:{self.backend.generation(tag)}" for tag in tags)
+        return f"{quote(request.path)}?{args}|{gens}"
+
+    def invalidate(self, *tags):
+        if self.backend is None:
+            return
+        for tag in tags:
+            try:
+                self.backend.bump(tag)
+            except Exception as e:
+                print(f"Cache invalidation failed for {tag}: {e}")
+
+    def cached(self, *tags, ttl=None):
+        """
+        Cache successful GET responses of a view.
+
+        Args:
+            *tags: Invalidation tags the response depends on
+            ttl (float | None): Seconds to keep the entry (default CACHE_TTL)
+        """
+
+        def decorator(view):
+            @wraps(view)
+            def wrapper(*args, **kwargs):
+                if self.backend is None or request.method != "GET":
+                    return view(*args, **kwargs)
+
+                try:
+                    key = self._key(tags)
+                    hit = self.backend.get(key)
+                except Exception as e:
+                    print(f"Cache lookup failed: {e}")
+                    return view(*args, **kwargs)
+
+                if hit is not None:
+                    entry = json.loads(hit)
+                    etag = entry.get("etag")
+                    if etag and etag in request.if_none_match:
+                        response = make_response("", HTTP_STATUS.NOT_MODIFIED)
+                    else:
+                        response = make_response(entry["body"], entry["status"])
+                        response.headers["Content-Type"] = entry["content_type"]
+                    if etag:
+                        response.headers["ETag"] = quote_etag(etag)
+                    response.headers["X-Cache"] = "HIT"
+                    return response
+
+                response = make_response(view(*args, **kwargs))
+                if response.status_code == 200 and not response.direct_passthrough:
+                    entry = {
+                        "body": response.get_data(as_text=True),
+                        "status": response.status_code,
+                        "content_type": response.content_type,
+                        "etag": unquote_etag(response.headers.get("ETag"))[0],
+                    }
+                    try:
+                        self.backend.set(key, json.dumps(entry), ttl or self.ttl)
+                    except Exception as e:
+                        print(f"Cache store failed: {e}")
+                response.headers["X-Cache"] = "MISS"
+                return response
+
+            return wrapper
+
+        return decorator
+
+
+response_cache = ResponseCache()
+cached = response_cache.cached
+invalidate = response_cache.invalidate
+
+
+# Admin info ({"admin", "department"}) per user id, used to scope report listings
+admin_scopes = MemoryBackend(max_entries=CACHE_MAX_ENTRIES)
+
+
+def invalidate_admin_scope(user_id=None):
+    """Forget cached admin info for one user, or for everyone if user_id is None."""
+    if user_id is None:
+        admin_scopes.clear()
+    else:
+        admin_scopes.delete(user_id)
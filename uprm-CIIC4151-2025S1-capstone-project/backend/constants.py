@@ -19,6 +19,7 @@ class HTTP_STATUS:
     METHOD_NOT_ALLOWED = 405
     NOT_ACCEPTABLE = 406
     CONFLICT = 409
+    PAYLOAD_TOO_LARGE = 413
     UNPROCESSABLE_ENTITY = 422
     TOO_MANY_REQUESTS = 429
 
@@ -53,4 +54,10 @@ CATEGORY_TO_DEPARTMENT = {
 
     # "other" can be None or some default; up to you
     "other": None,
-}
\ No newline at end of file
+}
+
+# Inverse of CATEGORY_TO_DEPARTMENT: department -> categories it handles
+DEPARTMENT_CATEGORIES = {}
+for _category, _department in CATEGORY_TO_DEPARTMENT.items():
+    if _department:
+        DEPARTMENT_CATEGORIES.setdefault(_department, []).append(_category)
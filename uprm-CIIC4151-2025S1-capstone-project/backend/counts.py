@@ -0,0 +1,67 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+
+# Supported values for the `count` query parameter on list endpoints
+COUNT_EXACT = "exact"        # COUNT(*), served from the cache when possible
+COUNT_ESTIMATE = "estimate"  # planner row estimate, no table scan
+COUNT_NONE = "none"          # skip totals entirely (infinite scroll)
+COUNT_MODES = (COUNT_EXACT, COUNT_ESTIMATE, COUNT_NONE)
+
+COUNT_CACHE_TTL = float(os.getenv("COUNT_CACHE_TTL", "60"))
+COUNT_CACHE_MAX_ENTRIES = int(os.getenv("COUNT_CACHE_MAX_ENTRIES", "1024"))
+
+
+class CountCache:
+    """
+    Per-filter cache of exact COUNT(*) results.
+
+    Entries are keyed by the WHERE clause and its parameters. Writes to the
+    underlying table call invalidate(); the TTL bounds staleness across
+    processes, which do not see each other's invalidations.
+    """
+
+    def __init__(self, ttl=COUNT_CACHE_TTL, max_entries=COUNT_CACHE_MAX_ENTRIES):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(where_sql, params):
+        return where_sql, tuple(tuple(p) if isinstance(p, list) else p for p in params)
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            value, expires_at = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._entries[key] = (value, time.monotonic() + self.ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self):
+        with self._lock:
+            self._entries.clear()
+
+
+# Shared by every ReportsDAO in the process; cleared on report writes
+report_counts = CountCache()
+
+
+def page_count(total_count, limit):
+    """Number of pages for a total, or None when the total was skipped."""
+    if total_count is None:
+        return None
+    return (total_count + limit - 1) // limit
@@ -1,7 +1,12 @@
 from dotenv import load_dotenv
-from load import load_db
+from load import load_db, release_db
+from metrics import instrument_dao
+from cache import TAG_DEPARTMENTS, invalidate, invalidate_admin_scope
+from constants import DEPARTMENT_CATEGORIES
+from dao.d_reports import ReportsDAO, handled_reports_sql, iter_report_rows
 
 
+@instrument_dao
 class AdministratorsDAO:
     def __init__(self):
         load_dotenv()
@@ -90,6 +95,8 @@ class AdministratorsDAO:
         with self.conn.cursor() as cur:
             cur.execute(query, (user_id, department))
             self.conn.commit()
+            invalidate(TAG_DEPARTMENTS)
+            invalidate_admin_scope(user_id)
             return cur.fetchone()
 
     def update_administrator(self, administrator_id, department=None):
@@ -115,6 +122,8 @@ class AdministratorsDAO:
         with self.conn.cursor() as cur:
             cur.execute(query, params)
             self.conn.commit()
+            invalidate(TAG_DEPARTMENTS)
+            invalidate_admin_scope(administrator_id)
             return cur.fetchone()
 
     def delete_administrator(self, administrator_id):
@@ -122,6 +131,8 @@ class AdministratorsDAO:
         with self.conn.cursor() as cur:
             cur.execute(query, (administrator_id,))
             self.conn.commit()
+            invalidate(TAG_DEPARTMENTS)
+            invalidate_admin_scope(administrator_id)
             result = cur.fetchone()
             return result is not None
 
@@ -193,24 +204,36 @@ class AdministratorsDAO:
         """
         Returns a dict already shaped for JSON, used directly by handler.
         """
-        query = """
+        query = f"""
             SELECT
                 a.id,
                 a.department,
-                COUNT(r.id) AS total_assigned_reports,
-                COUNT(CASE WHEN r.status = 'in_progress' THEN 1 END) AS in_progress_reports,
-                COUNT(CASE WHEN r.status = 'resolved' THEN 1 END) AS resolved_reports,
-                COUNT(CASE WHEN r.status = 'open' THEN 1 END) AS open_reports,
-                COUNT(CASE WHEN r.status = 'denied' THEN 1 END) AS denied_reports,
-                COALESCE(AVG(r.rating), 0) AS avg_rating,
-                COUNT(CASE WHEN r.validated_by = a.id THEN 1 END) AS validated_reports,
-                COUNT(CASE WHEN r.resolved_by = a.id THEN 1 END) AS resolved_personally,
-                COUNT(DISTINCT r.category) AS categories_handled
+                s.total_assigned_reports,
+                s.in_progress_reports,
+                s.resolved_reports,
+                s.open_reports,
+                s.denied_reports,
+                s.avg_rating,
+                s.validated_reports,
+                s.resolved_personally,
+                s.categories_handled
             FROM administrators a
-            LEFT JOIN reports r
-                ON (r.validated_by = a.id OR r.resolved_by = a.id)
+            CROSS JOIN LATERAL (
+                SELECT
+                    COUNT(*) AS total_assigned_reports,
+                    COUNT(CASE WHEN h.status = 'in_progress' THEN 1 END) AS in_progress_reports,
+                    COUNT(CASE WHEN h.status = 'resolved' THEN 1 END) AS resolved_reports,
+                    COUNT(CASE WHEN h.status = 'open' THEN 1 END) AS open_reports,
+                    COUNT(CASE WHEN h.status = 'denied' THEN 1 END) AS denied_reports,
+                    COALESCE(AVG(h.rating), 0) AS avg_rating,
+                    COUNT(CASE WHEN h.validated_by = a.id THEN 1 END) AS validated_reports,
+                    COUNT(CASE WHEN h.resolved_by = a.id THEN 1 END) AS resolved_personally,
+                    COUNT(DISTINCT h.category) AS categories_handled
+                FROM ({handled_reports_sql(
+                    "a.id", "r.status, r.rating, r.validated_by, r.resolved_by, r.category"
+                )}) h
+            ) s
             WHERE a.id = %s
-            GROUP BY a.id, a.department
         """
         with self.conn.cursor() as cur:
             cur.execute(query, (admin_id,))
@@ -244,21 +267,26 @@ class AdministratorsDAO:
         [5] avg_rating
         [6] personally_resolved
         """
-        query = """
+        query = f"""
             SELECT
                 a.id,
                 a.department,
                 u.email,
-                COUNT(r.id) AS total_assigned_reports,
-                COUNT(CASE WHEN r.status = 'resolved' THEN 1 END) AS resolved_reports,
-                COALESCE(AVG(r.rating), 0) AS avg_rating,
-                COUNT(CASE WHEN r.resolved_by = a.id THEN 1 END) AS resolved_personally
+                s.total_assigned_reports,
+                s.resolved_reports,
+                s.avg_rating,
+                s.resolved_personally
             FROM administrators a
             JOIN users u ON a.id = u.id
-            LEFT JOIN reports r
-                ON (r.validated_by = a.id OR r.resolved_by = a.id)
-            GROUP BY a.id, a.department, u.email
-            ORDER BY total_assigned_reports DESC
+            CROSS JOIN LATERAL (
+                SELECT
+                    COUNT(*) AS total_assigned_reports,
+                    COUNT(CASE WHEN h.status = 'resolved' THEN 1 END) AS resolved_reports,
+                    COALESCE(AVG(h.rating), 0) AS avg_rating,
+                    COUNT(CASE WHEN h.resolved_by = a.id THEN 1 END) AS resolved_personally
+                FROM ({handled_reports_sql("a.id", "r.status, r.rating, r.resolved_by")}) h
+            ) s
+            ORDER BY s.total_assigned_reports DESC
         """
         with self.conn.cursor() as cur:
             cur.execute(query)
@@ -326,42 +354,70 @@ class AdministratorsDAO:
         [6] avg_rating
         [7] categories_handled
         """
+        # The window is scanned once through idx_reports_created_at and
+        # pre-aggregated per admin: each report counts for its validator,
+        # and for its resolver when that is a different admin
         query = """
+            WITH handled AS (
+                SELECT r.validated_by AS admin_id, r.status, r.rating, r.resolved_by, r.category
+                FROM reports r
+                WHERE r.validated_by IS NOT NULL
+                  AND r.created_at >= CURRENT_DATE - (%(days)s * INTERVAL '1 day')
+                UNION ALL
+                SELECT r.resolved_by, r.status, r.rating, r.resolved_by, r.category
+                FROM reports r
+                WHERE r.resolved_by IS NOT NULL
+                  AND r.validated_by IS DISTINCT FROM r.resolved_by
+                  AND r.created_at >= CURRENT_DATE - (%(days)s * INTERVAL '1 day')
+            ), per_admin AS (
+                SELECT
+                    admin_id,
+                    COUNT(*) AS reports_handled,
+                    COUNT(CASE WHEN status = 'resolved' THEN 1 END) AS reports_resolved,
+                    COUNT(CASE WHEN resolved_by = admin_id THEN 1 END) AS personally_resolved,
+                    COALESCE(AVG(rating), 0) AS avg_rating,
+                    COUNT(DISTINCT category) AS categories_handled
+                FROM handled
+                GROUP BY admin_id
+            )
             SELECT
                 a.id,
                 a.department,
                 u.email,
-                COUNT(r.id) AS reports_handled,
-                COUNT(CASE WHEN r.status = 'resolved' THEN 1 END) AS reports_resolved,
-                COUNT(CASE WHEN r.resolved_by = a.id THEN 1 END) AS personally_resolved,
-                COALESCE(AVG(r.rating), 0) AS avg_rating,
-                COUNT(DISTINCT r.category) AS categories_handled
-            FROM administrators a
+                p.reports_handled,
+                p.reports_resolved,
+                p.personally_resolved,
+                p.avg_rating,
+                p.categories_handled
+            FROM per_admin p
+            JOIN administrators a ON a.id = p.admin_id
             JOIN users u ON a.id = u.id
-            LEFT JOIN reports r
-                ON (r.validated_by = a.id OR r.resolved_by = a.id)
-            WHERE r.created_at >= CURRENT_DATE - (%s * INTERVAL '1 day')
-            GROUP BY a.id, a.department, u.email
-            ORDER BY reports_handled DESC
+            ORDER BY p.reports_handled DESC
         """
         with self.conn.cursor() as cur:
-            cur.execute(query, (days,))
+            cur.execute(query, {"days": days})
             return cur.fetchall()
 
     # -------------------------------------------------------
     # REPORTS VISIBLE TO ADMIN (DEPARTMENT → CATEGORIES)
     # -------------------------------------------------------
-    def get_reports_for_admin(self, admin_id):
-        """
-        Return all reports visible to this admin, based on their department.
-
-        Department → allowed categories mapping:
-        LUMA: street_light, traffic_signal, electrical_hazard
-        DTOP: pothole, road_damage, fallen_tree
-        AAA:  flooding, water_outage, pipe_leak
-        DDS:  sanitation, wandering_waste, sinkhole
-
-        Row shape from reports r.*:
+    def get_reports_for_admin(
+        self,
+        department: str,
+        limit: int,
+        sort: str | None = None,
+        after: tuple | None = None,
+        before: tuple | None = None,
+    ):
+        """
+        Return one page of reports visible to an admin of `department`.
+
+        Department → allowed categories comes from CATEGORY_TO_DEPARTMENT.
+        Each category is read in order through idx_reports_category_created_at_id
+        and the runs are merged (see ReportsDAO.get_reports_paginated).
+        Pages are keyset-paginated on (created_at, id).
+
+        Row shape (same as ReportsDAO.get_report_by_id):
         [0] id
         [1] title
         [2] description
@@ -376,29 +432,25 @@ class AdministratorsDAO:
         [11] image_url
         [12] rating
         """
-        sql = """
-            SELECT r.*
-            FROM reports r
-            JOIN administrators a ON a.id = %s
-            WHERE (
-                (a.department = 'LUMA'
-                 AND r.category IN ('street_light', 'traffic_signal', 'electrical_hazard'))
-             OR (a.department = 'DTOP'
-                 AND r.category IN ('pothole', 'road_damage', 'fallen_tree'))
-             OR (a.department = 'AAA'
-                 AND r.category IN ('flooding', 'water_outage', 'pipe_leak'))
-             OR (a.department = 'DDS'
-                 AND r.category IN ('sanitation', 'wandering_waste', 'sinkhole'))
-            )
-            ORDER BY r.created_at DESC
+        categories = DEPARTMENT_CATEGORIES.get(department)
+        if not categories:
+            return []
+        return ReportsDAO().get_reports_paginated(limit, 0, sort, categories, after, before)
+
+    def iter_reports_for_admin(self, department: str):
         """
-        with self.conn.cursor() as cur:
-            cur.execute(sql, (admin_id,))
-            return cur.fetchall()
+        Stream every report visible to `department`, newest first, through
+        a server-side cursor on this DAO's connection (see
+        dao.d_reports.iter_report_rows).
+        """
+        categories = DEPARTMENT_CATEGORIES.get(department)
+        if not categories:
+            return
+        yield from iter_report_rows(self.conn, ["category = ANY(%s)"], [categories])
 
     # -------------------------------------------------------
     # CLEANUP
     # -------------------------------------------------------
     def close(self):
-        if self.conn:
-            self.conn.close()
+        release_db(self.conn)
+        self.conn = None
@@ -1,7 +1,11 @@
 from dotenv import load_dotenv
-from load import load_db
+from load import load_db, release_db
+from metrics import instrument_dao
+from cache import TAG_DEPARTMENTS, invalidate
+from dao.d_reports import handled_reports_sql
 
 
+@instrument_dao
 class DepartmentsDAO:
 
     def __init__(self):
@@ -30,6 +34,7 @@ class DepartmentsDAO:
         with self.conn.cursor() as cur:
             cur.execute(query, (admin_id, department_name))
             self.conn.commit()
+            invalidate(TAG_DEPARTMENTS)
             return cur.fetchone()
 
     def delete_department(self, department_name):
@@ -37,6 +42,7 @@ class DepartmentsDAO:
         with self.conn.cursor() as cur:
             cur.execute(query, (department_name,))
             self.conn.commit()
+            invalidate(TAG_DEPARTMENTS)
             result = cur.fetchone()
             return result is not None
 
@@ -49,6 +55,7 @@ class DepartmentsDAO:
         with self.conn.cursor() as cur:
             cur.execute(query, (department_name, admin_id))
             self.conn.commit()
+            invalidate(TAG_DEPARTMENTS)
             return cur.fetchone()
 
     def get_department_with_admin_info(self, department_name):
@@ -105,21 +112,30 @@ class DepartmentsDAO:
 
     def get_department_stats(self, department_name):
         """Get statistics for a specific department"""
-        query = """
+        query = f"""
             SELECT
                 da.department,
-                COUNT(r.id) as total_reports,
-                COUNT(CASE WHEN r.status = 'open' THEN 1 END) as open_reports,
-                COUNT(CASE WHEN r.status = 'in_progress' THEN 1 END) as in_progress_reports,
-                COUNT(CASE WHEN r.status = 'resolved' THEN 1 END) as resolved_reports,
-                COUNT(CASE WHEN r.status = 'denied' THEN 1 END) as denied_reports,
-                COALESCE(AVG(r.rating), 0) as avg_rating,
-                COUNT(DISTINCT r.created_by) as unique_reporters
+                s.total_reports,
+                s.open_reports,
+                s.in_progress_reports,
+                s.resolved_reports,
+                s.denied_reports,
+                s.avg_rating,
+                s.unique_reporters
             FROM department_admins da
             LEFT JOIN administrators a ON da.admin_id = a.id
-            LEFT JOIN reports r ON (r.validated_by = a.id OR r.resolved_by = a.id)
+            CROSS JOIN LATERAL (
+                SELECT
+                    COUNT(*) as total_reports,
+                    COUNT(CASE WHEN h.status = 'open' THEN 1 END) as open_reports,
+                    COUNT(CASE WHEN h.status = 'in_progress' THEN 1 END) as in_progress_reports,
+                    COUNT(CASE WHEN h.status = 'resolved' THEN 1 END) as resolved_reports,
+                    COUNT(CASE WHEN h.status = 'denied' THEN 1 END) as denied_reports,
+                    COALESCE(AVG(h.rating), 0) as avg_rating,
+                    COUNT(DISTINCT h.created_by) as unique_reporters
+                FROM ({handled_reports_sql("a.id", "r.status, r.rating, r.created_by")}) h
+            ) s
             WHERE da.department = %s
-            GROUP BY da.department
         """
         with self.conn.cursor() as cur:
             cur.execute(query, (department_name,))
@@ -127,21 +143,28 @@ class DepartmentsDAO:
 
     def get_all_departments_stats(self):
         """Get statistics for all departments"""
-        query = """
+        query = f"""
             SELECT
                 da.department,
                 da.admin_id,
                 u.email as admin_email,
-                COUNT(r.id) as total_reports,
-                COUNT(CASE WHEN r.status = 'open' THEN 1 END) as open_reports,
-                COUNT(CASE WHEN r.status = 'in_progress' THEN 1 END) as in_progress_reports,
-                COUNT(CASE WHEN r.status = 'resolved' THEN 1 END) as resolved_reports,
-                COALESCE(AVG(r.rating), 0) as avg_rating
+                s.total_reports,
+                s.open_reports,
+                s.in_progress_reports,
+                s.resolved_reports,
+                s.avg_rating
             FROM department_admins da
             LEFT JOIN administrators a ON da.admin_id = a.id
             LEFT JOIN users u ON a.id = u.id
-            LEFT JOIN reports r ON (r.validated_by = a.id OR r.resolved_by = a.id)
-            GROUP BY da.department, da.admin_id, u.email
+            CROSS JOIN LATERAL (
+                SELECT
+                    COUNT(*) as total_reports,
+                    COUNT(CASE WHEN h.status = 'open' THEN 1 END) as open_reports,
+                    COUNT(CASE WHEN h.status = 'in_progress' THEN 1 END) as in_progress_reports,
+                    COUNT(CASE WHEN h.status = 'resolved' THEN 1 END) as resolved_reports,
+                    COALESCE(AVG(h.rating), 0) as avg_rating
+                FROM ({handled_reports_sql("a.id", "r.status, r.rating")}) h
+            ) s
             ORDER BY da.department
         """
         with self.conn.cursor() as cur:
@@ -164,5 +187,5 @@ class DepartmentsDAO:
             return cur.fetchone() is not None
 
     def close(self):
-        if self.conn:
-            self.conn.close()
+        release_db(self.conn)
+        self.conn = None
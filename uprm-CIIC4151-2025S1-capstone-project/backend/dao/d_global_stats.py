@@ -1,23 +1,218 @@
-from load import load_db
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from load import load_db, pooled_connection, release_db
+from metrics import instrument_dao
+from constants import CATEGORY_TO_DEPARTMENT
+
+# Run the per-aggregate queries concurrently on pooled connections instead of
+# the single grouping-sets scan (helps once reports outgrows shared buffers)
+STATS_PARALLEL = os.getenv("STATS_PARALLEL", "0") == "1"
+# Extra pooled connections one parallel summary may hold at once; the
+# request's own connection runs one query as well. Keep
+# DB_POOL_MAX >= concurrent requests * (1 + STATS_PARALLEL_WORKERS)
+STATS_PARALLEL_WORKERS = max(1, int(os.getenv("STATS_PARALLEL_WORKERS", "2")))
+
+# GROUPING(category, created_by, validated_by, resolved_by) per grouping set
+_TOTAL, _BY_CATEGORY, _BY_USER, _BY_VALIDATOR, _BY_RESOLVER = 15, 7, 11, 13, 14
+
+# One scan of reports: every aggregate is a grouping set, and the per-set
+# row_number() trims the user/admin sets to the top N inside the database.
+_SUMMARY_QUERY = """
+    WITH agg AS (
+        SELECT category, created_by, validated_by, resolved_by,
+               GROUPING(category, created_by, validated_by, resolved_by) AS grp,
+               COUNT(*) AS total,
+               COUNT(*) FILTER (WHERE status = 'resolved') AS resolved,
+               AVG(EXTRACT(EPOCH FROM (resolved_at - created_at)) / 86400.0)
+                   FILTER (WHERE status = 'resolved') AS avg_days
+        FROM reports
+        GROUP BY GROUPING SETS ((), (category), (created_by), (validated_by), (resolved_by))
+    ),
+    ranked AS (
+        SELECT agg.*,
+               ROW_NUMBER() OVER (
+                   PARTITION BY grp
+                   ORDER BY CASE WHEN grp = %(by_resolver)s THEN resolved ELSE total END DESC,
+                            COALESCE(created_by, validated_by, resolved_by)
+               ) AS rn
+        FROM agg
+        WHERE NOT (grp = %(by_validator)s AND validated_by IS NULL)
+          AND NOT (grp = %(by_resolver)s AND resolved = 0)
+    )
+    SELECT grp, category, created_by, validated_by, resolved_by, total, resolved, avg_days
+    FROM ranked
+    WHERE grp IN (%(total)s, %(by_category)s) OR rn <= %(n)s
+"""
+
+
+def _top_departments(resolved_by_category, n):
+    counts = {}
+    for category, resolved in resolved_by_category:
+        department = CATEGORY_TO_DEPARTMENT.get(category)
+        if department and resolved:
+            counts[department] = counts.get(department, 0) + resolved
+    ranked = sorted(counts.items(), key=lambda item: (-item[1], item[0]))[:n]
+    return [{"department": d, "count": c} for d, c in ranked]
+
+
+@instrument_dao
 class GlobalStatsDAO:
     def __init__(self): self.conn = load_db()
 
-    def avg_resolution_days(self):
-        q = """SELECT AVG(EXTRACT(EPOCH FROM (resolved_at - created_at))/86400.0) FROM reports WHERE status='RESOLVED'"""
-        with self.conn, self.conn.cursor() as cur: cur.execute(q); return float(cur.fetchone()[0] or 0)
+    def summary(self, n, parallel=None):
+        """
+        All /stats/summary figures with top-N lists of length n.
+
+        Args:
+            n (int): Entries per top-N list
+            parallel (bool, optional): Override STATS_PARALLEL
+
+        Returns:
+            dict: avg_resolution_days and the four top-N lists
+        """
+        if STATS_PARALLEL if parallel is None else parallel:
+            return self._summary_parallel(n)
+
+        params = {
+            "total": _TOTAL, "by_category": _BY_CATEGORY, "by_validator": _BY_VALIDATOR,
+            "by_resolver": _BY_RESOLVER, "n": n,
+        }
+        with self.conn.cursor() as cur:
+            cur.execute(_SUMMARY_QUERY, params)
+            rows = cur.fetchall()
+
+        def ranked(grp, key, metric):
+            # Same order as the SQL ranking: metric desc, then id with NULL last
+            return sorted((r for r in rows if r[0] == grp), key=lambda r: (-r[metric], r[key] is None, r[key]))
+
+        total = next((r for r in rows if r[0] == _TOTAL), None)
+        return {
+            "avg_resolution_days": float(total[7] or 0) if total else 0.0,
+            "top_departments_resolved": _top_departments(
+                [(r[1], r[6]) for r in rows if r[0] == _BY_CATEGORY], n
+            ),
+            "top_users_reports": [
+                {"user_id": r[2], "count": r[5]} for r in ranked(_BY_USER, 2, 5)
+            ],
+            "top_admins_validated": [
+                {"admin_id": r[3], "count": r[5]} for r in ranked(_BY_VALIDATOR, 3, 5)
+            ],
+            "top_admins_resolved": [
+                {"admin_id": r[4], "count": r[6]} for r in ranked(_BY_RESOLVER, 4, 6)
+            ],
+        }
+
+    def _summary_parallel(self, n):
+        """
+        Same result as summary(), one query per figure.
+
+        The first query runs on the request's connection while at most
+        STATS_PARALLEL_WORKERS others run on borrowed pool connections.
+        """
+        tasks = {
+            "avg_resolution_days": (self.avg_resolution_days, ()),
+            "top_departments_resolved": (self.top_departments_resolved, (n,)),
+            "top_users_reports": (self.top_users_reports, (n,)),
+            "top_admins_validated": (self.top_admins_validated, (n,)),
+            "top_admins_resolved": (self.top_admins_resolved, (n,)),
+        }
+
+        def run(fn, args):
+            with pooled_connection() as conn:
+                return fn(*args, conn=conn)
+
+        (first, (first_fn, first_args)), *rest = tasks.items()
+        with ThreadPoolExecutor(max_workers=min(STATS_PARALLEL_WORKERS, len(rest))) as pool:
+            futures = {key: pool.submit(run, fn, args) for key, (fn, args) in rest}
+            results = {first: first_fn(*first_args)}
+            results.update((key, future.result()) for key, future in futures.items())
+        return {key: results[key] for key in tasks}
+
+    def _fetch(self, q, params=(), conn=None):
+        with (conn or self.conn).cursor() as cur: cur.execute(q, params); return cur.fetchall()
+
+    def avg_resolution_days(self, conn=None):
+        q = """SELECT AVG(EXTRACT(EPOCH FROM (resolved_at - created_at))/86400.0) FROM reports WHERE status='resolved'"""
+        return float(self._fetch(q, conn=conn)[0][0] or 0)
+
+    def top_departments_resolved(self, n, conn=None):
+        q = """SELECT category, COUNT(*) FROM reports WHERE status='resolved' GROUP BY category"""
+        return _top_departments(self._fetch(q, conn=conn), n)
+
+    def top_users_reports(self, n, conn=None):
+        q = """SELECT created_by, COUNT(*) FROM reports GROUP BY created_by ORDER BY 2 DESC, 1 NULLS LAST LIMIT %s"""
+        return [{"user_id": r[0], "count": r[1]} for r in self._fetch(q, (n,), conn)]
+
+    def top_admins_validated(self, n, conn=None):
+        q = """SELECT validated_by, COUNT(*) FROM reports WHERE validated_by IS NOT NULL GROUP BY validated_by ORDER BY 2 DESC, 1 LIMIT %s"""
+        return [{"admin_id": r[0], "count": r[1]} for r in self._fetch(q, (n,), conn)]
+
+    def top_admins_resolved(self, n, conn=None):
+        q = """SELECT resolved_by, COUNT(*) FROM reports WHERE status='resolved' GROUP BY resolved_by ORDER BY 2 DESC, 1 NULLS LAST LIMIT %s"""
+        return [{"admin_id": r[0], "count": r[1]} for r in self._fetch(q, (n,), conn)]
+
+    def session_timestamps(self, *moments):
+        """
+        Naive timestamps on the database clock, as reports.created_at and
+        report_rollups.bucket_start store them (session TimeZone).
+
+        Args:
+            *moments: Aware datetimes to convert, or None for the current time
+
+        Returns:
+            tuple: One naive datetime per argument
+        """
+        columns = [
+            "LOCALTIMESTAMP" if m is None else "(%s::timestamptz AT TIME ZONE current_setting('TimeZone'))"
+            for m in moments
+        ]
+        return tuple(self._fetch(f"SELECT {', '.join(columns)}", [m for m in moments if m is not None])[0])
+
+    def timeseries(self, granularity, start, end, group_by=None, category=None, status=None, department=None):
+        """
+        Report counts per time bucket from report_rollups (no scan of reports).
+
+        Args:
+            granularity (str): 'hour', 'day' or 'week' (weeks sum day buckets)
+            start, end (datetime): Half-open range [start, end) of bucket starts
+            group_by (str, optional): 'category', 'status' or 'department'
+            category, status, department (str, optional): Filters
 
-    def top_departments_resolved(self, n):
-        q = """SELECT department, COUNT(*) FROM reports WHERE status='RESOLVED' GROUP BY department ORDER BY 2 DESC LIMIT %s"""
-        with self.conn, self.conn.cursor() as cur: cur.execute(q, (n,)); return [{"department": r[0], "count": r[1]} for r in cur.fetchall()]
+        Returns:
+            list[tuple]: (bucket_start, key, count) ordered by bucket then key;
+            key is None when group_by is None
+        """
+        source = "hour" if granularity == "hour" else "day"
+        params = {"trunc": granularity, "source": source, "start": start, "end": end}
+        key_sql = {"category": "category", "status": "status"}.get(group_by, "NULL")
+        if group_by == "department":
+            cases = []
+            mapped = sorted((c, d) for c, d in CATEGORY_TO_DEPARTMENT.items() if d)
+            for i, (cat, dept) in enumerate(mapped):
+                cases.append(f"WHEN %(c{i})s THEN %(d{i})s")
+                params[f"c{i}"], params[f"d{i}"] = cat, dept
+            key_sql = f"CASE category {' '.join(cases)} ELSE 'unassigned' END"
 
-    def top_users_reports(self, n):
-        q = """SELECT created_by, COUNT(*) FROM reports GROUP BY created_by ORDER BY 2 DESC LIMIT %s"""
-        with self.conn, self.conn.cursor() as cur: cur.execute(q, (n,)); return [{"user_id": r[0], "count": r[1]} for r in cur.fetchall()]
+        where = ["granularity = %(source)s", "bucket_start >= %(start)s", "bucket_start < %(end)s"]
+        if category:
+            where.append("category = %(category)s"); params["category"] = category
+        if status:
+            where.append("status = %(status)s"); params["status"] = status
+        if department:
+            where.append("category = ANY(%(dept_categories)s)")
+            params["dept_categories"] = [c for c, d in CATEGORY_TO_DEPARTMENT.items() if d == department]
 
-    def top_admins_validated(self, n):
-        q = """SELECT validated_by, COUNT(*) FROM reports WHERE validated_by IS NOT NULL GROUP BY validated_by ORDER BY 2 DESC LIMIT %s"""
-        with self.conn, self.conn.cursor() as cur: cur.execute(q, (n,)); return [{"admin_id": r[0], "count": r[1]} for r in cur.fetchall()]
+        q = f"""
+            SELECT date_trunc(%(trunc)s, bucket_start) AS bucket, {key_sql} AS key, SUM(report_count)
+            FROM report_rollups
+            WHERE {' AND '.join(where)}
+            GROUP BY 1, 2
+            HAVING SUM(report_count) > 0
+            ORDER BY 1, 2
+        """
+        return self._fetch(q, params)
 
-    def top_admins_resolved(self, n):
-        q = """SELECT resolved_by, COUNT(*) FROM reports WHERE status='RESOLVED' GROUP BY resolved_by ORDER BY 2 DESC LIMIT %s"""
-        with self.conn, self.conn.cursor() as cur: cur.execute(q, (n,)); return [{"admin_id": r[0], "count": r[1]} for r in cur.fetchall()]
+    def close(self):
+        release_db(self.conn)
+        self.conn = None
@@ -1,7 +1,52 @@
 from dotenv import load_dotenv
-from load import load_db
+import math
 
+from load import load_db, release_db
+from metrics import instrument_dao
+from report_grid import report_grid
+from cache import TAG_LOCATIONS, invalidate
 
+EARTH_RADIUS_KM = 6371
+KM_PER_DEGREE_LAT = math.pi * EARTH_RADIUS_KM / 180
+
+
+def _bounding_box(latitude, longitude, radius_km):
+    """
+    Latitude/longitude bounds that contain every point within radius_km.
+
+    Returns:
+        tuple: (min_lat, max_lat, min_lon, max_lon)
+    """
+    lat_delta = radius_km / KM_PER_DEGREE_LAT
+    min_lat = max(-90.0, latitude - lat_delta)
+    max_lat = min(90.0, latitude + lat_delta)
+
+    # Longitude degrees shrink with cos(latitude); widen to the full range
+    # near the poles or when the box would wrap the antimeridian.
+    cos_lat = math.cos(math.radians(max(abs(min_lat), abs(max_lat))))
+    if cos_lat <= 1e-9:
+        return min_lat, max_lat, -180.0, 180.0
+    lon_delta = radius_km / (KM_PER_DEGREE_LAT * cos_lat)
+    if lon_delta >= 180 or abs(longitude) + lon_delta > 180:
+        return min_lat, max_lat, -180.0, 180.0
+    return min_lat, max_lat, longitude - lon_delta, longitude + lon_delta
+
+
+def reverse_geocode(latitude, longitude):
+    """
+    Mock reverse geocoding function.
+    In a real implementation, you would call a geocoding API here.
+    """
+    # This is a simple mock - in reality you'd use:
+    # - Google Maps Geocoding API
+    # - OpenStreetMap Nominatim
+    # - Another geocoding service
+
+    # For now, return a formatted address based on coordinates
+    return f"Near {float(latitude):.6f}, {float(longitude):.6f}"
+
+
+@instrument_dao
 class LocationsDAO:
 
     def __init__(self):
@@ -41,6 +86,7 @@ class LocationsDAO:
         with self.conn.cursor() as cur:
             cur.execute(query, (city, latitude, longitude))
             self.conn.commit()
+            invalidate(TAG_LOCATIONS)
             return cur.fetchone()
 
     def update_location(self, location_id, city=None, latitude=None, longitude=None):
@@ -72,6 +118,8 @@ class LocationsDAO:
         with self.conn.cursor() as cur:
             cur.execute(query, params)
             self.conn.commit()
+            report_grid.invalidate()
+            invalidate(TAG_LOCATIONS)
             return cur.fetchone()
 
     def delete_location(self, location_id):
@@ -79,40 +127,67 @@ class LocationsDAO:
         with self.conn.cursor() as cur:
             cur.execute(query, (location_id,))
             self.conn.commit()
+            report_grid.invalidate()
+            invalidate(TAG_LOCATIONS)
             result = cur.fetchone()
             return result is not None
 
-    def get_locations_by_coordinates(self, latitude, longitude, radius_km=1):
+    def _find_nearby(self, latitude, longitude, radius_km, limit=None):
         """
-        Find locations within a certain radius of given coordinates
-        Uses Haversine formula for distance calculation
+        Locations within radius_km of a point, nearest first.
+
+        A bounding box on (latitude, longitude) narrows the search through
+        idx_location_lat_lon; the haversine distance is only computed for
+        the rows inside the box.
+
+        Row shape:
+        [0] id
+        [1] city
+        [2] latitude
+        [3] longitude
+        [4] distance (km)
         """
-        query = """
-            SELECT *,
-                (6371 * acos(cos(radians(%s)) * cos(radians(latitude)) *
-                cos(radians(longitude) - radians(%s)) + sin(radians(%s)) *
-                sin(radians(latitude)))) AS distance
-            FROM location
-            WHERE (6371 * acos(cos(radians(%s)) * cos(radians(latitude)) *
-                   cos(radians(longitude) - radians(%s)) + sin(radians(%s)) *
-                   sin(radians(latitude)))) < %s
+        min_lat, max_lat, min_lon, max_lon = _bounding_box(latitude, longitude, radius_km)
+        query = f"""
+            SELECT id, city, latitude, longitude, distance
+            FROM (
+                SELECT id, city, latitude, longitude,
+                    (6371 * acos(LEAST(1.0, GREATEST(-1.0,
+                        cos(radians(%s)) * cos(radians(latitude)) *
+                        cos(radians(longitude) - radians(%s)) +
+                        sin(radians(%s)) * sin(radians(latitude)))))) AS distance
+                FROM location
+                WHERE latitude BETWEEN %s AND %s
+                  AND longitude BETWEEN %s AND %s
+            ) candidates
+            WHERE distance < %s
             ORDER BY distance
+            {"LIMIT %s" if limit is not None else ""}
         """
+        params = [
+            latitude,
+            longitude,
+            latitude,
+            min_lat,
+            max_lat,
+            min_lon,
+            max_lon,
+            radius_km,
+        ]
+        if limit is not None:
+            params.append(limit)
+
         with self.conn.cursor() as cur:
-            cur.execute(
-                query,
-                (
-                    latitude,
-                    longitude,
-                    latitude,
-                    latitude,
-                    longitude,
-                    latitude,
-                    radius_km,
-                ),
-            )
+            cur.execute(query, params)
             return cur.fetchall()
 
+    def get_locations_by_coordinates(self, latitude, longitude, radius_km=1):
+        """
+        Find locations within a certain radius of given coordinates
+        Uses Haversine formula for distance calculation
+        """
+        return self._find_nearby(latitude, longitude, radius_km)
+
     def get_locations_with_reports_count(self, limit, offset):
         """Get locations with count of associated reports"""
         query = """
@@ -145,33 +220,7 @@ class LocationsDAO:
         self, latitude, longitude, max_distance_km=10, limit=20
     ):
         """Search for locations near given coordinates"""
-        query = """
-            SELECT *,
-                (6371 * acos(cos(radians(%s)) * cos(radians(latitude)) *
-                cos(radians(longitude) - radians(%s)) + sin(radians(%s)) *
-                sin(radians(latitude)))) AS distance
-            FROM location
-            WHERE (6371 * acos(cos(radians(%s)) * cos(radians(latitude)) *
-                   cos(radians(longitude) - radians(%s)) + sin(radians(%s)) *
-                   sin(radians(latitude)))) < %s
-            ORDER BY distance
-            LIMIT %s
-        """
-        with self.conn.cursor() as cur:
-            cur.execute(
-                query,
-                (
-                    latitude,
-                    longitude,
-                    latitude,
-                    latitude,
-                    longitude,
-                    latitude,
-                    max_distance_km,
-                    limit,
-                ),
-            )
-            return cur.fetchall()
+        return self._find_nearby(latitude, longitude, max_distance_km, limit)
 
     # =============================================================================
     # NEW METHOD FOR LOCATION DETAILS
@@ -180,7 +229,7 @@ class LocationsDAO:
     def get_location_details(self, location_id):
         """Get location details with address information"""
         # First get the basic location data
-        query = "SELECT * FROM location WHERE id = %s"
+        query = "SELECT id, city, latitude, longitude FROM location WHERE id = %s"
         with self.conn.cursor() as cur:
             cur.execute(query, (location_id,))
             location = cur.fetchone()
@@ -196,26 +245,13 @@ class LocationsDAO:
 
             return (
                 location[0],  # id
-                location[1],  # latitude
-                location[2],  # longitude
-                self._reverse_geocode(location[1], location[2]),  # address
-                "San Juan",  # city
+                location[1],  # city
+                location[2],  # latitude
+                location[3],  # longitude
+                reverse_geocode(location[2], location[3]),  # address
                 "Puerto Rico",  # country
             )
 
-    def _reverse_geocode(self, latitude, longitude):
-        """
-        Mock reverse geocoding function.
-        In a real implementation, you would call a geocoding API here.
-        """
-        # This is a simple mock - in reality you'd use:
-        # - Google Maps Geocoding API
-        # - OpenStreetMap Nominatim
-        # - Another geocoding service
-
-        # For now, return a formatted address based on coordinates
-        return f"Near {latitude:.6f}, {longitude:.6f}"
-
     def close(self):
-        if self.conn:
-            self.conn.close()
+        release_db(self.conn)
+        self.conn = None
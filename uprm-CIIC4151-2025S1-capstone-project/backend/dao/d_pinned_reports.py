@@ -1,7 +1,12 @@
 from dotenv import load_dotenv
-from load import load_db
+from load import load_db, release_db
+from metrics import instrument_dao
 
+# Listing order; the tie-breakers make pages (and their ETags) deterministic
+PINNED_ORDER = "pr.pinned_at DESC, pr.user_id, pr.report_id"
 
+
+@instrument_dao
 class PinnedReportsDAO:
 
     def __init__(self):
@@ -38,18 +43,50 @@ class PinnedReportsDAO:
             return result is not None
 
     def get_pinned_reports_by_user(self, user_id, limit, offset):
-        query = """
-            SELECT pr.*, r.title, r.description, r.status, r.category, r.created_at
+        """
+        A page of a user's pins, newest first, with report fields.
+
+        Row shape: pr.user_id, pr.report_id, pr.pinned_at, r.title,
+        r.description, r.status, r.category, r.created_at, r.updated_at
+        """
+        query = f"""
+            SELECT pr.*, r.title, r.description, r.status, r.category, r.created_at,
+                   r.updated_at
             FROM pinned_reports pr
             JOIN reports r ON pr.report_id = r.id
             WHERE pr.user_id = %s
-            ORDER BY pr.pinned_at DESC
+            ORDER BY {PINNED_ORDER}
             LIMIT %s OFFSET %s
         """
         with self.conn.cursor() as cur:
             cur.execute(query, (user_id, limit, offset))
             return cur.fetchall()
 
+    def get_pinned_report_versions(self, user_id, limit, offset):
+        """
+        Row versions for a page of pinned reports (same order as the listing),
+        used to build ETags. user_id=None covers all users.
+
+        Row shape:
+        [0] pr.user_id
+        [1] pr.report_id
+        [2] pr.pinned_at
+        [3] r.updated_at
+        """
+        where_sql = "WHERE pr.user_id = %s" if user_id else ""
+        params = [user_id] if user_id else []
+        query = f"""
+            SELECT pr.user_id, pr.report_id, pr.pinned_at, r.updated_at
+            FROM pinned_reports pr
+            JOIN reports r ON pr.report_id = r.id
+            {where_sql}
+            ORDER BY {PINNED_ORDER}
+            LIMIT %s OFFSET %s
+        """
+        with self.conn.cursor() as cur:
+            cur.execute(query, params + [limit, offset])
+            return cur.fetchall()
+
     def get_pinned_reports_count_by_user(self, user_id):
         query = "SELECT COUNT(*) FROM pinned_reports WHERE user_id = %s"
         with self.conn.cursor() as cur:
@@ -57,11 +94,13 @@ class PinnedReportsDAO:
             return cur.fetchone()[0]
 
     def get_all_pinned_reports(self, limit, offset):
-        query = """
-            SELECT pr.*, r.title, r.description, r.status, r.category, r.created_at
+        """Every user's pins, same row shape as get_pinned_reports_by_user."""
+        query = f"""
+            SELECT pr.*, r.title, r.description, r.status, r.category, r.created_at,
+                   r.updated_at
             FROM pinned_reports pr
             JOIN reports r ON pr.report_id = r.id
-            ORDER BY pr.pinned_at DESC
+            ORDER BY {PINNED_ORDER}
             LIMIT %s OFFSET %s
         """
         with self.conn.cursor() as cur:
@@ -99,5 +138,5 @@ class PinnedReportsDAO:
             return cur.fetchone()
 
     def close(self):
-        if self.conn:
-            self.conn.close()
+        release_db(self.conn)
+        self.conn = None
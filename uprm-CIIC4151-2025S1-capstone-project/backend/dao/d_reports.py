@@ -1,5 +1,18 @@
+import os
+import re
+import uuid
+
 from dotenv import load_dotenv
-from load import load_db
+from load import detached_db, load_db, release_db
+from metrics import instrument_dao
+from pagination import keyset_clause
+from counts import COUNT_ESTIMATE, COUNT_EXACT, COUNT_NONE, report_counts
+from constants import CATEGORY_TO_DEPARTMENT
+from report_grid import report_grid
+from cache import TAG_REPORTS, TAG_STATS, invalidate
+
+# Rows fetched per round trip when streaming through a server-side cursor
+EXPORT_BATCH_SIZE = int(os.getenv("EXPORT_BATCH_SIZE", "2000"))
 
 
 def _normalize_sort(sort: str | None) -> str:
@@ -13,69 +26,290 @@ def _normalize_sort(sort: str | None) -> str:
     return "ASC" if s == "ASC" else "DESC"
 
 
+def handled_reports_sql(admin: str, columns: str, condition: str | None = None) -> str:
+    """
+    Reports validated or resolved by one admin, for use as a subquery.
+
+    Written as a UNION ALL of an idx_reports_validated_by scan and an
+    idx_reports_resolved_by scan instead of joining on
+    `validated_by = admin OR resolved_by = admin`, which no index can
+    serve. A report the admin both validated and resolved appears once.
+
+    Args:
+        admin (str): SQL expression for the admin id (e.g. "a.id" when
+            correlated through a LATERAL join)
+        columns (str): Select list over `reports r`
+        condition (str, optional): Extra filter applied to both branches
+    """
+    extra = f" AND ({condition})" if condition else ""
+    return f"""
+        SELECT {columns} FROM reports r
+        WHERE r.validated_by = {admin}{extra}
+        UNION ALL
+        SELECT {columns} FROM reports r
+        WHERE r.resolved_by = {admin}
+          AND r.validated_by IS DISTINCT FROM {admin}{extra}
+    """
+
+
+def iter_report_rows(
+    conn,
+    where_clauses: list[str],
+    params: list,
+    batch_size: int = EXPORT_BATCH_SIZE,
+):
+    """
+    Yield report rows (same shape as ReportsDAO.get_report_by_id) newest
+    first through a server-side named cursor on `conn`, fetching
+    `batch_size` rows per round trip so memory stays flat however many rows
+    match.
+
+    The cursor runs on `conn` detached from the request (see
+    load.detached_db) since a streamed response outlives it, so an export
+    holds a single pool slot until the generator finishes or is closed
+    early (e.g. the client disconnects).
+    """
+    where_sql = f" WHERE {' AND '.join(where_clauses)}" if where_clauses else ""
+    query = f"""
+        SELECT id, title, description, status, category, created_by,
+               validated_by, resolved_by, created_at, resolved_at,
+               location, image_url, rating
+        FROM reports
+        {where_sql}
+        ORDER BY created_at DESC, id DESC
+    """
+    with detached_db(conn):
+        with conn.cursor(name=f"reports_stream_{uuid.uuid4().hex}") as cur:
+            cur.itersize = batch_size
+            cur.execute(query, params)
+            for row in cur:
+                yield row
+
+
+# Search modes for search_reports()
+SEARCH_FULL = "full"      # stemmed Spanish/English match, web-search syntax
+SEARCH_PREFIX = "prefix"  # every word treated as a prefix (typeahead)
+SEARCH_MODES = (SEARCH_FULL, SEARCH_PREFIX)
+
+
+def _build_tsquery(q: str, mode: str):
+    """
+    Return (tsquery SQL, params) for the search box text, or (None, [])
+    if the text has no searchable words.
+    """
+    if mode == SEARCH_PREFIX:
+        words = re.findall(r"\w+", q.lower())
+        if not words:
+            return None, []
+        return "to_tsquery('simple', %s)", [" & ".join(f"{w}:*" for w in words)]
+    return (
+        "(websearch_to_tsquery('spanish', %s) || websearch_to_tsquery('english', %s))",
+        [q, q],
+    )
+
+
+@instrument_dao
 class ReportsDAO:
     def __init__(self):
         load_dotenv()
         self.conn = load_db()
 
-    # -------------------------------
-    # Core list/read/write operations
-    # -------------------------------
-    def get_reports_paginated(
+    @staticmethod
+    def _invalidate_caches():
+        """Drop cached counts, map grid and responses after a report write."""
+        report_counts.invalidate()
+        report_grid.invalidate()
+        invalidate(TAG_REPORTS, TAG_STATS)
+
+    def _fetch_report_page(
         self,
+        where_clauses: list[str],
+        params: list,
         limit: int,
         offset: int,
-        sort: str | None = None,
-        allowed_categories: list[str] | None = None,
+        sort: str | None,
+        after: tuple | None,
+        before: tuple | None,
+        rank_sql: str | None = None,
+        rank_params: list | None = None,
+        versions_only: bool = False,
+        branches: list[tuple[list[str], list]] | None = None,
+        with_version: bool = False,
     ):
-        """Fetch reports with pagination and optional category restriction."""
+        """
+        Run a report listing ordered by (created_at, id) in offset or keyset mode.
+        With `rank_sql`, rows are ordered by that score instead (offset only).
+        With `versions_only`, rows are just (id, updated_at), for ETags;
+        `with_version` appends updated_at to the full rows instead.
+        With `branches`, a list of disjoint (clauses, params) filters that are
+        OR'ed together, each branch is read in order through its own
+        (column, created_at, id) index and the sorted runs are merged, instead
+        of filtering one scan of the whole table. Combining it with rank_sql
+        raises ValueError.
+        """
+        if branches and rank_sql:
+            # Falling back to the unbranched query would drop the scope
+            raise ValueError("branches cannot be combined with rank_sql")
         order_dir = _normalize_sort(sort)
-        where_clauses: list[str] = []
-        params: list = []
-
-        if allowed_categories:
-            where_clauses.append("category = ANY(%s)")
-            params.append(allowed_categories)
+        keyset_sql, keyset_params, scan_dir, reverse = keyset_clause(order_dir, after, before)
+        if rank_sql:
+            keyset_sql, reverse = None, False
+        if keyset_sql:
+            where_clauses = where_clauses + [keyset_sql]
+            params = params + keyset_params
+            offset = 0
 
         where_sql = f" WHERE {' AND '.join(where_clauses)}" if where_clauses else ""
-
-        query = f"""
-            SELECT id, title, description, status, category, created_by,
+        if rank_sql:
+            order_sql = f"{rank_sql} DESC, created_at DESC, id DESC"
+            order_params = list(rank_params or [])
+        else:
+            order_sql = f"created_at {scan_dir}, id {scan_dir}"
+            order_params = []
+        if versions_only:
+            columns = "id, updated_at"
+        else:
+            columns = """id, title, description, status, category, created_by,
                    validated_by, resolved_by, created_at, resolved_at,
-                   location, image_url, rating
+                   location, image_url, rating"""
+            if with_version:
+                columns += ", updated_at"
+        query = f"""
+            SELECT {columns}
             FROM reports
             {where_sql}
-            ORDER BY created_at {order_dir}, id {order_dir}
+            ORDER BY {order_sql}
             LIMIT %s OFFSET %s
         """
-        params.extend([limit, offset])
+        args = params + order_params + [limit, offset]
+
+        if branches:
+            parts, args = [], []
+            for branch_clauses, branch_params in branches:
+                part_where = " AND ".join(branch_clauses + where_clauses)
+                parts.append(f"""(
+                    SELECT {columns}, created_at AS sort_created_at
+                    FROM reports
+                    WHERE {part_where}
+                    ORDER BY {order_sql}
+                    LIMIT %s
+                )""")
+                args += branch_params + params + [limit + offset]
+            query = f"""
+                SELECT {columns}
+                FROM ({' UNION ALL '.join(parts)}) AS branches
+                ORDER BY sort_created_at {scan_dir}, id {scan_dir}
+                LIMIT %s OFFSET %s
+            """
+            args += [limit, offset]
 
         with self.conn.cursor() as cur:
-            cur.execute(query, params)
-            return cur.fetchall()
+            cur.execute(query, args)
+            rows = cur.fetchall()
 
-    def get_total_report_count(self, allowed_categories: list[str] | None = None):
-        """Count reports, optionally restricted to a set of categories."""
-        where_clauses: list[str] = []
-        params: list = []
+        if reverse:
+            rows.reverse()
+        return rows
 
-        if allowed_categories:
-            where_clauses.append("category = ANY(%s)")
-            params.append(allowed_categories)
+    def _count_reports(
+        self,
+        where_clauses: list[str],
+        params: list,
+        mode: str = COUNT_EXACT,
+        branches: list[tuple[list[str], list]] | None = None,
+    ):
+        """
+        Total for a report filter according to `mode`:
+        exact (cached COUNT(*)), estimate (planner rows) or none (skipped).
+        `branches` are disjoint (clauses, params) filters OR'ed together, as
+        in _fetch_report_page; each is counted on its own and summed.
+        """
+        if mode == COUNT_NONE:
+            return None
 
-        where_sql = f" WHERE {' AND '.join(where_clauses)}" if where_clauses else ""
-        query = f"SELECT COUNT(*) FROM reports{where_sql}"
+        filters = [(where_clauses, params)]
+        if branches:
+            filters = [(b_clauses + where_clauses, b_params + params) for b_clauses, b_params in branches]
+        wheres, args = [], []
+        for clauses, values in filters:
+            wheres.append(f" WHERE {' AND '.join(clauses)}" if clauses else "")
+            args.append(values)
 
-        with self.conn.cursor() as cur:
-            cur.execute(query, params)
-            return cur.fetchone()[0]
+        if mode == COUNT_ESTIMATE:
+            total = 0
+            with self.conn.cursor() as cur:
+                for where_sql, values in zip(wheres, args):
+                    cur.execute(f"EXPLAIN (FORMAT JSON) SELECT 1 FROM reports{where_sql}", values)
+                    plan = cur.fetchone()[0]
+                    total += int(plan[0]["Plan"]["Plan Rows"])
+            return total
 
-    def get_report_by_id(self, report_id: int):
-        """Fetch a single report by ID."""
-        query = """
+        key = report_counts.make_key("".join(wheres), [v for values in args for v in values])
+        total = report_counts.get(key)
+        if total is None:
+            query = " + ".join(f"(SELECT COUNT(*) FROM reports{where_sql})" for where_sql in wheres)
+            with self.conn.cursor() as cur:
+                cur.execute(f"SELECT {query}", [v for values in args for v in values])
+                total = cur.fetchone()[0]
+            report_counts.set(key, total)
+        return total
+
+    @staticmethod
+    def _category_branches(allowed_categories: list[str] | None):
+        """
+        One `category = %s` branch per category, so each is read (or
+        counted) through idx_reports_category_created_at_id; None when
+        unrestricted.
+        """
+        if not allowed_categories:
+            return None
+        # Branches must be disjoint
+        return [(["category = %s"], [category]) for category in dict.fromkeys(allowed_categories)]
+
+    # -------------------------------
+    # Core list/read/write operations
+    # -------------------------------
+    def get_reports_paginated(
+        self,
+        limit: int,
+        offset: int,
+        sort: str | None = None,
+        allowed_categories: list[str] | None = None,
+        after: tuple | None = None,
+        before: tuple | None = None,
+        versions_only: bool = False,
+        with_version: bool = False,
+    ):
+        """
+        Fetch reports with pagination and optional category restriction.
+        When an `after`/`before` cursor is given, OFFSET is ignored and the
+        page is located by keyset on (created_at, id).
+        `versions_only` returns (id, updated_at) rows for the same page;
+        `with_version` appends updated_at to the full rows.
+        """
+        return self._fetch_report_page(
+            [], [], limit, offset, sort, after, before,
+            versions_only=versions_only,
+            branches=self._category_branches(allowed_categories),
+            with_version=with_version,
+        )
+
+    def get_total_report_count(
+        self, allowed_categories: list[str] | None = None, mode: str = COUNT_EXACT
+    ):
+        """Count reports, optionally restricted to a set of categories."""
+        # Same branches as get_reports_paginated
+        return self._count_reports(
+            [], [], mode, branches=self._category_branches(allowed_categories)
+        )
+
+    def get_report_by_id(self, report_id: int, with_version: bool = False):
+        """Fetch a single report by ID (`with_version` appends updated_at)."""
+        version_sql = ", updated_at" if with_version else ""
+        query = f"""
             SELECT id, title, description, status, category, created_by,
                    validated_by, resolved_by, created_at, resolved_at,
-                   location, image_url, rating
+                   location, image_url, rating{version_sql}
             FROM reports
             WHERE id = %s
         """
@@ -83,6 +317,46 @@ class ReportsDAO:
             cur.execute(query, (report_id,))
             return cur.fetchone()
 
+    def get_report_detail(self, report_id: int, user_id: int | None = None):
+        """
+        Fetch a report with its location and the user's pin state in one query.
+
+        Args:
+            report_id (int): Report to fetch
+            user_id (int, optional): Viewer whose pin state is included
+
+        Returns:
+            tuple or None: The 13 report columns from get_report_by_id, then
+            location city, latitude, longitude (NULL without a location) and
+            is_pinned (NULL when user_id is None)
+        """
+        query = """
+            SELECT r.id, r.title, r.description, r.status, r.category, r.created_by,
+                   r.validated_by, r.resolved_by, r.created_at, r.resolved_at,
+                   r.location, r.image_url, r.rating,
+                   l.city, l.latitude, l.longitude,
+                   CASE WHEN %s::int IS NULL THEN NULL
+                        ELSE EXISTS (
+                            SELECT 1 FROM pinned_reports pr
+                            WHERE pr.report_id = r.id AND pr.user_id = %s
+                        )
+                   END AS is_pinned
+            FROM reports r
+            LEFT JOIN location l ON l.id = r.location
+            WHERE r.id = %s
+        """
+        with self.conn.cursor() as cur:
+            cur.execute(query, (user_id, user_id, report_id))
+            return cur.fetchone()
+
+    def get_report_version(self, report_id: int):
+        """Return the report's updated_at (its row version), or None if missing."""
+        query = "SELECT updated_at FROM reports WHERE id = %s"
+        with self.conn.cursor() as cur:
+            cur.execute(query, (report_id,))
+            row = cur.fetchone()
+            return row[0] if row else None
+
     def create_report(
         self,
         title: str,
@@ -111,8 +385,116 @@ class ReportsDAO:
                     (created_by,),
                 )
             self.conn.commit()
+            self._invalidate_caches()
             return new_report
 
+    def create_reports_batch(self, reports: list[dict]):
+        """
+        Insert many reports in one transaction.
+
+        Rows are written with a single INSERT ... SELECT from unnest()ed
+        arrays, matched back to their items by ordinal, and each author's
+        total_reports is bumped once by their row count.
+        Items whose user or location does not exist are skipped instead of
+        failing the whole batch.
+
+        Args:
+            reports (list[dict]): Items with title, description, category,
+                location_id, image_url and created_by (already validated)
+
+        Returns:
+            list[tuple]: One (row, error_msg) pair per input item, in order;
+            row is None when the item was skipped
+        """
+        if not reports:
+            return []
+
+        user_ids = list({r["created_by"] for r in reports if r["created_by"] is not None})
+        location_ids = list(
+            {r["location_id"] for r in reports if r["location_id"] is not None}
+        )
+
+        with self.conn:
+            with self.conn.cursor() as cur:
+                cur.execute("SELECT id FROM users WHERE id = ANY(%s)", (user_ids,))
+                known_users = {row[0] for row in cur.fetchall()}
+                cur.execute("SELECT id FROM location WHERE id = ANY(%s)", (location_ids,))
+                known_locations = {row[0] for row in cur.fetchall()}
+
+                results = [None] * len(reports)
+                to_insert = []
+                for i, r in enumerate(reports):
+                    if r["created_by"] is not None and r["created_by"] not in known_users:
+                        results[i] = (None, "User not found")
+                    elif (
+                        r["location_id"] is not None
+                        and r["location_id"] not in known_locations
+                    ):
+                        results[i] = (None, "Location not found")
+                    else:
+                        to_insert.append(i)
+
+                if to_insert:
+                    items = [reports[i] for i in to_insert]
+                    # Ids are drawn in the input CTE, tagged with each item's
+                    # ordinal, and joined back to the inserted rows: neither id
+                    # assignment nor RETURNING order is guaranteed to follow
+                    # the input under concurrent inserts
+                    cur.execute(
+                        """
+                        WITH input AS (
+                            SELECT nextval(pg_get_serial_sequence('reports', 'id')) AS id, t.*
+                            FROM unnest(
+                                %s::varchar[], %s::text[], %s::varchar[],
+                                %s::int[], %s::varchar[], %s::int[]
+                            ) WITH ORDINALITY
+                                AS t(title, description, category, location, image_url,
+                                     created_by, ord)
+                        ), inserted AS (
+                            INSERT INTO reports
+                                (id, title, description, category, location, image_url, created_by)
+                            SELECT id, title, description, category, location, image_url, created_by
+                            FROM input
+                            RETURNING id, title, description, status, category, created_by,
+                                      validated_by, resolved_by, created_at, resolved_at,
+                                      location, image_url, rating
+                        )
+                        SELECT inserted.*
+                        FROM inserted
+                        JOIN input USING (id)
+                        ORDER BY input.ord
+                        """,
+                        (
+                            [r["title"] for r in items],
+                            [r["description"] for r in items],
+                            [r["category"] for r in items],
+                            [r["location_id"] for r in items],
+                            [r["image_url"] for r in items],
+                            [r["created_by"] for r in items],
+                        ),
+                    )
+                    rows = cur.fetchall()
+                    per_user = {}
+                    for i, row in zip(to_insert, rows):
+                        results[i] = (row, None)
+                        if row[5] is not None:
+                            per_user[row[5]] = per_user.get(row[5], 0) + 1
+
+                    if per_user:
+                        cur.execute(
+                            """
+                            UPDATE users u
+                            SET total_reports = u.total_reports + c.n
+                            FROM unnest(%s::int[], %s::int[]) AS c(id, n)
+                            WHERE u.id = c.id
+                            """,
+                            (list(per_user.keys()), list(per_user.values())),
+                        )
+
+        if to_insert:
+            self._invalidate_caches()
+        return results
+
     def update_report(
         self,
         report_id: int,
@@ -181,8 +563,75 @@ class ReportsDAO:
         with self.conn.cursor() as cur:
             cur.execute(query, params)
             self.conn.commit()
+            self._invalidate_caches()
             return cur.fetchone()
 
+    def update_reports_status(
+        self,
+        report_ids: list[int],
+        status: str,
+        validated_by: int | None = None,
+        resolved_by: int | None = None,
+        allowed_categories: list[str] | None = None,
+    ):
+        """
+        Apply one status transition to many reports with a single UPDATE.
+
+        Args:
+            report_ids (list[int]): Reports to update
+            status (str): New status
+            validated_by (int, optional): Admin recorded as validator
+            resolved_by (int, optional): Admin recorded as resolver; also
+                stamps resolved_at = NOW()
+            allowed_categories (list[str], optional): Only reports in these
+                categories are touched (department restriction)
+
+        Returns:
+            tuple: (updated rows, ids that exist but were outside
+            allowed_categories, ids that do not exist)
+        """
+        fields = ["status = %s"]
+        params = [status]
+        if validated_by is not None:
+            fields.append("validated_by = %s")
+            params.append(validated_by)
+        if resolved_by is not None:
+            fields.append("resolved_by = %s")
+            fields.append("resolved_at = NOW()")
+            params.append(resolved_by)
+
+        where = ["id = ANY(%s)"]
+        params.append(report_ids)
+        if allowed_categories:
+            where.append("category = ANY(%s)")
+            params.append(list(allowed_categories))
+
+        query = f"""
+            UPDATE reports
+            SET {', '.join(fields)}
+            WHERE {' AND '.join(where)}
+            RETURNING id, title, description, status, category, created_by,
+                      validated_by, resolved_by, created_at, resolved_at,
+                      location, image_url, rating
+        """
+        with self.conn.cursor() as cur:
+            cur.execute(query, params)
+            rows = cur.fetchall()
+
+            updated_ids = {row[0] for row in rows}
+            missing = [rid for rid in report_ids if rid not in updated_ids]
+            forbidden_ids = set()
+            if missing:
+                cur.execute("SELECT id FROM reports WHERE id = ANY(%s)", (missing,))
+                forbidden_ids = {row[0] for row in cur.fetchall()}
+            self.conn.commit()
+
+        if rows:
+            self._invalidate_caches()
+        forbidden = [rid for rid in missing if rid in forbidden_ids]
+        not_found = [rid for rid in missing if rid not in forbidden_ids]
+        return rows, forbidden, not_found
+
     def delete_report(self, report_id: int):
         """Delete a report by ID, return True if deleted."""
         query = """
@@ -193,6 +642,7 @@ class ReportsDAO:
         with self.conn.cursor() as cur:
             cur.execute(query, (report_id,))
             self.conn.commit()
+            self._invalidate_caches()
             return cur.fetchone() is not None
 
     # ------------------------------------------------------------
@@ -207,15 +657,34 @@ class ReportsDAO:
         offset: int = 0,
         sort: str | None = None,
         allowed_categories: list[str] | None = None,
+        after: tuple | None = None,
+        before: tuple | None = None,
+        count_mode: str = COUNT_EXACT,
+        search_mode: str = SEARCH_FULL,
     ):
-        """Search and filter reports with pagination, sorting, and optional admin restrictions."""
+        """
+        Search and filter reports with pagination, sorting, and optional admin restrictions.
+
+        `q` is matched against the search_vector full-text index; `search_mode`
+        picks stemmed (full) or prefix (typeahead) matching. sort='relevance'
+        orders by ts_rank_cd instead of created_at.
+        """
         where = []
         params: list = []
+        rank_sql = None
+        rank_params: list = []
 
         if q:
-            where.append("(title ILIKE %s OR description ILIKE %s)")
-            like = f"%{q}%"
-            params.extend([like, like])
+            tsquery_sql, tsquery_params = _build_tsquery(q, search_mode)
+            if not tsquery_sql:
+                # Nothing searchable (e.g. only punctuation) matches nothing
+                where.append("FALSE")
+            else:
+                where.append(f"search_vector @@ {tsquery_sql}")
+                params.extend(tsquery_params)
+                if sort and sort.strip().lower() == "relevance":
+                    rank_sql = f"ts_rank_cd(search_vector, {tsquery_sql})"
+                    rank_params = tsquery_params
         if status:
             where.append("status = %s")
             params.append(status)
@@ -226,27 +695,10 @@ class ReportsDAO:
             where.append("category = ANY(%s)")
             params.append(allowed_categories)
 
-        where_sql = f" WHERE {' AND '.join(where)}" if where else ""
-        order_dir = _normalize_sort(sort)
-
-        count_sql = f"SELECT COUNT(*) FROM reports{where_sql}"
-        data_sql = f"""
-            SELECT id, title, description, status, category, created_by,
-                   validated_by, resolved_by, created_at, resolved_at,
-                   location, image_url, rating
-            FROM reports
-            {where_sql}
-            ORDER BY created_at {order_dir}, id {order_dir}
-            LIMIT %s OFFSET %s
-        """
-
-        with self.conn.cursor() as cur:
-            cur.execute(count_sql, params)
-            total_count = cur.fetchone()[0]
-
-            cur.execute(data_sql, params + [limit, offset])
-            rows = cur.fetchall()
-
+        total_count = self._count_reports(where, params, count_mode)
+        rows = self._fetch_report_page(
+            where, params, limit, offset, sort, after, before, rank_sql, rank_params
+        )
         return rows, total_count
 
     def get_user_rating_status(self, report_id, user_id):
@@ -310,71 +762,83 @@ class ReportsDAO:
     # -------------------------------
     # User-specific reports
     # -------------------------------
-    def get_reports_by_user(self, user_id: int, limit: int, offset: int, sort: str | None = None):
-        order_dir = _normalize_sort(sort)
-        query = f"""
-            SELECT id, title, description, status, category, created_by,
-                   validated_by, resolved_by, created_at, resolved_at,
-                   location, image_url, rating
-            FROM reports
-            WHERE created_by = %s
-            ORDER BY created_at {order_dir}, id {order_dir}
-            LIMIT %s OFFSET %s
-        """
-        with self.conn.cursor() as cur:
-            cur.execute(query, (user_id, limit, offset))
-            return cur.fetchall()
+    def get_reports_by_user(
+        self,
+        user_id: int,
+        limit: int,
+        offset: int,
+        sort: str | None = None,
+        after: tuple | None = None,
+        before: tuple | None = None,
+    ):
+        return self._fetch_report_page(
+            ["created_by = %s"], [user_id], limit, offset, sort, after, before
+        )
 
-    def get_user_reports_count(self, user_id: int):
-        query = "SELECT COUNT(*) FROM reports WHERE created_by = %s"
-        with self.conn.cursor() as cur:
-            cur.execute(query, (user_id,))
-            return cur.fetchone()[0]
+    def get_user_reports_count(self, user_id: int, mode: str = COUNT_EXACT):
+        return self._count_reports(["created_by = %s"], [user_id], mode)
 
     # -------------------------------
     # Dashboard / Stats
     # -------------------------------
-    def get_overview_stats(self):
+    def _get_report_counters(self):
+        """Rows of the trigger-maintained report_counters table (category x status)."""
         query = """
-            SELECT
-                COUNT(*) as total_reports,
-                COUNT(CASE WHEN status = 'open' THEN 1 END) as open_reports,
-                COUNT(CASE WHEN status = 'in_progress' THEN 1 END) as in_progress_reports,
-                COUNT(CASE WHEN status = 'resolved' THEN 1 END) as resolved_reports,
-                COUNT(CASE WHEN status = 'denied' THEN 1 END) as denied_reports,
-                COUNT(DISTINCT created_by) as unique_reporters,
-                COALESCE(AVG(rating), 0) as avg_rating,
-                COUNT(CASE WHEN rating IS NOT NULL THEN 1 END) as rated_reports
-            FROM reports
+            SELECT category, status, report_count, rated_count, rating_sum
+            FROM report_counters
+            WHERE report_count > 0
         """
         with self.conn.cursor() as cur:
             cur.execute(query)
-            result = cur.fetchone()
-            return {
-                "total_reports": result[0],
-                "open_reports": result[1],
-                "in_progress_reports": result[2],
-                "resolved_reports": result[3],
-                "denied_reports": result[4],
-                "unique_reporters": result[5],
-                "avg_rating": float(result[6]) if result[6] else 0,
-                "rated_reports": result[7],
-            }
+            return cur.fetchall()
+
+    def get_overview_stats(self):
+        """Overview totals read from report_counters instead of scanning reports."""
+        counters = self._get_report_counters()
+        with self.conn.cursor() as cur:
+            cur.execute("SELECT COUNT(*) FROM reporter_counters")
+            unique_reporters = cur.fetchone()[0]
+
+        by_status = {}
+        rated_reports = 0
+        rating_sum = 0
+        for _category, status, report_count, rated_count, status_rating_sum in counters:
+            by_status[status] = by_status.get(status, 0) + report_count
+            rated_reports += rated_count
+            rating_sum += status_rating_sum
+
+        return {
+            "total_reports": sum(by_status.values()),
+            "open_reports": by_status.get("open", 0),
+            "in_progress_reports": by_status.get("in_progress", 0),
+            "resolved_reports": by_status.get("resolved", 0),
+            "denied_reports": by_status.get("denied", 0),
+            "unique_reporters": unique_reporters,
+            "avg_rating": float(rating_sum) / rated_reports if rated_reports else 0,
+            "rated_reports": rated_reports,
+        }
 
     def get_department_stats(self, department: str):
-        query = """
+        query = f"""
             SELECT
                 d.department,
-                COUNT(r.id) as total_reports,
-                COUNT(CASE WHEN r.status = 'open' THEN 1 END) as open_reports,
-                COUNT(CASE WHEN r.status = 'in_progress' THEN 1 END) as in_progress_reports,
-                COUNT(CASE WHEN r.status = 'resolved' THEN 1 END) as resolved_reports,
-                COALESCE(AVG(r.rating), 0) as avg_rating
+                s.total_reports,
+                s.open_reports,
+                s.in_progress_reports,
+                s.resolved_reports,
+                s.avg_rating
             FROM department_admins d
             LEFT JOIN administrators a ON d.admin_id = a.id
-            LEFT JOIN reports r ON (r.validated_by = a.id OR r.resolved_by = a.id)
+            CROSS JOIN LATERAL (
+                SELECT
+                    COUNT(*) as total_reports,
+                    COUNT(CASE WHEN h.status = 'open' THEN 1 END) as open_reports,
+                    COUNT(CASE WHEN h.status = 'in_progress' THEN 1 END) as in_progress_reports,
+                    COUNT(CASE WHEN h.status = 'resolved' THEN 1 END) as resolved_reports,
+                    COALESCE(AVG(h.rating), 0) as avg_rating
+                FROM ({handled_reports_sql("a.id", "r.status, r.rating")}) h
+            ) s
             WHERE d.department = %s
-            GROUP BY d.department
         """
         with self.conn.cursor() as cur:
             cur.execute(query, (department,))
@@ -391,88 +855,235 @@ class ReportsDAO:
             }
 
     def get_admin_dashboard(self):
+        """
+        Recent reports plus category/status/department breakdowns. The
+        breakdowns come from report_counters, so only the recent list
+        touches reports (through idx_reports_created_at).
+        """
         recent_reports_query = """
             SELECT id, title, status, category, created_at
             FROM reports
             ORDER BY created_at DESC
             LIMIT 10
         """
-        category_stats_query = """
-            SELECT category, COUNT(*),
-                COUNT(CASE WHEN status = 'resolved' THEN 1 END) as resolved
-            FROM reports
-            GROUP BY category
-        """
-        status_stats_query = "SELECT status, COUNT(*) FROM reports GROUP BY status"
-
         with self.conn.cursor() as cur:
             cur.execute(recent_reports_query)
             recent_reports = cur.fetchall()
-            cur.execute(category_stats_query)
-            category_stats = cur.fetchall()
-            cur.execute(status_stats_query)
-            status_stats = cur.fetchall()
+        counters = self._get_report_counters()
 
-            return {
-                "recent_reports": [
-                    {"id": r[0], "title": r[1], "status": r[2], "category": r[3], "created_at": r[4]}
-                    for r in recent_reports
-                ],
-                "category_stats": [{"category": s[0], "total": s[1], "resolved": s[2]} for s in category_stats],
-                "status_stats": [{"status": s[0], "count": s[1]} for s in status_stats],
-            }
+        category_stats: dict[str, dict] = {}
+        status_stats: dict[str, int] = {}
+        department_stats: dict[str, dict] = {}
+        for category, status, report_count, _rated, _rating_sum in counters:
+            cat = category_stats.setdefault(category, {"category": category, "total": 0, "resolved": 0})
+            cat["total"] += report_count
+            status_stats[status] = status_stats.get(status, 0) + report_count
+
+            department = CATEGORY_TO_DEPARTMENT.get(category)
+            if department:
+                dept = department_stats.setdefault(
+                    department, {"department": department, "total": 0, "resolved": 0}
+                )
+                dept["total"] += report_count
+            if status == "resolved":
+                cat["resolved"] += report_count
+                if department:
+                    dept["resolved"] += report_count
+
+        return {
+            "recent_reports": [
+                {"id": r[0], "title": r[1], "status": r[2], "category": r[3], "created_at": r[4]}
+                for r in recent_reports
+            ],
+            "category_stats": list(category_stats.values()),
+            "status_stats": [{"status": k, "count": v} for k, v in status_stats.items()],
+            "department_stats": list(department_stats.values()),
+        }
+
+    def reconcile_report_counters(self):
+        """
+        Rebuild report_counters, reporter_counters and report_rollups from reports.
+
+        The counter tables are locked first so concurrent report writes wait
+        instead of racing the rebuild. Returns how many counter rows differed.
+        """
+        snapshot_query = """
+            SELECT 'c:' || category || ':' || status, report_count, rated_count, rating_sum
+            FROM report_counters WHERE report_count > 0
+            UNION ALL
+            SELECT 'u:' || user_id, report_count, 0, 0
+            FROM reporter_counters WHERE report_count > 0
+            UNION ALL
+            SELECT 'r:' || granularity || ':' || bucket_start || ':' || category || ':' || status,
+                   report_count, 0, 0
+            FROM report_rollups WHERE report_count > 0
+        """
+        with self.conn.cursor() as cur:
+            cur.execute(
+                "LOCK TABLE report_counters, reporter_counters, report_rollups IN EXCLUSIVE MODE"
+            )
+            cur.execute(snapshot_query)
+            before = {row[0]: row[1:] for row in cur.fetchall()}
+
+            cur.execute("DELETE FROM report_counters")
+            cur.execute("""
+                INSERT INTO report_counters (category, status, report_count, rated_count, rating_sum)
+                SELECT COALESCE(category, 'unknown'), COALESCE(status, 'unknown'),
+                       COUNT(*), COUNT(rating), COALESCE(SUM(rating), 0)
+                FROM reports
+                GROUP BY 1, 2
+            """)
+            cur.execute("DELETE FROM reporter_counters")
+            cur.execute("""
+                INSERT INTO reporter_counters (user_id, report_count)
+                SELECT created_by, COUNT(*)
+                FROM reports
+                WHERE created_by IS NOT NULL
+                GROUP BY created_by
+            """)
+            cur.execute("DELETE FROM report_rollups")
+            cur.execute("""
+                INSERT INTO report_rollups (granularity, bucket_start, category, status, report_count)
+                SELECT g, date_trunc(g, created_at), COALESCE(category, 'unknown'),
+                       COALESCE(status, 'unknown'), COUNT(*)
+                FROM reports
+                CROSS JOIN unnest(ARRAY['hour', 'day']) AS g
+                WHERE created_at IS NOT NULL
+                GROUP BY 1, 2, 3, 4
+            """)
+
+            cur.execute(snapshot_query)
+            after = {row[0]: row[1:] for row in cur.fetchall()}
+        self.conn.commit()
+
+        return sum(1 for key in before.keys() | after.keys() if before.get(key) != after.get(key))
 
     # -------------------------------
-    # Pending / Assigned reports
+    # Streaming
     # -------------------------------
-    def get_pending_reports(self, limit: int, offset: int, sort: str | None = None):
-        order_dir = _normalize_sort(sort)
-        query = f"""
-            SELECT id, title, description, status, category, created_by,
-                   validated_by, resolved_by, created_at, resolved_at,
-                   location, image_url, rating
-            FROM reports
-            WHERE status = 'open'
-            ORDER BY created_at {order_dir}, id {order_dir}
-            LIMIT %s OFFSET %s
+    def iter_reports(
+        self,
+        where_clauses: list[str],
+        params: list,
+        batch_size: int = EXPORT_BATCH_SIZE,
+    ):
         """
-        with self.conn.cursor() as cur:
-            cur.execute(query, (limit, offset))
-            return cur.fetchall()
+        Yield report rows (same shape as get_report_by_id) newest first;
+        see iter_report_rows.
+        """
+        yield from iter_report_rows(self.conn, where_clauses, params, batch_size)
 
-    def get_pending_reports_count(self):
-        query = "SELECT COUNT(*) FROM reports WHERE status = 'open'"
-        with self.conn.cursor() as cur:
-            cur.execute(query)
-            return cur.fetchone()[0]
+    def iter_reports_export(
+        self,
+        status: str | None = None,
+        category: str | None = None,
+        created_from=None,
+        created_to=None,
+    ):
+        """
+        Stream reports for export, optionally filtered by status, category
+        and a [created_from, created_to) range on created_at.
+        """
+        where_clauses = []
+        params = []
+        if status:
+            where_clauses.append("status = %s")
+            params.append(status)
+        if category:
+            where_clauses.append("category = %s")
+            params.append(category)
+        if created_from is not None:
+            where_clauses.append("created_at >= %s")
+            params.append(created_from)
+        if created_to is not None:
+            where_clauses.append("created_at < %s")
+            params.append(created_to)
+        return self.iter_reports(where_clauses, params)
 
-    def get_assigned_reports(self, admin_id: int, limit: int, offset: int, sort: str | None = None):
-        order_dir = _normalize_sort(sort)
-        query = f"""
-            SELECT id, title, description, status, category, created_by,
-                   validated_by, resolved_by, created_at, resolved_at,
-                   location, image_url, rating
-            FROM reports
-            WHERE (validated_by = %s OR resolved_by = %s) AND status != 'resolved'
-            ORDER BY created_at {order_dir}, id {order_dir}
-            LIMIT %s OFFSET %s
+    # -------------------------------
+    # Map clustering
+    # -------------------------------
+    def get_report_location_counts(self):
         """
-        with self.conn.cursor() as cur:
-            cur.execute(query, (admin_id, admin_id, limit, offset))
-            return cur.fetchall()
+        Report counts per location and (category, status), used to build the
+        in-process geohash grid.
 
-    def get_assigned_reports_count(self, admin_id: int):
+        Row shape:
+        [0] latitude
+        [1] longitude
+        [2] category
+        [3] status
+        [4] report_count
+        """
         query = """
-            SELECT COUNT(*) FROM reports
-            WHERE (validated_by = %s OR resolved_by = %s) AND status != 'resolved'
+            SELECT l.latitude, l.longitude, r.category, r.status, COUNT(*)
+            FROM reports r
+            JOIN location l ON l.id = r.location
+            GROUP BY l.id, l.latitude, l.longitude, r.category, r.status
         """
         with self.conn.cursor() as cur:
-            cur.execute(query, (admin_id, admin_id))
-            return cur.fetchone()[0]
+            cur.execute(query)
+            return cur.fetchall()
+
+    # -------------------------------
+    # Pending / Assigned reports
+    # -------------------------------
+    def get_pending_reports(
+        self,
+        limit: int,
+        offset: int,
+        sort: str | None = None,
+        after: tuple | None = None,
+        before: tuple | None = None,
+    ):
+        return self._fetch_report_page(
+            ["status = 'open'"], [], limit, offset, sort, after, before
+        )
+
+    def get_pending_reports_count(self, mode: str = COUNT_EXACT):
+        return self._count_reports(["status = 'open'"], [], mode)
+
+    def get_assigned_reports(
+        self,
+        admin_id: int,
+        limit: int,
+        offset: int,
+        sort: str | None = None,
+        after: tuple | None = None,
+        before: tuple | None = None,
+    ):
+        # Validated and resolved branches are read through the partial
+        # (validated_by|resolved_by, created_at, id) indexes and merged
+        return self._fetch_report_page(
+            ["status != 'resolved'"],
+            [],
+            limit,
+            offset,
+            sort,
+            after,
+            before,
+            branches=[
+                (["validated_by = %s"], [admin_id]),
+                (["resolved_by = %s", "validated_by IS DISTINCT FROM %s"], [admin_id, admin_id]),
+            ],
+        )
+
+    def get_assigned_reports_count(self, admin_id: int, mode: str = COUNT_EXACT):
+        # Same branches as get_assigned_reports: each count is an index-only
+        # scan of its partial index instead of a heap visit per candidate row
+        return self._count_reports(
+            ["status != 'resolved'"],
+            [],
+            mode,
+            branches=[
+                (["validated_by = %s"], [admin_id]),
+                (["resolved_by = %s", "validated_by IS DISTINCT FROM %s"], [admin_id, admin_id]),
+            ],
+        )
 
     # -------------------------------
     # Cleanup
     # -------------------------------
     def close(self):
-        if self.conn:
-            self.conn.close()
+        release_db(self.conn)
+        self.conn = None
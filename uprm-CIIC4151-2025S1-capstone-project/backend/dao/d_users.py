@@ -1,10 +1,13 @@
 from dotenv import load_dotenv
-from load import load_db
+from load import load_db, release_db
+from metrics import instrument_dao
+from cache import invalidate_admin_scope
 
 # Add near the top if not present
 VALID_DEPARTMENTS = ("DTOP", "LUMA", "AAA", "DDS")
 
 
+@instrument_dao
 class UsersDAO:
 
     def __init__(self):
@@ -112,6 +115,8 @@ class UsersDAO:
         with self.conn.cursor() as cur:
             cur.execute(query, params)
             self.conn.commit()
+            if admin is not None:
+                invalidate_admin_scope(user_id)
             return cur.fetchone()
 
     def delete_user(self, user_id):
@@ -123,6 +128,7 @@ class UsersDAO:
         with self.conn.cursor() as cur:
             cur.execute(query, (user_id,))
             self.conn.commit()
+            invalidate_admin_scope(user_id)
             return cur.fetchone()
 
     # =============================================================================
@@ -300,6 +306,7 @@ class UsersDAO:
                 # Flip users.admin to TRUE
                 cur.execute("UPDATE users SET admin = TRUE WHERE id = %s", (user_id,))
 
+        invalidate_admin_scope(user_id)
         return {
             "success": True,
             "department": department,
@@ -307,5 +314,5 @@ class UsersDAO:
         }
 
     def close(self):
-        if self.conn:
-            self.conn.close()
+        release_db(self.conn)
+        self.conn = None
@@ -0,0 +1,46 @@
+import hashlib
+
+from flask import request
+from werkzeug.http import quote_etag
+
+from constants import HTTP_STATUS
+
+
+def make_etag(*parts) -> str:
+    """
+    Build a strong ETag from row versions and the request's path and args.
+
+    Args:
+        *parts: Values the response body depends on (ids, updated_at, totals...)
+
+    Returns:
+        str: Unquoted ETag value
+    """
+    args = sorted(request.args.items(multi=True))
+    digest = hashlib.sha1(repr((request.path, args, parts)).encode())
+    return digest.hexdigest()
+
+
+def is_conditional() -> bool:
+    """
+    True if the request carries If-None-Match.
+
+    Only then is it worth querying row versions before the full rows; an
+    unconditional request computes its ETag from the rows it fetches anyway.
+    """
+    return bool(request.if_none_match)
+
+
+def is_not_modified(etag: str) -> bool:
+    """True if the client's If-None-Match already holds this ETag."""
+    return etag in request.if_none_match
+
+
+def not_modified(etag: str):
+    """Empty 304 response carrying the ETag."""
+    return "", HTTP_STATUS.NOT_MODIFIED, {"ETag": quote_etag(etag)}
+
+
+def etag_header(etag: str) -> dict:
+    """Headers to attach the ETag to a full response."""
+    return {"ETag": quote_etag(etag)}
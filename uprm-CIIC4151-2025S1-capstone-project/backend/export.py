@@ -0,0 +1,89 @@
+"""
+Stream query results as CSV or NDJSON.
+
+Rows come from a generator (e.g. a server-side cursor) and are encoded in
+small batches inside a Flask streaming response, so memory use does not
+grow with the number of rows.
+"""
+
+import csv
+import io
+import json
+from datetime import date, datetime
+from decimal import Decimal
+
+from flask import Response, stream_with_context
+
+EXPORT_FORMATS = {"csv": "text/csv", "ndjson": "application/x-ndjson"}
+# Rows encoded per chunk handed to the WSGI server
+EXPORT_FLUSH_ROWS = 500
+
+
+def _plain(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return float(value)
+    return value
+
+
+def _encode(rows, columns, fmt):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer) if fmt == "csv" else None
+    if writer:
+        writer.writerow(columns)
+
+    pending = 0
+    for row in rows:
+        values = [_plain(v) for v in row]
+        if writer:
+            writer.writerow(values)
+        else:
+            buffer.write(json.dumps(dict(zip(columns, values)), ensure_ascii=False))
+            buffer.write("\n")
+        pending += 1
+        if pending >= EXPORT_FLUSH_ROWS:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+            pending = 0
+
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+def stream_rows(rows, columns, fmt, filename=None):
+    """
+    Build a streaming response for an iterator of row tuples.
+
+    The first row is fetched right away, so a failing query raises here
+    (and the view can answer 500) instead of cutting off a 200 stream. The
+    rest is consumed lazily while the response is sent, after the view has
+    returned and the request's DB connection has been released, so the
+    iterator must hold its own (see load.detached_db).
+
+    Args:
+        rows: Iterator of tuples matching `columns`
+        columns (list[str]): Column names (CSV header / NDJSON keys)
+        fmt (str): 'csv' or 'ndjson'
+        filename (str, optional): Sets Content-Disposition for downloads
+
+    Returns:
+        flask.Response
+    """
+    rows = iter(rows)
+    first = next(rows, None)
+
+    def all_rows():
+        if first is not None:
+            yield first
+            yield from rows
+
+    response = Response(
+        stream_with_context(_encode(all_rows(), columns, fmt)),
+        mimetype=EXPORT_FORMATS[fmt],
+    )
+    if filename:
+        response.headers["Content-Disposition"] = f'attachment; filename="{filename}"'
+    response.headers["X-Accel-Buffering"] = "no"  # let nginx pass chunks through
+    return response
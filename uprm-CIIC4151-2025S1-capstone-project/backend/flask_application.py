@@ -1,4 +1,4 @@
-from flask import Flask, request, jsonify, current_app, send_from_directory
+from flask import Flask, request, jsonify
 from flask_cors import CORS
 
 from handler.h_reports import ReportsHandler
@@ -7,34 +7,41 @@ from handler.h_administrators import AdministratorsHandler
 from handler.h_locations import LocationsHandler
 from handler.h_departments import DepartmentsHandler
 from handler.h_pinned_reports import PinnedReportsHandler
+from handler.h_uploads import UploadsHandler
+from handler.h_global_stats import bp as global_stats_bp
 
 from constants import HTTP_STATUS
 from dao.d_administrators import AdministratorsDAO
+from load import init_app as init_db_pool
+from metrics import init_app as init_metrics
+from images import init_app as init_images
+from storage import UPLOAD_MAX_BYTES, UPLOAD_SERVE_MODE, allowed_file
+from cache import TAG_DEPARTMENTS, TAG_LOCATIONS, TAG_REPORTS, TAG_STATS, cached
 
 import os
-import uuid
 from pathlib import Path
-from werkzeug.utils import secure_filename
-
-# Allowed image types
-ALLOWED_EXTENSIONS = {"png", "jpg", "jpeg", "gif", "webp"}
 
 # -------------------------------------------------------
 # APP SETUP
 # -------------------------------------------------------
 app = Flask(__name__)
 CORS(app)
+init_db_pool(app)  # one pooled DB connection per request, returned on teardown
+init_metrics(app)  # request/DAO/query timings at GET /metrics
+init_images(app)  # warns once when Pillow (image variants) is missing
+app.register_blueprint(global_stats_bp)  # /stats/summary
 
 # Upload folder setup
 BASE_DIR = Path(__file__).resolve().parent
 UPLOAD_FOLDER = BASE_DIR / "uploads"
+# Partial/temporary uploads; same filesystem as uploads/ so moves are atomic
+UPLOAD_TMP_FOLDER = BASE_DIR / "uploads_tmp"
 os.makedirs(UPLOAD_FOLDER, exist_ok=True)
 
 app.config["UPLOAD_FOLDER"] = str(UPLOAD_FOLDER)
-app.config["MAX_CONTENT_LENGTH"] = 10 * 1024 * 1024  # 10 MB limit
-
-def allowed_file(filename: str) -> bool:
-    return "." in filename and filename.rsplit(".", 1)[1].lower() in ALLOWED_EXTENSIONS
+app.config["UPLOAD_TMP_FOLDER"] = str(UPLOAD_TMP_FOLDER)
+app.config["MAX_CONTENT_LENGTH"] = UPLOAD_MAX_BYTES  # 10 MB limit by default
+app.config["USE_X_SENDFILE"] = UPLOAD_SERVE_MODE == "x-sendfile"
 
 
 # -------------------------------------------------------
@@ -52,8 +59,11 @@ def health_check():
 def upload_image():
     """
     Accepts: multipart/form-data with field "image"
-    Saves the file into /uploads
-    Returns: { "url": "/uploads/<uuid>.jpg" }
+    Stores the file content-addressed under /uploads (identical files are
+    stored once) and queues thumbnail/WebP/AVIF generation
+    Returns: { "url": "/uploads/ab/cd/<sha256>.jpg", "deduplicated": false,
+               "status": "pending",
+               "variants": { "thumb": { "webp": "/uploads/ab/cd/<sha256>_thumb.webp", ... }, ... } }
     """
     if "image" not in request.files:
         return jsonify({"error": "No image file part"}), 400
@@ -66,24 +76,56 @@ def upload_image():
     if not allowed_file(file.filename):
         return jsonify({"error": "Unsupported file type"}), 400
 
-    # secure original name and create unique file
-    original_name = secure_filename(file.filename)
-    ext = original_name.rsplit(".", 1)[1].lower()
-    unique_name = f"{uuid.uuid4().hex}.{ext}"
+    # return URL accessible by frontend; variants are produced in the background
+    return UploadsHandler().upload_multipart(file)
 
-    save_path = os.path.join(current_app.config["UPLOAD_FOLDER"], unique_name)
-    file.save(save_path)
 
-    # return URL accessible by frontend
-    public_url = f"/uploads/{unique_name}"
+@app.route("/upload/stream", methods=["POST"])
+def upload_image_stream():
+    """
+    Accepts: raw image bytes as the request body, ?filename=<name.ext>
+    Streams the body to disk in chunks while hashing it.
+    Returns: same shape as /upload
+    """
+    return UploadsHandler().upload_stream(request.args.get("filename", ""))
 
-    return jsonify({"url": public_url}), 201
 
+@app.route("/upload/sessions", methods=["POST"])
+def create_upload_session():
+    """
+    Start a resumable upload: { "filename", "size", "sha256"? }.
+    If sha256 matches stored content the upload is skipped (200 + url).
+    """
+    return UploadsHandler().create_session(request.json)
 
-# Serve uploaded files
+
+@app.route("/upload/sessions/<session_id>", methods=["GET", "PATCH", "DELETE"])
+def handle_upload_session(session_id):
+    """
+    GET: current offset (also in the Upload-Offset header)
+    PATCH: append bytes at Content-Range / Upload-Offset; completes the upload
+           once every byte has arrived
+    DELETE: abandon the session
+    """
+    handler = UploadsHandler()
+    if request.method == "GET":
+        return handler.get_session(session_id)
+    elif request.method == "PATCH":
+        return handler.append_chunk(session_id)
+    elif request.method == "DELETE":
+        return handler.delete_session(session_id)
+
+
+@app.route("/uploads/<path:filename>/variants", methods=["GET"])
+def uploaded_file_variants(filename):
+    """Processing status and variant URLs for an uploaded image."""
+    return UploadsHandler().get_variants(filename)
+
+
+# Serve uploaded files (cache headers, ranges, optional proxy offload)
 @app.route("/uploads/<path:filename>")
 def uploaded_file(filename):
-    return send_from_directory(current_app.config["UPLOAD_FOLDER"], filename)
+    return UploadsHandler().serve_file(filename)
 
 
 # -------------------------------------------------------
@@ -99,10 +141,32 @@ def handle_reports():
         limit = request.args.get("limit", default=10, type=int)
         sort = request.args.get("sort")
         admin_id = request.args.get("admin_id", type=int)
-        return handler.get_all_reports(page, limit, sort, admin_id)
+        after = request.args.get("after")
+        before = request.args.get("before")
+        count = request.args.get("count")
+        return handler.get_all_reports(page, limit, sort, admin_id, after, before, count)
+
+
+@app.route("/reports/export", methods=["GET"])
+def export_reports():
+    """Stream reports as ?format=csv|ndjson with status/category/from/to filters."""
+    handler = ReportsHandler()
+    return handler.export_reports(
+        request.args.get("format", "csv"),
+        request.args.get("status"),
+        request.args.get("category"),
+        request.args.get("from"),
+        request.args.get("to"),
+    )
+
+
+@app.route("/reports/batch", methods=["POST"])
+def create_reports_batch():
+    return ReportsHandler().create_reports_batch(request.json)
 
 
 @app.route("/reports/<int:report_id>", methods=["GET", "PUT", "DELETE"])
+@cached(TAG_REPORTS)
 def handle_report(report_id):
     handler = ReportsHandler()
     if request.method == "GET":
@@ -114,6 +178,29 @@ def handle_report(report_id):
 
 
 
+@app.route("/reports/bulk/validate", methods=["POST"])
+def validate_reports_bulk():
+    return ReportsHandler().validate_reports_bulk(request.json)
+
+
+@app.route("/reports/bulk/resolve", methods=["POST"])
+def resolve_reports_bulk():
+    return ReportsHandler().resolve_reports_bulk(request.json)
+
+
+@app.route("/reports/bulk/status", methods=["PUT"])
+def change_reports_status_bulk():
+    return ReportsHandler().change_reports_status_bulk(request.json)
+
+
+@app.route("/reports/<int:report_id>/detail", methods=["GET"])
+def get_report_detail(report_id):
+    """Report + location + pin state + rating in one call (?user_id=)."""
+    handler = ReportsHandler()
+    user_id = request.args.get("user_id", type=int)
+    return handler.get_report_detail(report_id, user_id)
+
+
 @app.route("/reports/<int:report_id>/validate", methods=["POST"])
 def validate_report(report_id):
     handler = ReportsHandler()
@@ -156,7 +243,23 @@ def change_report_status(report_id):
     return handler.change_report_status(report_id, request.json)
 
 
+@app.route("/reports/clusters", methods=["GET"])
+def get_report_clusters():
+    handler = ReportsHandler()
+    min_lat = request.args.get("min_lat", type=float)
+    min_lon = request.args.get("min_lon", type=float)
+    max_lat = request.args.get("max_lat", type=float)
+    max_lon = request.args.get("max_lon", type=float)
+    zoom = request.args.get("zoom", type=int)
+    category = request.args.get("category")
+    status = request.args.get("status")
+    return handler.get_report_clusters(
+        min_lat, min_lon, max_lat, max_lon, zoom, category, status
+    )
+
+
 @app.route("/reports/status-options", methods=["GET"])
+@cached(ttl=3600)
 def get_status_options():
     handler = ReportsHandler()
     return handler.get_status_options()
@@ -267,6 +370,7 @@ def handle_location(location_id):
 
 
 @app.route("/locations/<int:location_id>/details", methods=["GET"])
+@cached(TAG_LOCATIONS)
 def get_location_details(location_id):
     handler = LocationsHandler()
     return handler.get_location_details(location_id)
@@ -303,6 +407,17 @@ def search_locations():
 
 
 
+# -------------------------------------------------------
+# DEPARTMENTS
+# -------------------------------------------------------
+@app.route("/departments", methods=["GET"])
+@cached(TAG_DEPARTMENTS)
+def get_all_departments():
+    handler = DepartmentsHandler()
+    return handler.get_all_departments()
+
+
+
 # -------------------------------------------------------
 # ADMINISTRATORS
 # -------------------------------------------------------
@@ -470,7 +585,13 @@ def search_reports():
     page = request.args.get("page", default=1, type=int)
     limit = request.args.get("limit", default=10, type=int)
     admin_id = request.args.get("admin_id", type=int)
-    return handler.search_reports(query, page, limit, status, category, sort, admin_id)
+    after = request.args.get("after")
+    before = request.args.get("before")
+    count = request.args.get("count")
+    mode = request.args.get("mode")
+    return handler.search_reports(
+        query, page, limit, status, category, sort, admin_id, after, before, count, mode
+    )
 
 
 @app.route("/reports/filter", methods=["GET"])
@@ -482,7 +603,12 @@ def filter_reports():
     page = request.args.get("page", default=1, type=int)
     limit = request.args.get("limit", default=10, type=int)
     admin_id = request.args.get("admin_id", type=int)
-    return handler.filter_reports(status, category, page, limit, sort, admin_id)
+    after = request.args.get("after")
+    before = request.args.get("before")
+    count = request.args.get("count")
+    return handler.filter_reports(
+        status, category, page, limit, sort, admin_id, after, before, count
+    )
 
 
 @app.route("/reports/user/<int:user_id>", methods=["GET"])
@@ -490,7 +616,10 @@ def get_user_reports(user_id):
     handler = ReportsHandler()
     page = request.args.get("page", default=1, type=int)
     limit = request.args.get("limit", default=10, type=int)
-    return handler.get_reports_by_user(user_id, page, limit)
+    after = request.args.get("after")
+    before = request.args.get("before")
+    count = request.args.get("count")
+    return handler.get_reports_by_user(user_id, page, limit, after, before, count)
 
 
 
@@ -498,6 +627,7 @@ def get_user_reports(user_id):
 # STATS & ADMIN
 # -------------------------------------------------------
 @app.route("/stats/overview", methods=["GET"])
+@cached(TAG_STATS)
 def get_overview_stats():
     handler = ReportsHandler()
     return handler.get_overview_stats()
@@ -537,7 +667,10 @@ def get_pending_reports():
     handler = ReportsHandler()
     page = request.args.get("page", default=1, type=int)
     limit = request.args.get("limit", default=10, type=int)
-    return handler.get_pending_reports(page, limit)
+    after = request.args.get("after")
+    before = request.args.get("before")
+    count = request.args.get("count")
+    return handler.get_pending_reports(page, limit, after, before, count)
 
 
 
@@ -547,7 +680,10 @@ def get_assigned_reports():
     admin_id = request.args.get("admin_id", type=int)
     page = request.args.get("page", default=1, type=int)
     limit = request.args.get("limit", default=10, type=int)
-    return handler.get_assigned_reports(admin_id, page, limit)
+    after = request.args.get("after")
+    before = request.args.get("before")
+    count = request.args.get("count")
+    return handler.get_assigned_reports(admin_id, page, limit, after, before, count)
 
 
 
@@ -569,7 +705,12 @@ def system_health():
 @app.route("/api/admin/<int:admin_id>/reports", methods=["GET"])
 def get_reports_for_admin(admin_id):
     handler = AdministratorsHandler()
-    return handler.get_reports_for_admin(admin_id)
+    limit = request.args.get("limit", type=int)
+    sort = request.args.get("sort")
+    after = request.args.get("after")
+    before = request.args.get("before")
+    fmt = request.args.get("format")  # csv | ndjson streams every visible report
+    return handler.get_reports_for_admin(admin_id, limit, sort, after, before, fmt)
 
 
 # -------------------------------------------------------
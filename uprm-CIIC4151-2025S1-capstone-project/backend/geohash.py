@@ -0,0 +1,134 @@
+import math
+
+_BASE32 = "0123456789bcdefghjkmnpqrstuvwxyz"
+_DECODE = {ch: i for i, ch in enumerate(_BASE32)}
+
+
+def encode(latitude: float, longitude: float, precision: int = 8) -> str:
+    """
+    Encode a coordinate as a geohash string.
+
+    Args:
+        latitude (float): Latitude in degrees
+        longitude (float): Longitude in degrees
+        precision (int): Number of characters (cell size shrinks ~32x per char)
+
+    Returns:
+        str: Geohash of the cell containing the point
+    """
+    lat_lo, lat_hi = -90.0, 90.0
+    lon_lo, lon_hi = -180.0, 180.0
+    chars = []
+    bits = 0
+    value = 0
+    even = True  # geohash interleaves bits starting with longitude
+
+    while len(chars) < precision:
+        if even:
+            mid = (lon_lo + lon_hi) / 2
+            if longitude >= mid:
+                value = (value << 1) | 1
+                lon_lo = mid
+            else:
+                value <<= 1
+                lon_hi = mid
+        else:
+            mid = (lat_lo + lat_hi) / 2
+            if latitude >= mid:
+                value = (value << 1) | 1
+                lat_lo = mid
+            else:
+                value <<= 1
+                lat_hi = mid
+        even = not even
+        bits += 1
+        if bits == 5:
+            chars.append(_BASE32[value])
+            bits = 0
+            value = 0
+
+    return "".join(chars)
+
+
+def bounds(geohash: str):
+    """
+    Return the cell covered by a geohash.
+
+    Returns:
+        tuple: (min_lat, min_lon, max_lat, max_lon)
+    """
+    lat_lo, lat_hi = -90.0, 90.0
+    lon_lo, lon_hi = -180.0, 180.0
+    even = True
+
+    for ch in geohash:
+        value = _DECODE[ch]
+        for shift in range(4, -1, -1):
+            bit = (value >> shift) & 1
+            if even:
+                mid = (lon_lo + lon_hi) / 2
+                if bit:
+                    lon_lo = mid
+                else:
+                    lon_hi = mid
+            else:
+                mid = (lat_lo + lat_hi) / 2
+                if bit:
+                    lat_lo = mid
+                else:
+                    lat_hi = mid
+            even = not even
+
+    return lat_lo, lon_lo, lat_hi, lon_hi
+
+
+def cell_size(precision: int):
+    """
+    Return the size of a cell at `precision`.
+
+    Returns:
+        tuple: (lat_degrees, lon_degrees)
+    """
+    bits = 5 * precision
+    lon_bits = (bits + 1) // 2  # longitude takes the extra bit
+    lat_bits = bits // 2
+    return 180.0 / (1 << lat_bits), 360.0 / (1 << lon_bits)
+
+
+def _cell_span(min_lat, min_lon, max_lat, max_lon, precision):
+    """Row/column index ranges of the cells at `precision` overlapping a box."""
+    lat_step, lon_step = cell_size(precision)
+
+    def span(lo, hi, origin, step, cells):
+        # Inclusive: a cell whose edge touches the box counts as overlapping
+        first = min(max(math.ceil((lo - origin) / step) - 1, 0), cells - 1)
+        last = min(max(int((hi - origin) // step), 0), cells - 1)
+        return range(first, last + 1)
+
+    rows = span(min_lat, max_lat, -90.0, lat_step, round(180.0 / lat_step))
+    cols = span(min_lon, max_lon, -180.0, lon_step, round(360.0 / lon_step))
+    return rows, cols, lat_step, lon_step
+
+
+def covering_count(min_lat: float, min_lon: float, max_lat: float, max_lon: float, precision: int):
+    """Number of cells covering() would return, without encoding them."""
+    rows, cols, _, _ = _cell_span(min_lat, min_lon, max_lat, max_lon, precision)
+    return len(rows) * len(cols)
+
+
+def covering(min_lat: float, min_lon: float, max_lat: float, max_lon: float, precision: int):
+    """
+    Geohashes of every cell at `precision` that overlaps a bounding box.
+
+    Cells are enumerated from the box's corners, so the cost depends on the
+    box, not on how many cells hold data.
+
+    Returns:
+        list[str]
+    """
+    rows, cols, lat_step, lon_step = _cell_span(min_lat, min_lon, max_lat, max_lon, precision)
+    return [
+        encode(-90.0 + (row + 0.5) * lat_step, -180.0 + (col + 0.5) * lon_step, precision)
+        for row in rows
+        for col in cols
+    ]
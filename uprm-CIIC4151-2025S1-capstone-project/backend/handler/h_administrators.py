@@ -1,6 +1,9 @@
 from flask import request, jsonify
 from dao.d_administrators import AdministratorsDAO
+from handler.h_reports import ReportsHandler
 from constants import HTTP_STATUS
+from export import EXPORT_FORMATS, stream_rows
+from pagination import InvalidCursorError, decode_cursors, page_cursors
 
 
 class AdministratorsHandler:
@@ -450,8 +453,19 @@ class AdministratorsHandler:
     # -------------------------------------------------------
     # REPORTS VISIBLE TO ADMIN (DEPARTMENT FILTER)
     # -------------------------------------------------------
-    def get_reports_for_admin(self, admin_id):
-        """Get reports filtered by the administrator's department"""
+    # Page size bounds for /api/admin/<id>/reports
+    ADMIN_REPORTS_DEFAULT_LIMIT = 50
+    ADMIN_REPORTS_MAX_LIMIT = 500
+
+    def get_reports_for_admin(
+        self, admin_id, limit=None, sort=None, after=None, before=None, fmt=None
+    ):
+        """
+        Get reports filtered by the administrator's department.
+
+        Returns one keyset page (nextCursor/prevCursor) by default; with
+        fmt='csv' or 'ndjson' every visible report is streamed instead.
+        """
         try:
             dao = AdministratorsDAO()
 
@@ -462,41 +476,58 @@ class AdministratorsHandler:
                     jsonify({"error_msg": "Administrator not found"}),
                     HTTP_STATUS.NOT_FOUND,
                 )
+            department = administrator[1]  # department index
 
-            # Fetch reports using the SQL-based department filter
-            reports = dao.get_reports_for_admin(admin_id)
+            if fmt:
+                if fmt not in EXPORT_FORMATS:
+                    return (
+                        jsonify({"error_msg": f"format must be one of: {list(EXPORT_FORMATS)}"}),
+                        HTTP_STATUS.BAD_REQUEST,
+                    )
+                return stream_rows(
+                    dao.iter_reports_for_admin(department),
+                    ReportsHandler.REPORT_COLUMNS,
+                    fmt,
+                    f"reports_{department}.{fmt}",
+                )
 
-            reports_list = []
-            for r in reports:
-                reports_list.append(
-                    {
-                        "id": r[0],
-                        "title": r[1],
-                        "description": r[2],
-                        "status": r[3],
-                        "category": r[4],
-                        "created_by": r[5],
-                        "validated_by": r[6],
-                        "resolved_by": r[7],
-                        "created_at": r[8],
-                        "resolved_at": r[9],
-                        "location": r[10],
-                        "image_url": r[11],
-                        "rating": r[12],
-                    }
+            if limit is None:
+                limit = self.ADMIN_REPORTS_DEFAULT_LIMIT
+            if limit < 1 or limit > self.ADMIN_REPORTS_MAX_LIMIT:
+                return (
+                    jsonify(
+                        {"error_msg": f"limit must be between 1 and {self.ADMIN_REPORTS_MAX_LIMIT}"}
+                    ),
+                    HTTP_STATUS.BAD_REQUEST,
                 )
+            after_key, before_key = decode_cursors(after, before)
+
+            # Fetch one extra row to know whether another page exists
+            reports = dao.get_reports_for_admin(
+                department, limit + 1, sort, after=after_key, before=before_key
+            )
+            reports, next_cursor, prev_cursor = page_cursors(
+                reports, limit, 1, after, before
+            )
+
+            reports_list = [dict(zip(ReportsHandler.REPORT_COLUMNS, r)) for r in reports]
 
             return (
                 jsonify(
                     {
                         "admin_id": admin_id,
-                        "department": administrator[1],  # department index
+                        "department": department,
                         "reports": reports_list,
                         "count": len(reports_list),
+                        "limit": limit,
+                        "nextCursor": next_cursor,
+                        "prevCursor": prev_cursor,
                     }
                 ),
                 HTTP_STATUS.OK,
             )
 
+        except InvalidCursorError as e:
+            return jsonify({"error_msg": str(e)}), HTTP_STATUS.BAD_REQUEST
         except Exception as e:
             return jsonify({"error_msg": str(e)}), HTTP_STATUS.INTERNAL_SERVER_ERROR
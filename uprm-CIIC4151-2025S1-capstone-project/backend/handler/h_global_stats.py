@@ -1,14 +1,130 @@
-from flask import Blueprint, jsonify
+import os
+from datetime import datetime, timedelta
+
+from flask import Blueprint, jsonify, request
 from dao.d_global_stats import GlobalStatsDAO
+from cache import TAG_STATS, cached
+from constants import CATEGORY_TO_DEPARTMENT, HTTP_STATUS
+
+# Length of each top-N list; ?top= overrides per request (capped)
+STATS_TOP_N = int(os.getenv("STATS_TOP_N", "5"))
+STATS_TOP_N_MAX = 50
+
+# /stats/timeseries: bucket sizes, default window and the most buckets per series
+TIMESERIES_STEPS = {"hour": timedelta(hours=1), "day": timedelta(days=1), "week": timedelta(weeks=1)}
+TIMESERIES_DEFAULT_SPAN = {"hour": timedelta(days=2), "day": timedelta(days=30), "week": timedelta(weeks=26)}
+TIMESERIES_MAX_BUCKETS = 2000
+TIMESERIES_GROUPS = ("category", "status", "department")
+
 bp = Blueprint("global_stats", __name__)
 
 @bp.get("/stats/summary")
+@cached(TAG_STATS)
 def summary():
-    dao = GlobalStatsDAO()
+    n = request.args.get("top", default=STATS_TOP_N, type=int)
+    if n < 1 or n > STATS_TOP_N_MAX:
+        return jsonify({"error_msg": f"top must be between 1 and {STATS_TOP_N_MAX}"}), HTTP_STATUS.BAD_REQUEST
+    parallel = request.args.get("parallel", type=lambda v: v.lower() in ("1", "true"))
+    try:
+        dao = GlobalStatsDAO()
+        return jsonify(dao.summary(n, parallel=parallel)), HTTP_STATUS.OK
+    except Exception as e:
+        return jsonify({"error_msg": str(e)}), HTTP_STATUS.INTERNAL_SERVER_ERROR
+
+
+def _parse_time(value):
+    """
+    ISO date/datetime. Values with an offset stay aware and are converted
+    by the database; naive ones are taken as database local time, like the
+    naive reports.created_at they are compared with.
+    """
+    return datetime.fromisoformat(value)
+
+
+def _truncate(moment, granularity):
+    moment = moment.replace(minute=0, second=0, microsecond=0)
+    if granularity != "hour":
+        moment = moment.replace(hour=0)
+    if granularity == "week":
+        moment -= timedelta(days=moment.weekday())  # ISO weeks start Monday, like date_trunc
+    return moment
+
+@bp.get("/stats/timeseries")
+@cached(TAG_STATS)
+def timeseries():
+    """
+    Reports created per bucket, from the trigger-maintained report_rollups.
+
+    Query: granularity=hour|day|week (default day), from/to (ISO, default a
+    window ending now), group_by=category|status|department, and optional
+    category/status/department filters. Missing buckets are filled with 0.
+    """
+    granularity = request.args.get("granularity", "day")
+    group_by = request.args.get("group_by")
+    department = request.args.get("department")
+    if granularity not in TIMESERIES_STEPS:
+        return jsonify({"error_msg": f"granularity must be one of: {list(TIMESERIES_STEPS)}"}), HTTP_STATUS.BAD_REQUEST
+    if group_by is not None and group_by not in TIMESERIES_GROUPS:
+        return jsonify({"error_msg": f"group_by must be one of: {list(TIMESERIES_GROUPS)}"}), HTTP_STATUS.BAD_REQUEST
+    if department is not None and department not in set(CATEGORY_TO_DEPARTMENT.values()):
+        return jsonify({"error_msg": "Unknown department"}), HTTP_STATUS.BAD_REQUEST
+
+    step = TIMESERIES_STEPS[granularity]
+    try:
+        end = _parse_time(request.args["to"]) if "to" in request.args else None
+        start = _parse_time(request.args["from"]) if "from" in request.args else None
+    except ValueError:
+        return jsonify({"error_msg": "from/to must be ISO 8601 dates"}), HTTP_STATUS.BAD_REQUEST
+
+    try:
+        dao = GlobalStatsDAO()
+        # Default end and offset-carrying bounds come from the database clock
+        # and TimeZone, which is what the naive created_at values follow
+        convert_end = end is None or end.tzinfo is not None
+        convert_start = start is not None and start.tzinfo is not None
+        if convert_end and convert_start:
+            end, start = dao.session_timestamps(end, start)
+        elif convert_end:
+            (end,) = dao.session_timestamps(end)
+        elif convert_start:
+            (start,) = dao.session_timestamps(start)
+        if start is None:
+            start = end - TIMESERIES_DEFAULT_SPAN[granularity]
+    except Exception as e:
+        return jsonify({"error_msg": str(e)}), HTTP_STATUS.INTERNAL_SERVER_ERROR
+    start = _truncate(start, granularity)
+    if end <= start:
+        return jsonify({"error_msg": "from must be before to"}), HTTP_STATUS.BAD_REQUEST
+    if (end - start) / step > TIMESERIES_MAX_BUCKETS:
+        return jsonify({"error_msg": f"Range too large (max {TIMESERIES_MAX_BUCKETS} buckets)"}), HTTP_STATUS.BAD_REQUEST
+
+    try:
+        rows = dao.timeseries(
+            granularity, start, end, group_by,
+            category=request.args.get("category"), status=request.args.get("status"), department=department,
+        )
+    except Exception as e:
+        return jsonify({"error_msg": str(e)}), HTTP_STATUS.INTERNAL_SERVER_ERROR
+
+    buckets = []
+    moment = start
+    while moment < end:
+        buckets.append(moment)
+        moment += step
+    counts = {}
+    for bucket, key, count in rows:
+        counts.setdefault(key or "all", {})[bucket] = int(count)
+    if not counts:
+        counts["all" if group_by is None else None] = {}
+    series = [
+        {"key": key, "points": [{"bucket": b.isoformat(), "count": values.get(b, 0)} for b in buckets]}
+        for key, values in sorted(counts.items(), key=lambda item: str(item[0]))
+        if key is not None
+    ]
     return jsonify({
-      "avg_resolution_days": dao.avg_resolution_days(),
-      "top_departments_resolved": dao.top_departments_resolved(5),
-      "top_users_reports": dao.top_users_reports(5),
-      "top_admins_validated": dao.top_admins_validated(5),
-      "top_admins_resolved": dao.top_admins_resolved(5),
-    })
+        "granularity": granularity,
+        "from": start.isoformat(),
+        "to": end.isoformat(),
+        "group_by": group_by,
+        "series": series,
+    }), HTTP_STATUS.OK
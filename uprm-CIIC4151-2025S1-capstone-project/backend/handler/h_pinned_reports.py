@@ -1,6 +1,7 @@
 from flask import request, jsonify
 from dao.d_pinned_reports import PinnedReportsDAO
 from constants import HTTP_STATUS
+from etag import etag_header, is_conditional, is_not_modified, make_etag, not_modified
 
 
 class PinnedReportsHandler:
@@ -112,12 +113,25 @@ class PinnedReportsHandler:
             dao = PinnedReportsDAO()
 
             if user_id:
-                pinned_reports = dao.get_pinned_reports_by_user(user_id, limit, offset)
                 total_count = dao.get_pinned_reports_count_by_user(user_id)
             else:
-                pinned_reports = dao.get_all_pinned_reports(limit, offset)
                 total_count = dao.get_total_pinned_reports_count()
 
+            # Conditional requests are answered from pin/report versions before
+            # the full rows are fetched; others hash the versions of the rows read
+            if is_conditional():
+                versions = dao.get_pinned_report_versions(user_id, limit, offset)
+                etag = make_etag(user_id, versions, total_count)
+                if is_not_modified(etag):
+                    return not_modified(etag)
+
+            if user_id:
+                pinned_reports = dao.get_pinned_reports_by_user(user_id, limit, offset)
+            else:
+                pinned_reports = dao.get_all_pinned_reports(limit, offset)
+            versions = [(pr[0], pr[1], pr[2], pr[8]) for pr in pinned_reports]
+            etag = make_etag(user_id, versions, total_count)
+
             total_pages = (total_count + limit - 1) // limit
 
             pinned_reports_dict = [self.map_to_dict(pr) for pr in pinned_reports]
@@ -133,6 +147,7 @@ class PinnedReportsHandler:
                     }
                 ),
                 HTTP_STATUS.OK,
+                etag_header(etag),
             )
         except Exception as e:
             return jsonify({"error_msg": str(e)}), HTTP_STATUS.INTERNAL_SERVER_ERROR
@@ -1,7 +1,15 @@
 from flask import jsonify
-from dao.d_reports import ReportsDAO
+from dao.d_reports import ReportsDAO, SEARCH_FULL, SEARCH_MODES
 from dao.d_administrators import AdministratorsDAO  # 👈 NEW
-from constants import HTTP_STATUS
+from dao.d_locations import reverse_geocode
+from constants import DEPARTMENT_CATEGORIES, HTTP_STATUS
+from pagination import InvalidCursorError, decode_cursors, page_cursors
+from counts import COUNT_EXACT, COUNT_MODES, page_count
+from report_grid import ReportGridIndex, report_grid
+from etag import etag_header, is_conditional, is_not_modified, make_etag, not_modified
+from cache import ADMIN_SCOPE_TTL, admin_scopes
+from export import EXPORT_FORMATS, stream_rows
+from datetime import datetime
 
 
 class ReportsHandler:
@@ -17,19 +25,25 @@ class ReportsHandler:
         if not department:
             return None
 
-        dept = department.strip().upper()
+        # Unknown department → no restriction
+        return DEPARTMENT_CATEGORIES.get(department.strip().upper())
 
-        if dept == "LUMA":
-            return ["street_light", "traffic_signal", "electrical_hazard"]
-        if dept == "DTOP":
-            return ["pothole", "road_damage", "fallen_tree"]
-        if dept == "AAA":
-            return ["flooding", "water_outage", "pipe_leak"]
-        if dept == "DDS":
-            return ["sanitation", "wandering_waste", "sinkhole"]
+    @staticmethod
+    def _get_admin_info(admin_id: int):
+        """
+        AdministratorsDAO.get_admin_info_for_user for `admin_id`, cached
+        across requests (admin_scopes); falsy for unknown users.
 
-        # Unknown department → no restriction
-        return None
+        For listing scope only: the cache may lag a demotion on another
+        worker by up to ADMIN_SCOPE_TTL, so authorization checks must not
+        use it.
+        """
+        info = admin_scopes.get(admin_id)
+        if info is None:
+            admin_dao = AdministratorsDAO()
+            info = admin_dao.get_admin_info_for_user(admin_id)
+            admin_scopes.set(admin_id, info, ADMIN_SCOPE_TTL)
+        return info
 
     def _get_allowed_categories_for_admin(self, admin_id: int | None):
         """
@@ -39,13 +53,14 @@ class ReportsHandler:
 
         If admin_id is None or the user is not an administrator,
         this returns None (no restriction).
+
+        The lookup is cached across requests (admin_scopes) and invalidated
+        by administrator/user writes, so scoped listings usually skip it.
         """
         if not admin_id:
             return None
 
-        admin_dao = AdministratorsDAO()
-        info = admin_dao.get_admin_info_for_user(admin_id)
-
+        info = self._get_admin_info(admin_id)
         if not info or not info.get("admin"):
             # Not an administrator → no restriction
             return None
@@ -55,9 +70,42 @@ class ReportsHandler:
         department = info.get("department")
         return self._department_allowed_categories(department)
 
+    # -----------------------------------
+    # Helpers for paginated listings
+    # -----------------------------------
+    @staticmethod
+    def _normalize_count_mode(count: str | None):
+        """Return the requested total-count mode, or None if it is invalid."""
+        mode = (count or COUNT_EXACT).strip().lower()
+        return mode if mode in COUNT_MODES else None
+
+    @staticmethod
+    def _invalid_count_response():
+        return (
+            jsonify({"error_msg": f"Invalid count. Must be one of: {list(COUNT_MODES)}"}),
+            HTTP_STATUS.BAD_REQUEST,
+        )
+
     # -----------------------------------
     # Existing mapping logic
     # -----------------------------------
+    # Keys of map_to_dict, in row order (export headers)
+    REPORT_COLUMNS = [
+        "id",
+        "title",
+        "description",
+        "status",
+        "category",
+        "created_by",
+        "validated_by",
+        "resolved_by",
+        "created_at",
+        "resolved_at",
+        "location",
+        "image_url",
+        "rating",
+    ]
+
     def map_to_dict(self, report):
         return {
             "id": report[0],
@@ -78,108 +126,244 @@ class ReportsHandler:
     # -----------------------------------
     # GET /reports  (with optional admin_id)
     # -----------------------------------
-    def get_all_reports(self, page=1, limit=10, sort=None, admin_id=None):
+    def get_all_reports(
+        self, page=1, limit=10, sort=None, admin_id=None, after=None, before=None, count=None
+    ):
         try:
+            count_mode = self._normalize_count_mode(count)
+            if not count_mode:
+                return self._invalid_count_response()
+            after_key, before_key = decode_cursors(after, before)
             offset = (page - 1) * limit
             dao = ReportsDAO()
 
             allowed_categories = self._get_allowed_categories_for_admin(admin_id)
+            total_count = dao.get_total_report_count(
+                allowed_categories=allowed_categories, mode=count_mode
+            )
 
-            reports = dao.get_reports_paginated(
-                limit,
-                offset,
+            page_args = dict(
                 sort=sort,
                 allowed_categories=allowed_categories,
+                after=after_key,
+                before=before_key,
             )
-            total_count = dao.get_total_report_count(
-                allowed_categories=allowed_categories
+            # Conditional requests are answered from row versions before the
+            # full rows are fetched; others hash the versions of the rows read
+            if is_conditional():
+                versions = dao.get_reports_paginated(
+                    limit + 1, offset, versions_only=True, **page_args
+                )
+                etag = make_etag(allowed_categories, versions, total_count)
+                if is_not_modified(etag):
+                    return not_modified(etag)
+
+            reports = dao.get_reports_paginated(limit + 1, offset, with_version=True, **page_args)
+            etag = make_etag(allowed_categories, [(r[0], r[13]) for r in reports], total_count)
+            reports, next_cursor, prev_cursor = page_cursors(
+                reports, limit, page, after, before
             )
-            total_pages = (total_count + limit - 1) // limit
+            total_pages = page_count(total_count, limit)
             reports_dict_list = [self.map_to_dict(report) for report in reports]
             return (
                 jsonify(
                     {
                         "reports": reports_dict_list,
                         "totalPages": total_pages,
-                        "currentPage": page,
+                        "currentPage": None if (after or before) else page,
                         "totalCount": total_count,
+                        "countMode": count_mode,
+                        "nextCursor": next_cursor,
+                        "prevCursor": prev_cursor,
                     }
                 ),
                 HTTP_STATUS.OK,
+                etag_header(etag),
             )
+        except InvalidCursorError as e:
+            return jsonify({"error_msg": str(e)}), HTTP_STATUS.BAD_REQUEST
         except Exception as e:
             return jsonify({"error_msg": str(e)}), HTTP_STATUS.INTERNAL_SERVER_ERROR
 
     def get_report_by_id(self, report_id):
         try:
             dao = ReportsDAO()
-            report = dao.get_report_by_id(report_id)
+            if is_conditional():
+                version = dao.get_report_version(report_id)
+                if version is None:
+                    return jsonify({"error_msg": "Report not found"}), HTTP_STATUS.NOT_FOUND
+                etag = make_etag(report_id, version)
+                if is_not_modified(etag):
+                    return not_modified(etag)
+
+            report = dao.get_report_by_id(report_id, with_version=True)
             if not report:
                 return jsonify({"error_msg": "Report not found"}), HTTP_STATUS.NOT_FOUND
-            return jsonify(self.map_to_dict(report)), HTTP_STATUS.OK
+            etag = make_etag(report_id, report[13])
+            return jsonify(self.map_to_dict(report)), HTTP_STATUS.OK, etag_header(etag)
         except Exception as e:
             return jsonify({"error_msg": str(e)}), HTTP_STATUS.INTERNAL_SERVER_ERROR
 
+    VALID_CATEGORIES = [
+        "pothole",
+        "street_light",
+        "traffic_signal",
+        "road_damage",
+        "sanitation",
+        "sinkhole",
+        "electrical_hazard",
+        "wandering_waste",
+        "flooding",
+        "pipe_leak",
+        "fallen_tree",
+        "water_outage",
+        "other",
+    ]
+    # Most reports accepted by one POST /reports/batch call
+    MAX_BATCH_SIZE = 100
+    # reports.title is VARCHAR(100)
+    TITLE_MAX_LENGTH = 100
+
+    def _validate_new_report(self, data):
+        """
+        Check a create-report payload.
+
+        Returns:
+            tuple: (fields dict for ReportsDAO, None) or (None, error_msg)
+        """
+        if not isinstance(data, dict):
+            return None, "Report must be an object"
+
+        title = data.get("title")
+        description = data.get("description")
+        category = data.get("category", "other")
+        created_by = data.get("user_id")
+
+        location_id = data.get("location_id")
+        image_url = data.get("image_url")
+
+        if not title or not description:
+            return None, "Title and description are required"
+        if not isinstance(title, str) or not isinstance(description, str):
+            return None, "Title and description must be strings"
+        if len(title) > self.TITLE_MAX_LENGTH:
+            return None, f"Title must be at most {self.TITLE_MAX_LENGTH} characters"
+        if not created_by:
+            return None, "User ID is required"
+        if not self._is_id(created_by):
+            return None, "User ID must be a positive integer"
+        if location_id is not None and not self._is_id(location_id):
+            return None, "Location ID must be a positive integer"
+        if image_url is not None and not isinstance(image_url, str):
+            return None, "Image URL must be a string"
+        if category not in self.VALID_CATEGORIES:
+            return None, f"Invalid category. Must be one of: {self.VALID_CATEGORIES}"
+
+        return {
+            "title": title,
+            "description": description,
+            "category": category,
+            "location_id": location_id,
+            "image_url": image_url,
+            "created_by": created_by,
+        }, None
+
+    @staticmethod
+    def _is_id(value):
+        """True for a positive int that is not a bool (isinstance(True, int) holds)."""
+        return isinstance(value, int) and not isinstance(value, bool) and value > 0
+
     def create_report(self, data):
         try:
-            title = data.get("title")
-            description = data.get("description")
-            category = data.get("category", "other")
-            location_id = data.get("location_id")
-            image_url = data.get("image_url")
-            created_by = data.get("user_id")
+            fields, error_msg = self._validate_new_report(data)
+            if error_msg:
+                return jsonify({"error_msg": error_msg}), HTTP_STATUS.BAD_REQUEST
 
-            if not title or not description:
+            dao = ReportsDAO()
+            inserted_report = dao.create_report(**fields)
+            if not inserted_report:
                 return (
-                    jsonify({"error_msg": "Title and description are required"}),
-                    HTTP_STATUS.BAD_REQUEST,
+                    jsonify({"error_msg": "Failed to create report"}),
+                    HTTP_STATUS.INTERNAL_SERVER_ERROR,
                 )
-            if not created_by:
+            return jsonify(self.map_to_dict(inserted_report)), HTTP_STATUS.CREATED
+        except Exception as e:
+            return jsonify({"error_msg": str(e)}), HTTP_STATUS.INTERNAL_SERVER_ERROR
+
+    # -----------------------------------
+    # POST /reports/batch
+    # -----------------------------------
+    def create_reports_batch(self, data):
+        """
+        Create many reports in one transaction (e.g. an offline queue replay).
+
+        Accepts {"reports": [...]} or a bare list of create-report payloads.
+        Every item is validated up front; valid ones are inserted together
+        and invalid ones are reported without failing the batch.
+
+        Returns:
+            200/201 with per-item results in input order:
+            {"index", "success", "report"} or {"index", "success", "error_msg"}
+        """
+        try:
+            items = data.get("reports") if isinstance(data, dict) else data
+            if not isinstance(items, list) or not items:
                 return (
-                    jsonify({"error_msg": "User ID is required"}),
+                    jsonify({"error_msg": "A non-empty list of reports is required"}),
                     HTTP_STATUS.BAD_REQUEST,
                 )
-
-            valid_categories = [
-                "pothole",
-                "street_light",
-                "traffic_signal",
-                "road_damage",
-                "sanitation",
-                "sinkhole",
-                "electrical_hazard",
-                "wandering_waste",
-                "flooding",
-                "pipe_leak",
-                "fallen_tree",
-                "water_outage",
-                "other",
-            ]
-            if category not in valid_categories:
+            if len(items) > self.MAX_BATCH_SIZE:
                 return (
                     jsonify(
-                        {
-                            "error_msg": f"Invalid category. Must be one of: {valid_categories}"
-                        }
+                        {"error_msg": f"At most {self.MAX_BATCH_SIZE} reports per batch"}
                     ),
                     HTTP_STATUS.BAD_REQUEST,
                 )
 
-            dao = ReportsDAO()
-            inserted_report = dao.create_report(
-                title=title,
-                description=description,
-                category=category,
-                location_id=location_id,
-                image_url=image_url,
-                created_by=created_by,
+            results = [None] * len(items)
+            valid_indexes = []
+            valid_fields = []
+            for index, item in enumerate(items):
+                fields, error_msg = self._validate_new_report(item)
+                if error_msg:
+                    results[index] = {
+                        "index": index,
+                        "success": False,
+                        "error_msg": error_msg,
+                    }
+                else:
+                    valid_indexes.append(index)
+                    valid_fields.append(fields)
+
+            if valid_fields:
+                dao = ReportsDAO()
+                inserted = dao.create_reports_batch(valid_fields)
+                for index, (row, error_msg) in zip(valid_indexes, inserted):
+                    if row is None:
+                        results[index] = {
+                            "index": index,
+                            "success": False,
+                            "error_msg": error_msg,
+                        }
+                    else:
+                        results[index] = {
+                            "index": index,
+                            "success": True,
+                            "report": self.map_to_dict(row),
+                        }
+
+            created = sum(1 for r in results if r["success"])
+            status = HTTP_STATUS.CREATED if created == len(items) else HTTP_STATUS.OK
+            return (
+                jsonify(
+                    {
+                        "results": results,
+                        "created": created,
+                        "failed": len(items) - created,
+                    }
+                ),
+                status,
             )
-            if not inserted_report:
-                return (
-                    jsonify({"error_msg": "Failed to create report"}),
-                    HTTP_STATUS.INTERNAL_SERVER_ERROR,
-                )
-            return jsonify(self.map_to_dict(inserted_report)), HTTP_STATUS.CREATED
         except Exception as e:
             return jsonify({"error_msg": str(e)}), HTTP_STATUS.INTERNAL_SERVER_ERROR
 
@@ -276,7 +460,7 @@ class ReportsHandler:
             return jsonify({"error_msg": str(e)}), HTTP_STATUS.INTERNAL_SERVER_ERROR
 
     # ---------- UNIFIED ENTRY POINT ----------
-    # /reports/search?q=&status=&category=&sort=&admin_id=
+    # /reports/search?q=&mode=&status=&category=&sort=&admin_id=
     def search_reports(
         self,
         query=None,
@@ -286,6 +470,10 @@ class ReportsHandler:
         category=None,
         sort=None,
         admin_id=None,  # 👈 NEW
+        after=None,
+        before=None,
+        count=None,
+        mode=None,
     ):
         """
         Handles:
@@ -293,12 +481,21 @@ class ReportsHandler:
         - filter only      (/reports/search?status=... [&category=...] [&sort=asc|desc])
         - search + filter  (/reports/search?q=...&status=... [&category=...] [&sort=...])
         - AND applies backend admin category restriction if admin_id is provided.
+        `q` uses full-text search: mode=full (default, stemmed) or mode=prefix
+        (typeahead); sort=relevance ranks matches instead of ordering by date.
+        Pass `after`/`before` (from nextCursor/prevCursor) for keyset paging
+        and `count` (exact | estimate | none) to choose how totals are computed.
         """
         try:
+            count_mode = self._normalize_count_mode(count)
+            if not count_mode:
+                return self._invalid_count_response()
+            after_key, before_key = decode_cursors(after, before)
             q = (query or "").strip()
             s = (status or "").strip()
             c = (category or "").strip()
-            order = (sort or "").strip().lower()  # 'asc' or 'desc'
+            order = (sort or "").strip().lower()  # 'asc', 'desc' or 'relevance'
+            search_mode = (mode or SEARCH_FULL).strip().lower()
 
             if not q and not s and not c:
                 return (
@@ -308,6 +505,24 @@ class ReportsHandler:
                     HTTP_STATUS.BAD_REQUEST,
                 )
 
+            if search_mode not in SEARCH_MODES:
+                return (
+                    jsonify({"error_msg": f"Invalid mode. Must be one of: {list(SEARCH_MODES)}"}),
+                    HTTP_STATUS.BAD_REQUEST,
+                )
+
+            if order == "relevance" and not q:
+                return (
+                    jsonify({"error_msg": "sort=relevance requires q"}),
+                    HTTP_STATUS.BAD_REQUEST,
+                )
+
+            if order == "relevance" and (after or before):
+                return (
+                    jsonify({"error_msg": "Cursors are not supported with sort=relevance; use page"}),
+                    HTTP_STATUS.BAD_REQUEST,
+                )
+
             if s and s not in ["resolved", "denied", "in_progress", "open", "closed"]:
                 return jsonify({"error_msg": "Invalid status"}), HTTP_STATUS.BAD_REQUEST
 
@@ -341,13 +556,23 @@ class ReportsHandler:
                 q=q if q else None,
                 status=s if s else None,
                 category=c if c else None,
-                limit=limit,
+                limit=limit + 1,
                 offset=offset,
-                sort=order if order in ("asc", "desc") else None,
+                sort=order if order in ("asc", "desc", "relevance") else None,
                 allowed_categories=allowed_categories,  # 👈 pass restriction
+                after=after_key,
+                before=before_key,
+                count_mode=count_mode,
+                search_mode=search_mode,
             )
+            rows, next_cursor, prev_cursor = page_cursors(
+                rows, limit, page, after, before
+            )
+            if order == "relevance":
+                # Cursors encode (created_at, id), which is not the rank order
+                next_cursor = prev_cursor = None
 
-            total_pages = (total_count + limit - 1) // limit
+            total_pages = page_count(total_count, limit)
             reports = [self.map_to_dict(r) for r in rows]
 
             return (
@@ -355,21 +580,38 @@ class ReportsHandler:
                     {
                         "reports": reports,
                         "totalPages": total_pages,
-                        "currentPage": page,
+                        "currentPage": None if (after or before) else page,
                         "totalCount": total_count,
+                        "countMode": count_mode,
+                        "nextCursor": next_cursor,
+                        "prevCursor": prev_cursor,
                         "query": q or None,
+                        "mode": search_mode,
                         "status": s or None,
                         "category": c or None,
-                        "sort": (order if order in ("asc", "desc") else "desc"),
+                        "sort": (order if order in ("asc", "desc", "relevance") else "desc"),
                     }
                 ),
                 HTTP_STATUS.OK,
             )
+        except InvalidCursorError as e:
+            return jsonify({"error_msg": str(e)}), HTTP_STATUS.BAD_REQUEST
         except Exception as e:
             return jsonify({"error_msg": str(e)}), HTTP_STATUS.INTERNAL_SERVER_ERROR
 
     # Backward-compat: /reports/filter → delegates to search_reports (now with admin)
-    def filter_reports(self, status, category, page=1, limit=10, sort=None, admin_id=None):
+    def filter_reports(
+        self,
+        status,
+        category,
+        page=1,
+        limit=10,
+        sort=None,
+        admin_id=None,
+        after=None,
+        before=None,
+        count=None,
+    ):
         return self.search_reports(
             query=None,
             page=page,
@@ -378,28 +620,45 @@ class ReportsHandler:
             category=category,
             sort=sort,
             admin_id=admin_id,
+            after=after,
+            before=before,
+            count=count,
         )
 
-    def get_reports_by_user(self, user_id, page=1, limit=10):
+    def get_reports_by_user(self, user_id, page=1, limit=10, after=None, before=None, count=None):
         try:
+            count_mode = self._normalize_count_mode(count)
+            if not count_mode:
+                return self._invalid_count_response()
+            after_key, before_key = decode_cursors(after, before)
             offset = (page - 1) * limit
             dao = ReportsDAO()
-            reports = dao.get_reports_by_user(user_id, limit, offset)
-            total_count = dao.get_user_reports_count(user_id)
-            total_pages = (total_count + limit - 1) // limit
+            reports = dao.get_reports_by_user(
+                user_id, limit + 1, offset, after=after_key, before=before_key
+            )
+            reports, next_cursor, prev_cursor = page_cursors(
+                reports, limit, page, after, before
+            )
+            total_count = dao.get_user_reports_count(user_id, mode=count_mode)
+            total_pages = page_count(total_count, limit)
             reports_dict_list = [self.map_to_dict(report) for report in reports]
             return (
                 jsonify(
                     {
                         "reports": reports_dict_list,
                         "totalPages": total_pages,
-                        "currentPage": page,
+                        "currentPage": None if (after or before) else page,
                         "totalCount": total_count,
+                        "countMode": count_mode,
+                        "nextCursor": next_cursor,
+                        "prevCursor": prev_cursor,
                         "user_id": user_id,
                     }
                 ),
                 HTTP_STATUS.OK,
             )
+        except InvalidCursorError as e:
+            return jsonify({"error_msg": str(e)}), HTTP_STATUS.BAD_REQUEST
         except Exception as e:
             return jsonify({"error_msg": str(e)}), HTTP_STATUS.INTERNAL_SERVER_ERROR
 
@@ -454,6 +713,61 @@ class ReportsHandler:
         except Exception as e:
             return jsonify({"error_msg": str(e)}), HTTP_STATUS.INTERNAL_SERVER_ERROR
 
+    # -----------------------------------
+    # GET /reports/<id>/detail
+    # -----------------------------------
+    def get_report_detail(self, report_id, user_id=None):
+        """
+        Everything the report screen needs in one response: the report, its
+        location (with address), the viewer's pin state and the rating
+        summaries from /rating and /rating-status, read with one query.
+        """
+        try:
+            dao = ReportsDAO()
+            row = dao.get_report_detail(report_id, user_id)
+            if not row:
+                return jsonify({"error_msg": "Report not found"}), HTTP_STATUS.NOT_FOUND
+
+            report = self.map_to_dict(row[:13])
+            rating = row[12]
+
+            location = None
+            if row[10] is not None:
+                city, latitude, longitude = row[13], row[14], row[15]
+                location = {
+                    "id": row[10],
+                    "city": city or "San Juan",
+                    "latitude": float(latitude),
+                    "longitude": float(longitude),
+                    "address": reverse_geocode(latitude, longitude),
+                    "country": "Puerto Rico",
+                }
+
+            # Same semantics as get_report_rating / get_report_rating_status:
+            # a report carries a single rating given by its author
+            detail = {
+                "report": report,
+                "location": location,
+                "rating": {
+                    "report_id": report_id,
+                    "average_rating": float(rating) if rating else 0,
+                    "total_ratings": 1 if rating is not None else 0,
+                    "rating_distribution": {str(rating): 1} if rating is not None else {},
+                },
+            }
+            if user_id:
+                rated = rating is not None and report["created_by"] == user_id
+                detail["is_pinned"] = bool(row[16])
+                detail["rating_status"] = {
+                    "rated": rated,
+                    "rating": rating if rated else None,
+                    "user_id": user_id,
+                    "report_id": report_id,
+                }
+            return jsonify(detail), HTTP_STATUS.OK
+        except Exception as e:
+            return jsonify({"error_msg": str(e)}), HTTP_STATUS.INTERNAL_SERVER_ERROR
+
     def rate_report(self, report_id, data):
         try:
             dao = ReportsDAO()
@@ -539,12 +853,11 @@ class ReportsHandler:
                     HTTP_STATUS.BAD_REQUEST,
                 )
 
-            valid_statuses = ["open", "in_progress", "resolved", "denied", "closed"]
-            if status not in valid_statuses:
+            if status not in self.VALID_STATUSES:
                 return (
                     jsonify(
                         {
-                            "error_msg": f"Invalid status. Must be one of: {valid_statuses}"
+                            "error_msg": f"Invalid status. Must be one of: {self.VALID_STATUSES}"
                         }
                     ),
                     HTTP_STATUS.BAD_REQUEST,
@@ -578,6 +891,173 @@ class ReportsHandler:
         except Exception as e:
             return jsonify({"error_msg": str(e)}), HTTP_STATUS.INTERNAL_SERVER_ERROR
 
+    # -----------------------------------
+    # GET /reports/export
+    # -----------------------------------
+    def export_reports(
+        self, fmt="csv", status=None, category=None, date_from=None, date_to=None
+    ):
+        """
+        Stream every matching report as CSV or NDJSON.
+
+        Rows are read through a server-side cursor and written out in
+        batches, so the export runs in constant memory. date_from/date_to
+        are ISO dates bounding created_at as [from, to).
+        """
+        if fmt not in EXPORT_FORMATS:
+            return (
+                jsonify({"error_msg": f"format must be one of: {list(EXPORT_FORMATS)}"}),
+                HTTP_STATUS.BAD_REQUEST,
+            )
+        if status and status not in self.VALID_STATUSES:
+            return (
+                jsonify({"error_msg": f"Invalid status. Must be one of: {self.VALID_STATUSES}"}),
+                HTTP_STATUS.BAD_REQUEST,
+            )
+        if category and category not in self.VALID_CATEGORIES:
+            return (
+                jsonify(
+                    {"error_msg": f"Invalid category. Must be one of: {self.VALID_CATEGORIES}"}
+                ),
+                HTTP_STATUS.BAD_REQUEST,
+            )
+        try:
+            created_from = datetime.fromisoformat(date_from) if date_from else None
+            created_to = datetime.fromisoformat(date_to) if date_to else None
+        except ValueError:
+            return (
+                jsonify({"error_msg": "from/to must be ISO 8601 dates"}),
+                HTTP_STATUS.BAD_REQUEST,
+            )
+
+        try:
+            dao = ReportsDAO()
+            return stream_rows(
+                dao.iter_reports_export(status, category, created_from, created_to),
+                self.REPORT_COLUMNS,
+                fmt,
+                f"reports.{fmt}",
+            )
+        except Exception as e:
+            return jsonify({"error_msg": str(e)}), HTTP_STATUS.INTERNAL_SERVER_ERROR
+
+    # -----------------------------------
+    # Bulk status transitions (admins)
+    # -----------------------------------
+    VALID_STATUSES = ["open", "in_progress", "resolved", "denied", "closed"]
+    # Most report ids accepted by one bulk call
+    MAX_BULK_IDS = 500
+
+    def _bulk_status_change(self, data, status):
+        """
+        Move every report in data["report_ids"] to `status` in one UPDATE.
+
+        Only administrators of a known department may call it. Reports
+        outside that department's categories are left alone and listed
+        under "forbidden"; unknown ids are listed under "not_found".
+        """
+        try:
+            if not data:
+                return jsonify({"error_msg": "Missing data"}), HTTP_STATUS.BAD_REQUEST
+            if not isinstance(data, dict):
+                return jsonify({"error_msg": "Expected a JSON object"}), HTTP_STATUS.BAD_REQUEST
+
+            admin_id = data.get("admin_id")
+            report_ids = data.get("report_ids")
+            if not admin_id:
+                return jsonify({"error_msg": "Missing admin_id"}), HTTP_STATUS.BAD_REQUEST
+            if not self._is_id(admin_id):
+                return (
+                    jsonify({"error_msg": "admin_id must be a positive integer"}),
+                    HTTP_STATUS.BAD_REQUEST,
+                )
+            if (
+                not isinstance(report_ids, list)
+                or not report_ids
+                or not all(self._is_id(rid) for rid in report_ids)
+            ):
+                return (
+                    jsonify({"error_msg": "report_ids must be a non-empty list of ids"}),
+                    HTTP_STATUS.BAD_REQUEST,
+                )
+            if len(report_ids) > self.MAX_BULK_IDS:
+                return (
+                    jsonify({"error_msg": f"At most {self.MAX_BULK_IDS} reports per call"}),
+                    HTTP_STATUS.BAD_REQUEST,
+                )
+
+            # Fail closed: unlike the listings, a missing or non-admin scope
+            # must not mean "every category". Read it fresh rather than from
+            # admin_scopes, which other workers only drop when it expires
+            info = AdministratorsDAO().get_admin_info_for_user(admin_id)
+            if not info or not info.get("admin"):
+                return (
+                    jsonify({"error_msg": "Only administrators can change report status"}),
+                    HTTP_STATUS.FORBIDDEN,
+                )
+            allowed_categories = self._department_allowed_categories(info.get("department"))
+            if not allowed_categories:
+                return (
+                    jsonify({"error_msg": "Administrator has no known department"}),
+                    HTTP_STATUS.FORBIDDEN,
+                )
+
+            update_data = {}
+            if status == "resolved":
+                update_data["resolved_by"] = admin_id
+            elif status == "in_progress":
+                update_data["validated_by"] = admin_id
+
+            dao = ReportsDAO()
+            rows, forbidden, not_found = dao.update_reports_status(
+                list(dict.fromkeys(report_ids)),
+                status,
+                allowed_categories=allowed_categories,
+                **update_data,
+            )
+            return (
+                jsonify(
+                    {
+                        "status": status,
+                        "updated": [self.map_to_dict(row) for row in rows],
+                        "forbidden": forbidden,
+                        "not_found": not_found,
+                    }
+                ),
+                HTTP_STATUS.OK,
+            )
+        except Exception as e:
+            return jsonify({"error_msg": str(e)}), HTTP_STATUS.INTERNAL_SERVER_ERROR
+
+    def validate_reports_bulk(self, data):
+        """Bulk variant of validate_report (status -> in_progress)."""
+        return self._bulk_status_change(data, "in_progress")
+
+    def resolve_reports_bulk(self, data):
+        """Bulk variant of resolve_report (status -> resolved)."""
+        return self._bulk_status_change(data, "resolved")
+
+    def change_reports_status_bulk(self, data):
+        """Bulk variant of change_report_status."""
+        try:
+            if not data:
+                return jsonify({"error_msg": "Missing data"}), HTTP_STATUS.BAD_REQUEST
+            if not isinstance(data, dict):
+                return jsonify({"error_msg": "Expected a JSON object"}), HTTP_STATUS.BAD_REQUEST
+            status = data.get("status")
+            if not status:
+                return jsonify({"error_msg": "Missing status"}), HTTP_STATUS.BAD_REQUEST
+            if status not in self.VALID_STATUSES:
+                return (
+                    jsonify(
+                        {"error_msg": f"Invalid status. Must be one of: {self.VALID_STATUSES}"}
+                    ),
+                    HTTP_STATUS.BAD_REQUEST,
+                )
+            return self._bulk_status_change(data, status)
+        except Exception as e:
+            return jsonify({"error_msg": str(e)}), HTTP_STATUS.INTERNAL_SERVER_ERROR
+
     def get_status_options(self):
         """Get available status options for admin UI"""
         try:
@@ -642,47 +1122,112 @@ class ReportsHandler:
         except Exception as e:
             return jsonify({"error_msg": str(e)}), HTTP_STATUS.INTERNAL_SERVER_ERROR
 
-    def get_pending_reports(self, page=1, limit=10):
+    def get_report_clusters(
+        self, min_lat, min_lon, max_lat, max_lon, zoom, category=None, status=None
+    ):
+        """Per-cell report counts for a map viewport (geohash clustering)."""
         try:
+            if None in (min_lat, min_lon, max_lat, max_lon, zoom):
+                return (
+                    jsonify(
+                        {"error_msg": "min_lat, min_lon, max_lat, max_lon and zoom are required"}
+                    ),
+                    HTTP_STATUS.BAD_REQUEST,
+                )
+            if not (-90 <= min_lat <= max_lat <= 90) or not (-180 <= min_lon <= max_lon <= 180):
+                return jsonify({"error_msg": "Invalid viewport"}), HTTP_STATUS.BAD_REQUEST
+
+            def load_rows():
+                return ReportsDAO().get_report_location_counts()
+
+            levels = report_grid.get_levels(load_rows)
+            clusters = ReportGridIndex.query(
+                levels, min_lat, min_lon, max_lat, max_lon, zoom, category, status
+            )
+            return (
+                jsonify(
+                    {
+                        "clusters": clusters,
+                        "zoom": zoom,
+                        "total": sum(c["count"] for c in clusters),
+                        "category": category,
+                        "status": status,
+                    }
+                ),
+                HTTP_STATUS.OK,
+            )
+        except Exception as e:
+            return jsonify({"error_msg": str(e)}), HTTP_STATUS.INTERNAL_SERVER_ERROR
+
+    def get_pending_reports(self, page=1, limit=10, after=None, before=None, count=None):
+        try:
+            count_mode = self._normalize_count_mode(count)
+            if not count_mode:
+                return self._invalid_count_response()
+            after_key, before_key = decode_cursors(after, before)
             offset = (page - 1) * limit
             dao = ReportsDAO()
-            reports = dao.get_pending_reports(limit, offset)
-            total_count = dao.get_pending_reports_count()
-            total_pages = (total_count + limit - 1) // limit
+            reports = dao.get_pending_reports(
+                limit + 1, offset, after=after_key, before=before_key
+            )
+            reports, next_cursor, prev_cursor = page_cursors(
+                reports, limit, page, after, before
+            )
+            total_count = dao.get_pending_reports_count(mode=count_mode)
+            total_pages = page_count(total_count, limit)
             reports_dict_list = [self.map_to_dict(report) for report in reports]
             return (
                 jsonify(
                     {
                         "reports": reports_dict_list,
                         "totalPages": total_pages,
-                        "currentPage": page,
+                        "currentPage": None if (after or before) else page,
                         "totalCount": total_count,
+                        "countMode": count_mode,
+                        "nextCursor": next_cursor,
+                        "prevCursor": prev_cursor,
                     }
                 ),
                 HTTP_STATUS.OK,
             )
+        except InvalidCursorError as e:
+            return jsonify({"error_msg": str(e)}), HTTP_STATUS.BAD_REQUEST
         except Exception as e:
             return jsonify({"error_msg": str(e)}), HTTP_STATUS.INTERNAL_SERVER_ERROR
 
-    def get_assigned_reports(self, admin_id, page=1, limit=10):
+    def get_assigned_reports(self, admin_id, page=1, limit=10, after=None, before=None, count=None):
         try:
+            count_mode = self._normalize_count_mode(count)
+            if not count_mode:
+                return self._invalid_count_response()
+            after_key, before_key = decode_cursors(after, before)
             offset = (page - 1) * limit
             dao = ReportsDAO()
-            reports = dao.get_assigned_reports(admin_id, limit, offset)
-            total_count = dao.get_assigned_reports_count(admin_id)
-            total_pages = (total_count + limit - 1) // limit
+            reports = dao.get_assigned_reports(
+                admin_id, limit + 1, offset, after=after_key, before=before_key
+            )
+            reports, next_cursor, prev_cursor = page_cursors(
+                reports, limit, page, after, before
+            )
+            total_count = dao.get_assigned_reports_count(admin_id, mode=count_mode)
+            total_pages = page_count(total_count, limit)
             reports_dict_list = [self.map_to_dict(report) for report in reports]
             return (
                 jsonify(
                     {
                         "reports": reports_dict_list,
                         "totalPages": total_pages,
-                        "currentPage": page,
+                        "currentPage": None if (after or before) else page,
                         "totalCount": total_count,
+                        "countMode": count_mode,
+                        "nextCursor": next_cursor,
+                        "prevCursor": prev_cursor,
                         "admin_id": admin_id,
                     }
                 ),
                 HTTP_STATUS.OK,
             )
+        except InvalidCursorError as e:
+            return jsonify({"error_msg": str(e)}), HTTP_STATUS.BAD_REQUEST
         except Exception as e:
             return jsonify({"error_msg": str(e)}), HTTP_STATUS.INTERNAL_SERVER_ERROR
@@ -0,0 +1,228 @@
+import mimetypes
+import os
+import re
+
+from flask import request, jsonify, current_app, send_file
+from werkzeug.security import safe_join
+from constants import HTTP_STATUS
+from images import read_manifest, schedule_processing
+from storage import (
+    UPLOAD_ACCEL_PREFIX,
+    UPLOAD_IMMUTABLE_MAX_AGE,
+    UPLOAD_MAX_AGE,
+    UPLOAD_SERVE_MODE,
+    OffsetMismatchError,
+    UploadError,
+    UploadSessions,
+    UploadTooLargeError,
+    extension_of,
+    find_existing,
+    is_content_addressed,
+    normalize_digest,
+    store_stream,
+)
+
+_CONTENT_RANGE = re.compile(r"^bytes (\d+)-(\d+)/(\d+|\*)$")
+
+
+class UploadsHandler:
+
+    def __init__(self):
+        self.root = current_app.config["UPLOAD_FOLDER"]
+        self.tmp_root = current_app.config["UPLOAD_TMP_FOLDER"]
+
+    def _sessions(self):
+        return UploadSessions(self.root, self.tmp_root)
+
+    def _stored_response(self, rel_path, deduplicated, status=HTTP_STATUS.CREATED):
+        """
+        Build the upload response for a committed file.
+
+        New content is queued for variant processing; a duplicate reuses
+        the manifest of the copy already stored.
+        """
+        manifest = read_manifest(self.root, rel_path)
+        if manifest is None:
+            manifest = schedule_processing(self.root, rel_path)
+        return (
+            jsonify(
+                {
+                    "url": f"/uploads/{rel_path}",
+                    "deduplicated": deduplicated,
+                    "status": manifest["status"],
+                    "variants": manifest["variants"],
+                }
+            ),
+            status,
+        )
+
+    def _error(self, e):
+        if isinstance(e, UploadTooLargeError):
+            return jsonify({"error_msg": str(e)}), HTTP_STATUS.PAYLOAD_TOO_LARGE
+        return jsonify({"error_msg": str(e)}), HTTP_STATUS.BAD_REQUEST
+
+    def upload_multipart(self, file):
+        """Store a multipart file part (the original /upload contract)."""
+        try:
+            ext = extension_of(file.filename)
+            rel_path, deduplicated, _ = store_stream(
+                file.stream, ext, self.root, self.tmp_root
+            )
+            return self._stored_response(rel_path, deduplicated)
+        except UploadTooLargeError as e:
+            return jsonify({"error": str(e)}), HTTP_STATUS.PAYLOAD_TOO_LARGE
+        except UploadError as e:
+            return jsonify({"error": str(e)}), HTTP_STATUS.BAD_REQUEST
+
+    def upload_stream(self, filename):
+        """Store a raw request body, streamed in chunks (POST /upload/stream)."""
+        try:
+            ext = extension_of(filename)
+            rel_path, deduplicated, _ = store_stream(
+                request.stream, ext, self.root, self.tmp_root
+            )
+            return self._stored_response(rel_path, deduplicated)
+        except UploadError as e:
+            return self._error(e)
+
+    # =============================================================================
+    # RESUMABLE SESSIONS
+    # =============================================================================
+
+    def _session_dict(self, state):
+        return {
+            "id": state["id"],
+            "size": state["size"],
+            "offset": state["offset"],
+            "upload_url": f"/upload/sessions/{state['id']}",
+        }
+
+    def create_session(self, data):
+        if not data:
+            return jsonify({"error_msg": "Missing data"}), HTTP_STATUS.BAD_REQUEST
+        if not isinstance(data, dict):
+            return jsonify({"error_msg": "Expected a JSON object"}), HTTP_STATUS.BAD_REQUEST
+
+        filename = data.get("filename")
+        size = data.get("size")
+        sha256 = data.get("sha256")
+        try:
+            ext = extension_of(filename)
+            if sha256 is not None:
+                # Never let a client-supplied digest build a path unchecked
+                sha256 = normalize_digest(sha256)
+                # Content already on the server: nothing to upload
+                existing = find_existing(self.root, sha256, ext)
+                if existing:
+                    return self._stored_response(existing, True, HTTP_STATUS.OK)
+
+            state = self._sessions().create(filename, size, sha256)
+            return jsonify(self._session_dict(state)), HTTP_STATUS.CREATED
+        except UploadError as e:
+            return self._error(e)
+
+    def get_session(self, session_id):
+        try:
+            state = self._sessions().status(session_id)
+        except KeyError:
+            return jsonify({"error_msg": "Upload session not found"}), HTTP_STATUS.NOT_FOUND
+        response = jsonify(self._session_dict(state))
+        return response, HTTP_STATUS.OK, {"Upload-Offset": str(state["offset"])}
+
+    def append_chunk(self, session_id):
+        """
+        Append request.stream to a session.
+
+        The chunk start comes from `Content-Range: bytes <start>-<end>/<total>`
+        or an `Upload-Offset` header. A mismatched start returns 409 with the
+        offset the client should resume from.
+        """
+        content_range = request.headers.get("Content-Range")
+        if content_range:
+            match = _CONTENT_RANGE.match(content_range.strip())
+            if not match:
+                return jsonify({"error_msg": "Invalid Content-Range"}), HTTP_STATUS.BAD_REQUEST
+            start = int(match.group(1))
+        else:
+            try:
+                start = int(request.headers.get("Upload-Offset", ""))
+            except ValueError:
+                return (
+                    jsonify({"error_msg": "Content-Range or Upload-Offset header required"}),
+                    HTTP_STATUS.BAD_REQUEST,
+                )
+
+        try:
+            state = self._sessions().append(session_id, start, request.stream)
+        except KeyError:
+            return jsonify({"error_msg": "Upload session not found"}), HTTP_STATUS.NOT_FOUND
+        except OffsetMismatchError as e:
+            return (
+                jsonify({"error_msg": str(e), "offset": e.offset}),
+                HTTP_STATUS.CONFLICT,
+                {"Upload-Offset": str(e.offset)},
+            )
+        except UploadError as e:
+            return self._error(e)
+
+        if "path" in state:
+            return self._stored_response(state["path"], state["deduplicated"])
+        response = jsonify(self._session_dict(state))
+        return response, HTTP_STATUS.OK, {"Upload-Offset": str(state["offset"])}
+
+    def delete_session(self, session_id):
+        try:
+            self._sessions().status(session_id)
+        except KeyError:
+            return jsonify({"error_msg": "Upload session not found"}), HTTP_STATUS.NOT_FOUND
+        self._sessions().discard(session_id)
+        return "", HTTP_STATUS.NO_CONTENT
+
+    # =============================================================================
+    # SERVING
+    # =============================================================================
+
+    def serve_file(self, filename):
+        """
+        Serve a stored upload.
+
+        Content-addressed files get a strong ETag (their name) and a one-year
+        immutable Cache-Control; manifests are revalidated on every use.
+        Range and If-None-Match/If-Modified-Since are handled by send_file,
+        which hands the open file to the server's wsgi.file_wrapper (gunicorn
+        uses sendfile(2) for it). With UPLOAD_SERVE_MODE=x-accel or x-sendfile
+        only headers are returned and the front proxy pushes the bytes.
+        """
+        path = safe_join(self.root, filename)
+        if path is None or not os.path.isfile(path):
+            return jsonify({"error_msg": "File not found"}), HTTP_STATUS.NOT_FOUND
+
+        immutable = is_content_addressed(filename)
+        if filename.endswith(".json"):
+            cache_control = "no-cache"
+        elif immutable:
+            cache_control = f"public, max-age={UPLOAD_IMMUTABLE_MAX_AGE}, immutable"
+        else:
+            cache_control = f"public, max-age={UPLOAD_MAX_AGE}"
+
+        if UPLOAD_SERVE_MODE == "x-accel":
+            response = current_app.response_class(
+                mimetype=mimetypes.guess_type(filename)[0] or "application/octet-stream"
+            )
+            response.headers["X-Accel-Redirect"] = UPLOAD_ACCEL_PREFIX + filename
+        else:
+            # USE_X_SENDFILE (x-sendfile mode) is applied by send_file itself
+            etag = os.path.basename(filename) if immutable else True
+            response = send_file(path, conditional=True, etag=etag)
+
+        response.headers["Cache-Control"] = cache_control
+        return response
+
+    def get_variants(self, filename):
+        """Processing status and variant URLs for an uploaded image."""
+        manifest = None
+        if safe_join(self.root, filename) is not None:
+            manifest = read_manifest(self.root, filename)
+        if manifest is None:
+            return jsonify({"error_msg": "Upload not found"}), HTTP_STATUS.NOT_FOUND
+        return jsonify(manifest), HTTP_STATUS.OK
@@ -0,0 +1,398 @@
+"""
+Image handling for uploaded report photos.
+
+Before an upload is hashed and stored, strip_metadata() drops its EXIF,
+XMP and text metadata (GPS position, device tags) without re-encoding, so
+the original served at its /uploads URL is metadata-free too.
+
+After /upload accepts a file, process_upload() is queued on a small worker
+pool. It writes variants (EXIF orientation applied) in WebP and, when
+Pillow supports it, AVIF: resized thumbnails plus a full-size copy. The
+variant URLs are recorded in a JSON manifest next to the original. Pillow
+is optional: without it uploads still work and the manifest is marked
+"skipped".
+"""
+
+import json
+import os
+import shutil
+import struct
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    from PIL import Image, ImageOps
+except ImportError:  # pragma: no cover - optional dependency
+    Image = None
+    ImageOps = None
+
+# Worker threads per process for image processing
+IMAGE_WORKERS = int(os.getenv("IMAGE_WORKERS", "2"))
+# Longest side in pixels for each generated size (None keeps full size)
+IMAGE_SIZES = {"thumb": 320, "medium": 1024, "full": None}
+IMAGE_QUALITY = int(os.getenv("IMAGE_QUALITY", "80"))
+
+STATUS_PENDING = "pending"
+STATUS_READY = "ready"
+STATUS_FAILED = "failed"
+STATUS_SKIPPED = "skipped"
+
+# Metadata dropped from stored originals
+_JPEG_DROP = {0xE1, 0xED, 0xFE}  # APP1 (EXIF, XMP), APP13 (IPTC), COM
+_PNG_DROP = {b"eXIf", b"tEXt", b"zTXt", b"iTXt", b"tIME"}
+_WEBP_DROP = {b"EXIF", b"XMP "}
+_WEBP_METADATA_FLAGS = 0x0C  # VP8X "EXIF present" and "XMP present" bits
+_PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+_EXIF_ORIENTATION = 0x0112
+_COPY_SIZE = 64 * 1024
+
+_executor = None
+_executor_pid = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor():
+    """Return the process-wide worker pool, rebuilt after a fork."""
+    global _executor, _executor_pid
+    if _executor is None or _executor_pid != os.getpid():
+        with _executor_lock:
+            if _executor is None or _executor_pid != os.getpid():
+                _executor = ThreadPoolExecutor(
+                    max_workers=max(1, IMAGE_WORKERS),
+                    thread_name_prefix="image-pipeline",
+                )
+                _executor_pid = os.getpid()
+    return _executor
+
+
+def available_formats():
+    """Output formats this Pillow build can write, preferred first."""
+    if Image is None:
+        return []
+    Image.init()
+    return [fmt for fmt in ("webp", "avif") if fmt.upper() in Image.SAVE]
+
+
+# =============================================================================
+# METADATA STRIPPING
+# =============================================================================
+
+
+def _copy_exact(src, dst, length):
+    while length > 0:
+        data = src.read(min(length, _COPY_SIZE))
+        if not data:
+            raise ValueError("truncated image")
+        dst.write(data)
+        length -= len(data)
+
+
+def _read_exact(src, length):
+    data = src.read(length)
+    if len(data) < length:
+        raise ValueError("truncated image")
+    return data
+
+
+def _jpeg_orientation(exif):
+    """Orientation (2-8) from an APP1 EXIF payload; None if absent or upright."""
+    tiff = exif[6:]
+    order = {b"II": "<", b"MM": ">"}.get(tiff[:2])
+    if order is None:
+        return None
+    try:
+        (ifd,) = struct.unpack_from(f"{order}I", tiff, 4)
+        (count,) = struct.unpack_from(f"{order}H", tiff, ifd)
+        for i in range(count):
+            tag, _, _, value = struct.unpack_from(f"{order}HHIH", tiff, ifd + 2 + 12 * i)
+            if tag == _EXIF_ORIENTATION:
+                return value if 2 <= value <= 8 else None
+    except struct.error:
+        pass
+    return None
+
+
+def _orientation_app1(orientation):
+    """An APP1 segment whose EXIF holds nothing but the orientation tag."""
+    tiff = (
+        b"MM\x00\x2a"
+        + struct.pack(">IH", 8, 1)
+        + struct.pack(">HHIHH", _EXIF_ORIENTATION, 3, 1, orientation, 0)
+        + struct.pack(">I", 0)
+    )
+    payload = b"Exif\x00\x00" + tiff
+    return b"\xff\xe1" + struct.pack(">H", len(payload) + 2) + payload
+
+
+def _strip_jpeg(src, dst):
+    if src.read(2) != b"\xff\xd8":
+        raise ValueError("not a JPEG")
+    dst.write(b"\xff\xd8")
+    dropped = False
+    while True:
+        if src.read(1) != b"\xff":
+            raise ValueError("bad JPEG marker")
+        marker = src.read(1)
+        while marker == b"\xff":
+            marker = src.read(1)
+        if not marker:
+            raise ValueError("truncated image")
+        code = marker[0]
+        if code in (0xDA, 0xD9):
+            # Start of scan / end of image: nothing but image data follows
+            dst.write(b"\xff" + marker)
+            shutil.copyfileobj(src, dst, _COPY_SIZE)
+            return dropped
+        if code == 0x01 or 0xD0 <= code <= 0xD7:
+            dst.write(b"\xff" + marker)
+            continue
+        header = _read_exact(src, 2)
+        (length,) = struct.unpack(">H", header)
+        if length < 2:
+            raise ValueError("bad JPEG segment")
+        payload = _read_exact(src, length - 2)
+        if code in _JPEG_DROP:
+            dropped = True
+            # Keep the orientation so the photo still displays upright
+            if code == 0xE1 and payload.startswith(b"Exif\x00\x00"):
+                orientation = _jpeg_orientation(payload)
+                if orientation:
+                    dst.write(_orientation_app1(orientation))
+            continue
+        dst.write(b"\xff" + marker + header + payload)
+
+
+def _strip_png(src, dst):
+    if src.read(8) != _PNG_SIGNATURE:
+        raise ValueError("not a PNG")
+    dst.write(_PNG_SIGNATURE)
+    dropped = False
+    while True:
+        header = src.read(8)
+        if not header:
+            return dropped
+        if len(header) < 8:
+            raise ValueError("truncated image")
+        length, chunk_type = struct.unpack(">I4s", header)
+        if chunk_type in _PNG_DROP:
+            _read_exact(src, length + 4)  # data + CRC
+            dropped = True
+            continue
+        dst.write(header)
+        _copy_exact(src, dst, length + 4)
+
+
+def _strip_webp(src, dst):
+    header = src.read(12)
+    if len(header) < 12 or header[:4] != b"RIFF" or header[8:] != b"WEBP":
+        raise ValueError("not a WebP")
+    dst.write(header)
+    dropped = False
+    while True:
+        chunk_header = src.read(8)
+        if not chunk_header:
+            break
+        if len(chunk_header) < 8:
+            raise ValueError("truncated image")
+        fourcc, size = struct.unpack("<4sI", chunk_header)
+        padded = size + (size & 1)
+        if fourcc in _WEBP_DROP:
+            _read_exact(src, padded)
+            dropped = True
+        elif fourcc == b"VP8X":
+            data = _read_exact(src, padded)
+            dst.write(chunk_header + bytes([data[0] & ~_WEBP_METADATA_FLAGS & 0xFF]) + data[1:])
+        else:
+            dst.write(chunk_header)
+            _copy_exact(src, dst, padded)
+    # The RIFF size covers everything after itself
+    total = dst.tell()
+    dst.seek(4)
+    dst.write(struct.pack("<I", total - 8))
+    return dropped
+
+
+_STRIPPERS = {"jpg": _strip_jpeg, "png": _strip_png, "webp": _strip_webp}
+
+
+def strip_metadata(src_path, dst_path, ext):
+    """
+    Write a copy of an upload without EXIF, XMP, IPTC or text metadata.
+
+    Only metadata segments are dropped; image data is copied byte for
+    byte, so this is a cheap pass that never re-encodes. A JPEG keeps its
+    orientation as a minimal EXIF block. GIFs, and files that are not
+    valid for their extension, are left as they are.
+
+    Args:
+        src_path (str): The upload as received
+        dst_path (str): Where to write the stripped copy
+        ext (str): Validated file extension
+
+    Returns:
+        bool: True if a stripped copy was written to dst_path
+    """
+    strip = _STRIPPERS.get(ext)
+    if strip is None:
+        return False
+    try:
+        with open(src_path, "rb") as src, open(dst_path, "wb") as dst:
+            dropped = strip(src, dst)
+    except ValueError:
+        dropped = False
+    if not dropped and os.path.exists(dst_path):
+        os.remove(dst_path)
+    return dropped
+
+
+# =============================================================================
+# VARIANTS
+# =============================================================================
+
+
+def _stem(filename):
+    return filename.rsplit(".", 1)[0]
+
+
+def manifest_path(folder, filename):
+    return os.path.join(folder, f"{_stem(filename)}.json")
+
+
+def variant_name(filename, size, fmt):
+    """File name of one generated variant, e.g. abc123_thumb.webp."""
+    return f"{_stem(filename)}_{size}.{fmt}"
+
+
+def variant_urls(filename, url_prefix="/uploads"):
+    """
+    Predict variant URLs for an upload so clients can use them right away.
+
+    Returns:
+        dict: {size: {fmt: url}} for every configured size and format
+    """
+    return {
+        size: {
+            fmt: f"{url_prefix}/{variant_name(filename, size, fmt)}"
+            for fmt in available_formats()
+        }
+        for size in IMAGE_SIZES
+    }
+
+
+def _write_json(path, data):
+    tmp = f"{path}.tmp"
+    with open(tmp, "w") as f:
+        json.dump(data, f)
+    os.replace(tmp, path)
+
+
+def read_manifest(folder, filename):
+    """
+    Read the processing manifest for an upload.
+
+    Returns:
+        dict or None: Manifest with status and variants, None if unknown
+    """
+    try:
+        with open(manifest_path(folder, filename)) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _save_atomic(image, path, fmt, **options):
+    tmp = f"{path}.tmp"
+    image.save(tmp, format=fmt, **options)
+    os.replace(tmp, path)
+
+
+def process_upload(folder, filename, url_prefix="/uploads"):
+    """
+    Generate the metadata-free variants of an upload.
+
+    Variants are written to temporary names and renamed into place, so a
+    reader never sees a half-written file.
+
+    Args:
+        folder (str): Directory holding the original upload
+        filename (str): Stored file name of the original
+        url_prefix (str): Public URL prefix for files in `folder`
+
+    Returns:
+        dict: The final manifest
+    """
+    manifest = {"original": f"{url_prefix}/{filename}", "variants": {}}
+    if Image is None:
+        manifest["status"] = STATUS_SKIPPED
+        _write_json(manifest_path(folder, filename), manifest)
+        return manifest
+
+    path = os.path.join(folder, filename)
+    try:
+        with Image.open(path) as src:
+            image = ImageOps.exif_transpose(src)
+            image.load()
+        # Variants are saved without exif=..., so not even the orientation
+        # block kept by strip_metadata carries over
+        image.info.pop("exif", None)
+        image.info.pop("xmp", None)
+
+        if image.mode not in ("RGB", "RGBA"):
+            image = image.convert("RGBA" if "transparency" in image.info else "RGB")
+
+        for size, longest in IMAGE_SIZES.items():
+            resized = image.copy()
+            if longest:
+                resized.thumbnail((longest, longest))
+            urls = {}
+            for out in available_formats():
+                name = variant_name(filename, size, out)
+                _save_atomic(
+                    resized, os.path.join(folder, name), out.upper(), quality=IMAGE_QUALITY
+                )
+                urls[out] = f"{url_prefix}/{name}"
+            manifest["variants"][size] = urls
+
+        manifest["status"] = STATUS_READY
+    except Exception as e:
+        print(f"Image processing failed for {filename}: {e}")
+        manifest["status"] = STATUS_FAILED
+        manifest["variants"] = {}
+
+    _write_json(manifest_path(folder, filename), manifest)
+    return manifest
+
+
+def schedule_processing(folder, filename, url_prefix="/uploads"):
+    """
+    Record a pending manifest and queue process_upload() in the background.
+
+    Returns:
+        dict: The pending manifest, including the predicted variant URLs
+    """
+    manifest = {
+        "status": STATUS_PENDING if Image is not None else STATUS_SKIPPED,
+        "original": f"{url_prefix}/{filename}",
+        "variants": variant_urls(filename, url_prefix),
+    }
+    _write_json(manifest_path(folder, filename), manifest)
+    _get_executor().submit(process_upload, folder, filename, url_prefix)
+    return manifest
+
+
+def init_app(app):
+    """
+    Log once at startup which variant formats will be produced.
+
+    Args:
+        app: Flask application
+    """
+    formats = available_formats()
+    if Image is None:
+        app.logger.warning(
+            "Pillow is not installed: uploads are stored but image variants are disabled"
+        )
+    elif not formats:
+        app.logger.warning("This Pillow build writes neither WebP nor AVIF: image variants are disabled")
+    else:
+        app.logger.info("Image variants enabled (%s)", ", ".join(formats))
@@ -2,15 +2,32 @@ import psycopg2
 import bcrypt
 from dotenv import load_dotenv
 import os
+import threading
+import time
+from contextlib import contextmanager
 from urllib.parse import urlparse
+from flask import g, has_app_context
+
+import metrics
 
 # Load environment variables from .env file
 load_dotenv()
 
+# Connection pool settings (override through the environment)
+POOL_MIN_SIZE = int(os.getenv("DB_POOL_MIN", "1"))
+POOL_MAX_SIZE = int(os.getenv("DB_POOL_MAX", "10"))
+POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "5"))
+# Connections idle for longer than this are pinged before being handed out
+POOL_CHECK_IDLE = float(os.getenv("DB_POOL_CHECK_IDLE", "30"))
 
-def load_db():
+
+class PoolTimeoutError(psycopg2.OperationalError):
+    """Raised when no pooled connection becomes available in time."""
+
+
+def _connect():
     """
-    Establish and return a connection to the PostgreSQL database.
+    Open a brand-new connection to the PostgreSQL database.
 
     Returns:
         psycopg2.connection: Database connection object
@@ -21,7 +38,9 @@ def load_db():
 
         if database_url:
             # Heroku case
-            return psycopg2.connect(database_url, connect_timeout=5)
+            return psycopg2.connect(
+                database_url, connect_timeout=5, cursor_factory=metrics.cursor_factory()
+            )
 
         # Local development (fallback to individual vars)
         conn = psycopg2.connect(
@@ -31,6 +50,7 @@ def load_db():
             host=os.getenv("HOST"),
             port=os.getenv("PORT"),
             connect_timeout=5,
+            cursor_factory=metrics.cursor_factory(),
         )
         print("Database connection established successfully")
         return conn
@@ -39,6 +59,274 @@ def load_db():
         raise
 
 
+class ConnectionPool:
+    """
+    Thread-safe pool of PostgreSQL connections.
+
+    Connections are opened lazily up to max_size, idle ones are kept for
+    reuse, and getconn() waits up to `timeout` seconds when every
+    connection is checked out.
+    """
+
+    def __init__(
+        self,
+        min_size=POOL_MIN_SIZE,
+        max_size=POOL_MAX_SIZE,
+        timeout=POOL_TIMEOUT,
+        check_idle=POOL_CHECK_IDLE,
+    ):
+        self.min_size = max(0, min_size)
+        self.max_size = max(1, max_size, self.min_size)
+        self.timeout = timeout
+        self.check_idle = check_idle
+        self._idle = []  # (conn, last_used) pairs, most recently used last
+        self._in_use = 0
+        self._cond = threading.Condition()
+
+        for _ in range(self.min_size):
+            self._idle.append((_connect(), time.monotonic()))
+
+    @property
+    def size(self):
+        return len(self._idle) + self._in_use
+
+    def getconn(self):
+        """
+        Borrow a connection, opening a new one if the pool is not full.
+
+        Raises:
+            PoolTimeoutError: If the pool is exhausted for `timeout` seconds
+        """
+        started = time.monotonic()
+        deadline = started + self.timeout
+        with self._cond:
+            while True:
+                if self._idle:
+                    conn, last_used = self._idle.pop()
+                    self._in_use += 1
+                    break
+                if self.size < self.max_size:
+                    conn, last_used = None, None
+                    self._in_use += 1
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    metrics.db_pool_timeouts.inc()
+                    raise PoolTimeoutError(
+                        f"Timed out after {self.timeout}s waiting for a database connection"
+                    )
+                self._cond.wait(remaining)
+
+        try:
+            if conn is not None and not self._is_healthy(conn, last_used):
+                self._discard(conn)
+                conn = None
+            if conn is None:
+                conn = _connect()
+            metrics.db_pool_wait.observe(time.monotonic() - started)
+            return conn
+        except Exception:
+            with self._cond:
+                self._in_use -= 1
+                self._cond.notify()
+            raise
+
+    def putconn(self, conn, close=False):
+        """
+        Return a borrowed connection to the pool.
+
+        Any open transaction is rolled back so the next borrower starts clean.
+        Broken connections (or close=True) are discarded instead of reused.
+        """
+        if not close and not conn.closed:
+            try:
+                conn.rollback()
+            except psycopg2.Error:
+                close = True
+        else:
+            close = True
+
+        with self._cond:
+            self._in_use -= 1
+            if close:
+                self._discard(conn)
+            else:
+                self._idle.append((conn, time.monotonic()))
+            self._cond.notify()
+
+    def closeall(self):
+        """Close every idle connection (checked-out ones close on return)."""
+        with self._cond:
+            while self._idle:
+                conn, _ = self._idle.pop()
+                self._discard(conn)
+
+    def _is_healthy(self, conn, last_used):
+        if conn.closed:
+            return False
+        if time.monotonic() - last_used < self.check_idle:
+            return True
+        try:
+            with conn.cursor() as cur:
+                cur.execute("SELECT 1")
+            conn.rollback()
+            return True
+        except psycopg2.Error:
+            return False
+
+    @staticmethod
+    def _discard(conn):
+        try:
+            conn.close()
+        except psycopg2.Error:
+            pass
+
+
+_pool = None
+_pool_pid = None
+_pool_lock = threading.Lock()
+
+
+def get_pool():
+    """
+    Return the process-wide connection pool, creating it on first use.
+
+    The pool is rebuilt after a fork (e.g. gunicorn workers) so processes
+    never share sockets.
+
+    Returns:
+        ConnectionPool: The pool for the current process
+    """
+    global _pool, _pool_pid
+    if _pool is None or _pool_pid != os.getpid():
+        with _pool_lock:
+            if _pool is None or _pool_pid != os.getpid():
+                _pool = ConnectionPool()
+                _pool_pid = os.getpid()
+    return _pool
+
+
+def _pool_gauges():
+    pool = _pool
+    if pool is None or _pool_pid != os.getpid():
+        return {}
+    with pool._cond:
+        return {("idle",): len(pool._idle), ("in_use",): pool._in_use}
+
+
+metrics.register_gauge(
+    "db_pool_connections", "Pooled connections by state", ("state",), _pool_gauges
+)
+
+
+@contextmanager
+def pooled_connection():
+    """
+    Borrow a pool connection independent of the request-bound one.
+
+    For work that runs concurrently (e.g. in worker threads), where sharing
+    the request's connection is not safe.
+
+    Yields:
+        psycopg2.connection: Database connection, returned to the pool on exit
+    """
+    pool = get_pool()
+    conn = pool.getconn()
+    try:
+        yield conn
+    finally:
+        pool.putconn(conn)
+
+
+def load_db():
+    """
+    Return a connection to the PostgreSQL database.
+
+    Inside a Flask app context the connection is borrowed from the pool once
+    per request and shared by every DAO; it is returned by teardown_db().
+    Outside an app context (scripts, shell) a dedicated connection is opened.
+
+    Returns:
+        psycopg2.connection: Database connection object
+    """
+    if not has_app_context():
+        return _connect()
+
+    if "db_conn" not in g:
+        g.db_conn = get_pool().getconn()
+    return g.db_conn
+
+
+def release_db(conn):
+    """
+    Release a connection obtained from load_db().
+
+    Request-bound connections are left for teardown_db(); standalone ones
+    are closed.
+
+    Args:
+        conn: Database connection
+    """
+    if conn is None:
+        return
+    if has_app_context() and g.get("db_conn") is conn:
+        return
+    if not conn.closed:
+        conn.close()
+
+
+@contextmanager
+def detached_db(conn):
+    """
+    Keep a load_db() connection for work that outlives the request, such
+    as a streamed response.
+
+    Flask pops the app context, and teardown_db() returns the request's
+    connection, as soon as the view returns, even for responses wrapped in
+    stream_with_context. A request-bound connection is therefore detached
+    from the request here and returned to the pool on exit instead, so a
+    stream keeps the pool slot the request already holds rather than
+    borrowing a second one. Standalone connections stay with the caller.
+
+    The open transaction is committed first, so reads made earlier in the
+    request do not leave the connection idle in transaction meanwhile.
+
+    Yields:
+        psycopg2.connection: The same connection
+    """
+    owned = has_app_context() and g.get("db_conn") is conn
+    if owned:
+        g.pop("db_conn")
+    try:
+        conn.commit()
+        yield conn
+    finally:
+        if owned:
+            get_pool().putconn(conn)
+
+
+def teardown_db(exception=None):
+    """
+    Return the request's pooled connection, if any, when the app context ends.
+
+    Args:
+        exception: Exception that ended the request, if any
+    """
+    conn = g.pop("db_conn", None)
+    if conn is not None:
+        get_pool().putconn(conn)
+
+
+def init_app(app):
+    """
+    Bind pooled connections to the Flask app context.
+
+    Args:
+        app: Flask application
+    """
+    app.teardown_appcontext(teardown_db)
+
+
 def close_db(conn, cursor):
     """
     Close database connection and cursor.
@@ -0,0 +1,426 @@
+"""
+In-process latency and throughput metrics, exposed in Prometheus text format.
+
+Three layers are measured:
+
+- every Flask request, by route template, method and status
+  (http_request_duration_seconds);
+- every public DAO method, via the @instrument_dao class decorator
+  (dao_call_duration_seconds, dao_call_errors_total, dao_rows);
+- every SQL statement, via TimedCursor, attributed to the DAO method that
+  ran it (db_query_duration_seconds), plus time spent waiting for a pooled
+  connection (db_pool_wait_seconds, recorded by load.ConnectionPool).
+
+Statements slower than SLOW_QUERY_MS are logged with their SQL template and
+the shape of their parameters (types and lengths, never the values).
+
+Metrics live in the worker process that recorded them; with several
+gunicorn workers each scrape of GET /metrics sees one worker's figures.
+"""
+
+import inspect
+import logging
+import os
+import re
+import threading
+import time
+from functools import wraps
+
+import psycopg2.extensions
+from flask import g, request
+
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "1") not in ("0", "false", "no")
+# Log statements slower than this many milliseconds (0 disables the log)
+SLOW_QUERY_MS = float(os.getenv("SLOW_QUERY_MS", "0"))
+
+# Upper bounds (seconds) shared by every latency histogram
+LATENCY_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+ROW_BUCKETS = (0, 1, 10, 100, 1000, 10000, 100000)
+
+slow_query_log = logging.getLogger("slow_query")
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(names, values, extra=None):
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_number(value):
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    """Monotonic counter, one value per label combination."""
+
+    kind = "counter"
+
+    def __init__(self, name, documentation, labels=()):
+        self.name = name
+        self.documentation = documentation
+        self.labels = tuple(labels)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *label_values, amount=1):
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0) + amount
+
+    def samples(self):
+        with self._lock:
+            items = sorted(self._values.items())
+        for values, total in items:
+            yield self.name, _format_labels(self.labels, values), total
+
+
+class Histogram:
+    """Cumulative histogram (bucket counts, sum, count) per label combination."""
+
+    kind = "histogram"
+
+    def __init__(self, name, documentation, labels=(), buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labels = tuple(labels)
+        self.buckets = tuple(sorted(buckets)) + (float("inf"),)
+        self._series = {}  # label values -> [bucket counts, sum, count]
+        self._lock = threading.Lock()
+
+    def observe(self, value, *label_values):
+        with self._lock:
+            series = self._series.get(label_values)
+            if series is None:
+                series = self._series[label_values] = [[0] * len(self.buckets), 0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[0][i] += 1
+                    break
+            series[1] += value
+            series[2] += 1
+
+    def samples(self):
+        with self._lock:
+            items = sorted((k, (list(v[0]), v[1], v[2])) for k, v in self._series.items())
+        for values, (counts, total, count) in items:
+            cumulative = 0
+            for bound, n in zip(self.buckets, counts):
+                cumulative += n
+                le = f'le="{_format_number(bound)}"'
+                yield f"{self.name}_bucket", _format_labels(self.labels, values, le), cumulative
+            yield f"{self.name}_sum", _format_labels(self.labels, values), total
+            yield f"{self.name}_count", _format_labels(self.labels, values), count
+
+
+class GaugeCallback:
+    """Gauge whose values are read from a callback at scrape time."""
+
+    kind = "gauge"
+
+    def __init__(self, name, documentation, labels, callback):
+        self.name = name
+        self.documentation = documentation
+        self.labels = tuple(labels)
+        self.callback = callback
+
+    def samples(self):
+        try:
+            values = self.callback()
+        except Exception as e:
+            print(f"Metrics gauge {self.name} failed: {e}")
+            return
+        for label_values, value in sorted(values.items()):
+            yield self.name, _format_labels(self.labels, label_values), value
+
+
+class Registry:
+    def __init__(self):
+        self._metrics = []
+
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def render(self):
+        """All metrics in the Prometheus text exposition format (0.0.4)."""
+        lines = []
+        for metric in self._metrics:
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            for name, labels, value in metric.samples():
+                lines.append(f"{name}{labels} {_format_number(value)}")
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+http_request_duration = registry.register(
+    Histogram(
+        "http_request_duration_seconds",
+        "Time to produce a response, by route template",
+        ("method", "route", "status"),
+    )
+)
+dao_call_duration = registry.register(
+    Histogram(
+        "dao_call_duration_seconds",
+        "Wall time of DAO method calls",
+        ("dao", "method"),
+    )
+)
+dao_call_errors = registry.register(
+    Counter(
+        "dao_call_errors_total",
+        "DAO method calls that raised",
+        ("dao", "method", "error"),
+    )
+)
+dao_rows = registry.register(
+    Histogram(
+        "dao_rows",
+        "Rows returned or affected per DAO method call",
+        ("dao", "method"),
+        buckets=ROW_BUCKETS,
+    )
+)
+db_query_duration = registry.register(
+    Histogram(
+        "db_query_duration_seconds",
+        "Execution time of individual SQL statements, by calling DAO method",
+        ("caller",),
+    )
+)
+db_slow_queries = registry.register(
+    Counter(
+        "db_slow_queries_total",
+        "Statements slower than SLOW_QUERY_MS",
+        ("caller",),
+    )
+)
+db_pool_wait = registry.register(
+    Histogram(
+        "db_pool_wait_seconds",
+        "Time spent waiting for (or opening) a pooled connection",
+    )
+)
+db_pool_timeouts = registry.register(
+    Counter("db_pool_timeouts_total", "getconn() calls that timed out")
+)
+
+
+def register_gauge(name, documentation, labels, callback):
+    """
+    Expose values computed at scrape time.
+
+    Args:
+        callback: Returns {label values tuple: number}
+    """
+    return registry.register(GaugeCallback(name, documentation, labels, callback))
+
+
+# =============================================================================
+# DAO AND QUERY TIMING
+# =============================================================================
+
+# Per-thread stack of [caller label, rows] for the DAO calls in progress
+_calls = threading.local()
+
+
+def _call_stack():
+    stack = getattr(_calls, "stack", None)
+    if stack is None:
+        stack = _calls.stack = []
+    return stack
+
+
+def _current_caller():
+    stack = _call_stack()
+    return stack[-1][0] if stack else "unknown"
+
+
+def instrument_dao(cls):
+    """
+    Class decorator timing every public method of a DAO.
+
+    Generator methods (server-side cursor streams) are timed across all of
+    their resumptions, since their work happens after the call returns.
+    """
+    if not METRICS_ENABLED:
+        return cls
+
+    for attr, fn in list(vars(cls).items()):
+        if attr.startswith("_") or attr == "close" or not inspect.isfunction(fn):
+            continue
+        timed = _timed_generator if inspect.isgeneratorfunction(fn) else _timed_method
+        setattr(cls, attr, timed(cls.__name__, attr, fn))
+    return cls
+
+
+def _timed_method(dao, method, fn):
+    caller = f"{dao}.{method}"
+
+    @wraps(fn)
+    def wrapper(*args, **kwargs):
+        stack = _call_stack()
+        frame = [caller, 0]
+        stack.append(frame)
+        start = time.perf_counter()
+        try:
+            return fn(*args, **kwargs)
+        except Exception as e:
+            dao_call_errors.inc(dao, method, type(e).__name__)
+            raise
+        finally:
+            dao_call_duration.observe(time.perf_counter() - start, dao, method)
+            dao_rows.observe(frame[1], dao, method)
+            stack.pop()
+
+    return wrapper
+
+
+def _timed_generator(dao, method, fn):
+    caller = f"{dao}.{method}"
+
+    @wraps(fn)
+    def wrapper(*args, **kwargs):
+        gen = fn(*args, **kwargs)
+        frame = [caller, 0]
+        elapsed = 0.0
+        try:
+            while True:
+                stack = _call_stack()
+                stack.append(frame)
+                start = time.perf_counter()
+                try:
+                    item = next(gen)
+                except StopIteration:
+                    return
+                except Exception as e:
+                    dao_call_errors.inc(dao, method, type(e).__name__)
+                    raise
+                finally:
+                    elapsed += time.perf_counter() - start
+                    stack.pop()
+                frame[1] += 1  # server-side cursors report no rowcount
+                yield item
+        finally:
+            gen.close()
+            dao_call_duration.observe(elapsed, dao, method)
+            dao_rows.observe(frame[1], dao, method)
+
+    return wrapper
+
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def _shape_label(params):
+    """Top-level parameter shape; sequences are summarised as list[n]."""
+    if isinstance(params, dict):
+        return {k: _shape_label(v) for k, v in params.items()}
+    if isinstance(params, (list, tuple)):
+        return [
+            f"{type(p).__name__}[{len(p)}]" if isinstance(p, (list, tuple)) else type(p).__name__
+            for p in params
+        ]
+    return type(params).__name__
+
+
+def _record_query(query, params, elapsed, rowcount):
+    caller = _current_caller()
+    db_query_duration.observe(elapsed, caller)
+    stack = _call_stack()
+    if stack and rowcount and rowcount > 0:
+        stack[-1][1] += rowcount
+
+    if SLOW_QUERY_MS and elapsed * 1000 >= SLOW_QUERY_MS:
+        db_slow_queries.inc(caller)
+        if isinstance(query, bytes):
+            query = query.decode(errors="replace")
+        slow_query_log.warning(
+            "slow query %.1fms caller=%s rows=%s params=%s sql=%s",
+            elapsed * 1000,
+            caller,
+            rowcount,
+            _shape_label(params) if params is not None else None,
+            _WHITESPACE.sub(" ", str(query)).strip(),
+        )
+
+
+class TimedCursor(psycopg2.extensions.cursor):
+    """psycopg2 cursor that records the duration of every execute()."""
+
+    def execute(self, query, vars=None):
+        start = time.perf_counter()
+        try:
+            return super().execute(query, vars)
+        finally:
+            _record_query(query, vars, time.perf_counter() - start, self.rowcount)
+
+    def executemany(self, query, vars_list):
+        start = time.perf_counter()
+        try:
+            return super().executemany(query, vars_list)
+        finally:
+            _record_query(query, None, time.perf_counter() - start, self.rowcount)
+
+
+def cursor_factory():
+    """Cursor class for new connections, or None when metrics are disabled."""
+    return TimedCursor if METRICS_ENABLED else None
+
+
+# =============================================================================
+# FLASK INTEGRATION
+# =============================================================================
+
+
+def _start_timer():
+    g.request_started = time.perf_counter()
+
+
+def _note_status(response):
+    g.response_status = response.status_code
+    return response
+
+
+def _observe_request(exception=None):
+    # teardown_request also runs when the view raised and after_request did
+    # not, so unhandled errors are recorded too (as 500)
+    started = g.pop("request_started", None)
+    if started is None:
+        return
+    status = 500 if exception is not None else g.pop("response_status", 500)
+    rule = request.url_rule.rule if request.url_rule else "<unmatched>"
+    http_request_duration.observe(time.perf_counter() - started, request.method, rule, str(status))
+
+
+def init_app(app):
+    """
+    Time every request and serve the metrics at GET /metrics.
+
+    Requests are observed when their request context is torn down, which
+    includes requests whose view raised. Streaming responses are timed up
+    to the moment the view returns, or to the end of the stream with
+    stream_with_context.
+
+    Args:
+        app: Flask application
+    """
+    if not METRICS_ENABLED:
+        return
+
+    app.before_request(_start_timer)
+    app.after_request(_note_status)
+    app.teardown_request(_observe_request)
+
+    def metrics():
+        return registry.render(), 200, {"Content-Type": "text/plain; version=0.0.4"}
+
+    app.add_url_rule("/metrics", "metrics", metrics, methods=["GET"])
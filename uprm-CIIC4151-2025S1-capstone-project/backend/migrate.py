@@ -0,0 +1,314 @@
+"""
+Apply versioned schema migrations on top of tables.sql.
+
+Migrations live in migrations/ as NNNN_description.up.sql and
+NNNN_description.down.sql. Applied versions are recorded, with a checksum
+of their up script, in the schema_migrations table:
+
+    python migrate.py status
+    python migrate.py up [--to N]
+    python migrate.py down [--to N | --steps N]
+    python migrate.py verify
+
+A script whose first line is `-- migrate: no-transaction` runs statement by
+statement in autocommit (needed for CREATE INDEX CONCURRENTLY); statements
+are split on `;` once `--` comments are removed, so such scripts must not
+contain either in string literals.
+Every other script runs in one transaction together with its bookkeeping.
+
+0000_baseline_schema brings a database created from the original
+tables.sql up to the current one, so existing data is upgraded rather than
+reloaded. Applied scripts are never edited (status flags them as CHANGED);
+corrections go in a new version.
+
+`-- verify: Dao.method index_name` lines in an up script name a DAO method
+whose plan must use that index; `verify` runs those methods under EXPLAIN
+(see benchmarks.dao_bench) and exits with status 1 if one does not. Run it
+against a seeded database: on the sample data the planner rightly prefers
+sequential scans.
+"""
+
+import argparse
+import hashlib
+import os
+import re
+import sys
+from contextlib import contextmanager
+
+from load import load_db, release_db
+
+MIGRATIONS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "migrations")
+NO_TRANSACTION = "-- migrate: no-transaction"
+# Arbitrary key for pg_advisory_lock, so two runners never interleave
+LOCK_KEY = 4151_2025
+
+_FILENAME = re.compile(r"^(\d{4})_(\w+)\.(up|down)\.sql$")
+_VERIFY = re.compile(r"^--\s*verify:\s*(\w+)\.(\w+)\s+(\w+)\s*$", re.MULTILINE)
+
+
+class Migration:
+    def __init__(self, version, name):
+        self.version = version
+        self.name = name
+        self.up_path = None
+        self.down_path = None
+
+    @property
+    def label(self):
+        return f"{self.version:04d}_{self.name}"
+
+    def read(self, direction):
+        path = self.up_path if direction == "up" else self.down_path
+        if path is None:
+            raise SystemExit(f"{self.label} has no {direction} script")
+        with open(path) as f:
+            return f.read()
+
+    def checksum(self):
+        return hashlib.sha256(self.read("up").encode()).hexdigest()
+
+    def verifications(self):
+        """(dao class name, method, index name) tuples from the up script."""
+        return _VERIFY.findall(self.read("up"))
+
+
+def discover(directory=MIGRATIONS_DIR):
+    """
+    Migrations found in `directory`, ordered by version.
+
+    Returns:
+        list[Migration]
+    """
+    migrations = {}
+    for filename in sorted(os.listdir(directory)):
+        match = _FILENAME.match(filename)
+        if not match:
+            continue
+        version, name, direction = int(match.group(1)), match.group(2), match.group(3)
+        migration = migrations.setdefault(version, Migration(version, name))
+        if migration.name != name:
+            raise SystemExit(f"version {version:04d} is used by both {migration.name} and {name}")
+        setattr(migration, f"{direction}_path", os.path.join(directory, filename))
+    return [migrations[v] for v in sorted(migrations)]
+
+
+def _ensure_table(conn):
+    with conn.cursor() as cur:
+        cur.execute("""
+            CREATE TABLE IF NOT EXISTS schema_migrations (
+                version INTEGER PRIMARY KEY,
+                name VARCHAR(200) NOT NULL,
+                checksum CHAR(64) NOT NULL,
+                applied_at TIMESTAMP NOT NULL DEFAULT NOW()
+            )
+        """)
+
+
+def applied_versions(conn):
+    """
+    Returns:
+        dict: {version: (name, checksum, applied_at)}
+    """
+    _ensure_table(conn)
+    with conn.cursor() as cur:
+        cur.execute("SELECT version, name, checksum, applied_at FROM schema_migrations")
+        return {row[0]: row[1:] for row in cur.fetchall()}
+
+
+def _statements(sql):
+    sql = re.sub(r"--[^\n]*", "", sql)
+    return [s.strip() for s in sql.split(";") if s.strip()]
+
+
+def _run(conn, migration, direction):
+    sql = migration.read(direction)
+    if direction == "up":
+        record = (
+            "INSERT INTO schema_migrations (version, name, checksum) VALUES (%s, %s, %s)",
+            (migration.version, migration.name, migration.checksum()),
+        )
+    else:
+        record = ("DELETE FROM schema_migrations WHERE version = %s", (migration.version,))
+
+    with conn.cursor() as cur:
+        if sql.lstrip().startswith(NO_TRANSACTION):
+            for statement in _statements(sql):
+                cur.execute(statement)
+            cur.execute(*record)
+        else:
+            cur.execute("BEGIN")
+            try:
+                cur.execute(sql)
+                cur.execute(*record)
+                cur.execute("COMMIT")
+            except Exception:
+                cur.execute("ROLLBACK")
+                raise
+
+
+@contextmanager
+def _migration_lock(conn):
+    """Hold the session-level advisory lock shared by every runner."""
+    with conn.cursor() as cur:
+        cur.execute("SELECT pg_advisory_lock(%s)", (LOCK_KEY,))
+    try:
+        yield
+    finally:
+        with conn.cursor() as cur:
+            cur.execute("SELECT pg_advisory_unlock(%s)", (LOCK_KEY,))
+
+
+def migrate_up(conn, target=None):
+    """
+    Apply every pending migration up to `target` (all when None), in order.
+
+    Args:
+        conn: Connection in autocommit mode
+
+    Returns:
+        list[str]: Labels of the migrations applied
+    """
+    with _migration_lock(conn):
+        applied = applied_versions(conn)
+        done = []
+        for migration in discover():
+            if migration.version in applied or (target is not None and migration.version > target):
+                continue
+            print(f"up   {migration.label}")
+            _run(conn, migration, "up")
+            done.append(migration.label)
+        return done
+
+
+def migrate_down(conn, target=None, steps=1):
+    """
+    Revert applied migrations, newest first: every version above `target`,
+    or the last `steps` when no target is given.
+
+    Args:
+        conn: Connection in autocommit mode
+
+    Returns:
+        list[str]: Labels of the migrations reverted
+    """
+    with _migration_lock(conn):
+        applied = applied_versions(conn)
+        known = {m.version: m for m in discover()}
+        versions = sorted(applied, reverse=True)
+        if target is not None:
+            versions = [v for v in versions if v > target]
+        else:
+            versions = versions[:steps]
+
+        done = []
+        for version in versions:
+            migration = known.get(version)
+            if migration is None:
+                raise SystemExit(f"applied version {version:04d} has no script in {MIGRATIONS_DIR}")
+            print(f"down {migration.label}")
+            _run(conn, migration, "down")
+            done.append(migration.label)
+        return done
+
+
+def status(conn):
+    """Print every known or applied migration; True if any checksum drifted."""
+    applied = applied_versions(conn)
+    drifted = False
+    for migration in discover():
+        row = applied.pop(migration.version, None)
+        if row is None:
+            state = "pending"
+        elif row[1] != migration.checksum():
+            state = f"applied {row[2]:%Y-%m-%d %H:%M}, CHANGED since"
+            drifted = True
+        else:
+            state = f"applied {row[2]:%Y-%m-%d %H:%M}"
+        print(f"{migration.label:<45} {state}")
+    for version, (name, _, applied_at) in sorted(applied.items()):
+        print(f"{version:04d}_{name:<40} applied {applied_at:%Y-%m-%d %H:%M}, script MISSING")
+    return drifted
+
+
+def verify(conn):
+    """
+    Check that the DAO methods named by `-- verify:` lines of the applied
+    migrations use their indexes.
+
+    Returns:
+        bool: True when every expectation holds
+    """
+    # Imported here: the DAO benchmarks need Flask, which up/down do not
+    from flask import Flask
+
+    from benchmarks.dao_bench import CASES, Fixtures, _walk, run_case
+    from load import init_app
+
+    applied = applied_versions(conn)
+    expected = {}
+    for migration in discover():
+        if migration.version in applied:
+            for dao, method, index in migration.verifications():
+                expected.setdefault((dao, method), []).append((migration.label, index))
+    cases = {(cls.__name__, method): (cls, build) for cls, method, build in CASES}
+
+    app = Flask(__name__)
+    init_app(app)
+    ok = True
+    with app.app_context():
+        fixtures = Fixtures(load_db())
+        for (dao, method), indexes in sorted(expected.items()):
+            case = cases.get((dao, method))
+            if case is None:
+                print(f"MISSING  {dao}.{method}: no benchmarks.dao_bench case")
+                ok = False
+                continue
+            cls, build = case
+            _, plans = run_case(cls, method, build(fixtures), 0, 0)
+            used = {
+                node["Index Name"]
+                for p in plans
+                if "Plan" in p["plan"]
+                for node in _walk(p["plan"]["Plan"])
+                if "Index Name" in node
+            }
+            for label, index in indexes:
+                found = index in used
+                ok = ok and found
+                print(f"{'ok' if found else 'UNUSED':<8} {dao}.{method} -> {index} ({label})")
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("status", help="list migrations and whether they are applied")
+    up = commands.add_parser("up", help="apply pending migrations")
+    up.add_argument("--to", type=int, help="last version to apply")
+    down = commands.add_parser("down", help="revert applied migrations")
+    down.add_argument("--to", type=int, help="revert every version above this one")
+    down.add_argument("--steps", type=int, default=1, help="migrations to revert (without --to)")
+    commands.add_parser("verify", help="check the DAO query plans use the migrated indexes")
+    args = parser.parse_args()
+
+    conn = load_db()
+    conn.autocommit = True
+    try:
+        if args.command == "status":
+            failed = status(conn)
+        elif args.command == "up":
+            print(f"{len(migrate_up(conn, args.to))} migration(s) applied")
+            failed = False
+        elif args.command == "down":
+            print(f"{len(migrate_down(conn, args.to, args.steps))} migration(s) reverted")
+            failed = False
+        else:
+            failed = not verify(conn)
+    finally:
+        release_db(conn)
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,25 @@
+-- Back to the original tables.sql schema. The statistics tables and the
+-- search/version columns are derived data, rebuilt by the up script.
+
+DROP TRIGGER IF EXISTS trg_reports_updated_at ON reports;
+DROP TRIGGER IF EXISTS trg_report_rollups ON reports;
+DROP TRIGGER IF EXISTS trg_report_counters ON reports;
+
+DROP FUNCTION IF EXISTS reports_touch_updated_at();
+DROP FUNCTION IF EXISTS report_rollups_trg();
+DROP FUNCTION IF EXISTS report_rollups_apply(TIMESTAMP, VARCHAR, VARCHAR, INTEGER);
+DROP FUNCTION IF EXISTS report_counters_trg();
+DROP FUNCTION IF EXISTS report_counters_apply(VARCHAR, VARCHAR, INTEGER, INTEGER, INTEGER);
+
+DROP TABLE IF EXISTS report_rollups;
+DROP TABLE IF EXISTS reporter_counters;
+DROP TABLE IF EXISTS report_counters;
+
+DROP INDEX IF EXISTS idx_location_lat_lon;
+DROP INDEX IF EXISTS idx_reports_created_at_id;
+DROP INDEX IF EXISTS idx_reports_search_vector;
+DROP INDEX IF EXISTS idx_reports_resolved_by;
+DROP INDEX IF EXISTS idx_reports_validated_by;
+
+ALTER TABLE reports DROP COLUMN IF EXISTS search_vector;
+ALTER TABLE reports DROP COLUMN IF EXISTS updated_at;
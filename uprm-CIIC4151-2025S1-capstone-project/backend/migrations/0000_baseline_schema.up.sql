@@ -0,0 +1,186 @@
+-- Schema added to tables.sql since the original release: report row
+-- versions (updated_at), full-text search, materialized report statistics
+-- and their triggers, and the keyset/statistics/location indexes. Upgrades
+-- a database created from the original tables.sql in place; on one created
+-- from the current tables.sql every statement is a no-op apart from the
+-- statistics rebuild, which recomputes the same rows.
+-- Report writes wait until the script commits.
+
+LOCK TABLE reports IN ACCESS EXCLUSIVE MODE;
+
+ALTER TABLE reports
+    ADD COLUMN IF NOT EXISTS updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP;
+
+-- Computed for every existing row as the column is added
+ALTER TABLE reports
+    ADD COLUMN IF NOT EXISTS search_vector TSVECTOR GENERATED ALWAYS AS (
+        setweight(to_tsvector('spanish', coalesce(title, '')), 'A') ||
+        setweight(to_tsvector('english', coalesce(title, '')), 'A') ||
+        setweight(to_tsvector('simple', coalesce(title, '')), 'A') ||
+        setweight(to_tsvector('spanish', coalesce(description, '')), 'B') ||
+        setweight(to_tsvector('english', coalesce(description, '')), 'B') ||
+        setweight(to_tsvector('simple', coalesce(description, '')), 'B')
+    ) STORED;
+
+CREATE INDEX IF NOT EXISTS idx_reports_validated_by ON reports (validated_by);
+CREATE INDEX IF NOT EXISTS idx_reports_resolved_by ON reports (resolved_by);
+CREATE INDEX IF NOT EXISTS idx_reports_search_vector ON reports USING GIN (search_vector);
+CREATE INDEX IF NOT EXISTS idx_reports_created_at_id ON reports (created_at, id);
+CREATE INDEX IF NOT EXISTS idx_location_lat_lon ON location (latitude, longitude);
+
+CREATE TABLE IF NOT EXISTS report_counters (
+    category VARCHAR(50) NOT NULL,
+    status VARCHAR(20) NOT NULL,
+    report_count BIGINT NOT NULL DEFAULT 0,
+    rated_count BIGINT NOT NULL DEFAULT 0,
+    rating_sum BIGINT NOT NULL DEFAULT 0,
+    PRIMARY KEY (category, status)
+);
+
+CREATE TABLE IF NOT EXISTS reporter_counters (
+    user_id INTEGER PRIMARY KEY,
+    report_count BIGINT NOT NULL DEFAULT 0
+);
+
+CREATE TABLE IF NOT EXISTS report_rollups (
+    granularity VARCHAR(4) NOT NULL CHECK (granularity IN ('hour', 'day')),
+    bucket_start TIMESTAMP NOT NULL,
+    category VARCHAR(50) NOT NULL,
+    status VARCHAR(20) NOT NULL,
+    report_count BIGINT NOT NULL DEFAULT 0,
+    PRIMARY KEY (granularity, bucket_start, category, status)
+);
+
+CREATE OR REPLACE FUNCTION report_counters_apply(
+    p_category VARCHAR, p_status VARCHAR, p_rating INTEGER,
+    p_created_by INTEGER, p_sign INTEGER
+) RETURNS VOID AS $$
+BEGIN
+    INSERT INTO report_counters AS rc (category, status, report_count, rated_count, rating_sum)
+    VALUES (
+        COALESCE(p_category, 'unknown'),
+        COALESCE(p_status, 'unknown'),
+        p_sign,
+        CASE WHEN p_rating IS NULL THEN 0 ELSE p_sign END,
+        COALESCE(p_rating, 0) * p_sign
+    )
+    ON CONFLICT (category, status) DO UPDATE
+    SET report_count = rc.report_count + EXCLUDED.report_count,
+        rated_count = rc.rated_count + EXCLUDED.rated_count,
+        rating_sum = rc.rating_sum + EXCLUDED.rating_sum;
+
+    IF p_created_by IS NOT NULL THEN
+        INSERT INTO reporter_counters AS uc (user_id, report_count)
+        VALUES (p_created_by, p_sign)
+        ON CONFLICT (user_id) DO UPDATE
+        SET report_count = uc.report_count + EXCLUDED.report_count;
+
+        DELETE FROM reporter_counters
+        WHERE user_id = p_created_by AND report_count <= 0;
+    END IF;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION report_counters_trg() RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP = 'UPDATE'
+       AND OLD.category IS NOT DISTINCT FROM NEW.category
+       AND OLD.status IS NOT DISTINCT FROM NEW.status
+       AND OLD.rating IS NOT DISTINCT FROM NEW.rating
+       AND OLD.created_by IS NOT DISTINCT FROM NEW.created_by THEN
+        RETURN NULL;
+    END IF;
+
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        PERFORM report_counters_apply(OLD.category, OLD.status, OLD.rating, OLD.created_by, -1);
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        PERFORM report_counters_apply(NEW.category, NEW.status, NEW.rating, NEW.created_by, 1);
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_report_counters ON reports;
+CREATE TRIGGER trg_report_counters
+AFTER INSERT OR DELETE OR UPDATE OF category, status, rating, created_by ON reports
+FOR EACH ROW EXECUTE FUNCTION report_counters_trg();
+
+CREATE OR REPLACE FUNCTION report_rollups_apply(
+    p_created_at TIMESTAMP, p_category VARCHAR, p_status VARCHAR, p_sign INTEGER
+) RETURNS VOID AS $$
+BEGIN
+    IF p_created_at IS NULL THEN
+        RETURN;
+    END IF;
+
+    INSERT INTO report_rollups AS rr (granularity, bucket_start, category, status, report_count)
+    SELECT g, date_trunc(g, p_created_at), COALESCE(p_category, 'unknown'),
+           COALESCE(p_status, 'unknown'), p_sign
+    FROM unnest(ARRAY['hour', 'day']) AS g
+    ON CONFLICT (granularity, bucket_start, category, status) DO UPDATE
+    SET report_count = rr.report_count + EXCLUDED.report_count;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION report_rollups_trg() RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP = 'UPDATE'
+       AND OLD.created_at IS NOT DISTINCT FROM NEW.created_at
+       AND OLD.category IS NOT DISTINCT FROM NEW.category
+       AND OLD.status IS NOT DISTINCT FROM NEW.status THEN
+        RETURN NULL;
+    END IF;
+
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        PERFORM report_rollups_apply(OLD.created_at, OLD.category, OLD.status, -1);
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        PERFORM report_rollups_apply(NEW.created_at, NEW.category, NEW.status, 1);
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_report_rollups ON reports;
+CREATE TRIGGER trg_report_rollups
+AFTER INSERT OR DELETE OR UPDATE OF created_at, category, status ON reports
+FOR EACH ROW EXECUTE FUNCTION report_rollups_trg();
+
+CREATE OR REPLACE FUNCTION reports_touch_updated_at() RETURNS TRIGGER AS $$
+BEGIN
+    NEW.updated_at = clock_timestamp();
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_reports_updated_at ON reports;
+CREATE TRIGGER trg_reports_updated_at
+BEFORE UPDATE ON reports
+FOR EACH ROW EXECUTE FUNCTION reports_touch_updated_at();
+
+-- Backfill the statistics (same queries as ReportsDAO.reconcile_report_counters).
+-- reports is locked, so no write can slip between the rebuild and the
+-- triggers taking over.
+DELETE FROM report_counters;
+INSERT INTO report_counters (category, status, report_count, rated_count, rating_sum)
+SELECT COALESCE(category, 'unknown'), COALESCE(status, 'unknown'),
+       COUNT(*), COUNT(rating), COALESCE(SUM(rating), 0)
+FROM reports
+GROUP BY 1, 2;
+
+DELETE FROM reporter_counters;
+INSERT INTO reporter_counters (user_id, report_count)
+SELECT created_by, COUNT(*)
+FROM reports
+WHERE created_by IS NOT NULL
+GROUP BY created_by;
+
+DELETE FROM report_rollups;
+INSERT INTO report_rollups (granularity, bucket_start, category, status, report_count)
+SELECT g, date_trunc(g, created_at), COALESCE(category, 'unknown'),
+       COALESCE(status, 'unknown'), COUNT(*)
+FROM reports
+CROSS JOIN unnest(ARRAY['hour', 'day']) AS g
+WHERE created_at IS NOT NULL
+GROUP BY 1, 2, 3, 4;
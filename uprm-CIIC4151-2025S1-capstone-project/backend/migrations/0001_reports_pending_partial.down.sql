@@ -0,0 +1,3 @@
+-- migrate: no-transaction
+
+DROP INDEX CONCURRENTLY IF EXISTS idx_reports_open_created_at_id;
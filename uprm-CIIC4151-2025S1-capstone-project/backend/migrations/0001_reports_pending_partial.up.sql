@@ -0,0 +1,9 @@
+-- migrate: no-transaction
+-- Pending queue: status = 'open' ORDER BY created_at, id. A partial index
+-- holds only the open reports, already in page order, instead of filtering
+-- idx_reports_created_at_id or sorting an idx_reports_status bitmap.
+-- verify: ReportsDAO.get_pending_reports idx_reports_open_created_at_id
+
+DROP INDEX CONCURRENTLY IF EXISTS idx_reports_open_created_at_id;
+CREATE INDEX CONCURRENTLY idx_reports_open_created_at_id
+    ON reports (created_at, id) WHERE status = 'open';
@@ -0,0 +1,4 @@
+-- migrate: no-transaction
+
+DROP INDEX CONCURRENTLY IF EXISTS idx_reports_resolved_by_unresolved;
+DROP INDEX CONCURRENTLY IF EXISTS idx_reports_validated_by_unresolved;
@@ -0,0 +1,15 @@
+-- migrate: no-transaction
+-- Assigned listing: unresolved reports validated or resolved by an admin,
+-- ORDER BY created_at, id. ReportsDAO reads each branch in order through
+-- its own index and merges them; the count BitmapOrs the same two indexes.
+-- verify: ReportsDAO.get_assigned_reports idx_reports_validated_by_unresolved
+-- verify: ReportsDAO.get_assigned_reports idx_reports_resolved_by_unresolved
+-- verify: ReportsDAO.get_assigned_reports_count idx_reports_validated_by_unresolved
+
+DROP INDEX CONCURRENTLY IF EXISTS idx_reports_validated_by_unresolved;
+CREATE INDEX CONCURRENTLY idx_reports_validated_by_unresolved
+    ON reports (validated_by, created_at, id) WHERE status <> 'resolved';
+
+DROP INDEX CONCURRENTLY IF EXISTS idx_reports_resolved_by_unresolved;
+CREATE INDEX CONCURRENTLY idx_reports_resolved_by_unresolved
+    ON reports (resolved_by, created_at, id) WHERE status <> 'resolved';
@@ -0,0 +1,9 @@
+-- migrate: no-transaction
+
+DROP INDEX CONCURRENTLY IF EXISTS idx_reports_category;
+CREATE INDEX CONCURRENTLY idx_reports_category ON reports (category);
+DROP INDEX CONCURRENTLY IF EXISTS idx_reports_category_created_at_id;
+
+DROP INDEX CONCURRENTLY IF EXISTS idx_reports_created_by;
+CREATE INDEX CONCURRENTLY idx_reports_created_by ON reports (created_by);
+DROP INDEX CONCURRENTLY IF EXISTS idx_reports_created_by_created_at_id;
@@ -0,0 +1,17 @@
+-- migrate: no-transaction
+-- "My reports" (created_by = %s) and department listings (one branch per
+-- category) page on (created_at, id). Composite indexes serve both the
+-- filter and the order; the single-column indexes they replace are a
+-- prefix of them and only cost writes.
+-- verify: ReportsDAO.get_reports_by_user idx_reports_created_by_created_at_id
+-- verify: AdministratorsDAO.get_reports_for_admin idx_reports_category_created_at_id
+
+DROP INDEX CONCURRENTLY IF EXISTS idx_reports_created_by_created_at_id;
+CREATE INDEX CONCURRENTLY idx_reports_created_by_created_at_id
+    ON reports (created_by, created_at, id);
+DROP INDEX CONCURRENTLY IF EXISTS idx_reports_created_by;
+
+DROP INDEX CONCURRENTLY IF EXISTS idx_reports_category_created_at_id;
+CREATE INDEX CONCURRENTLY idx_reports_category_created_at_id
+    ON reports (category, created_at, id);
+DROP INDEX CONCURRENTLY IF EXISTS idx_reports_category;
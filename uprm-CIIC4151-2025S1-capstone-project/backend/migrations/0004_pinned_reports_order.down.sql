@@ -0,0 +1,7 @@
+-- migrate: no-transaction
+
+DROP INDEX CONCURRENTLY IF EXISTS idx_pinned_reports_pinned_at;
+
+DROP INDEX CONCURRENTLY IF EXISTS idx_pinned_reports_user_id;
+CREATE INDEX CONCURRENTLY idx_pinned_reports_user_id ON pinned_reports (user_id);
+DROP INDEX CONCURRENTLY IF EXISTS idx_pinned_reports_user_id_pinned_at;
@@ -0,0 +1,15 @@
+-- migrate: no-transaction
+-- Pinned listings are ORDER BY pinned_at DESC, per user and overall.
+-- (user_id, pinned_at) replaces idx_pinned_reports_user_id, whose lookups
+-- the primary key (user_id, report_id) already covers.
+-- verify: PinnedReportsDAO.get_pinned_reports_by_user idx_pinned_reports_user_id_pinned_at
+-- verify: PinnedReportsDAO.get_all_pinned_reports idx_pinned_reports_pinned_at
+
+DROP INDEX CONCURRENTLY IF EXISTS idx_pinned_reports_user_id_pinned_at;
+CREATE INDEX CONCURRENTLY idx_pinned_reports_user_id_pinned_at
+    ON pinned_reports (user_id, pinned_at);
+DROP INDEX CONCURRENTLY IF EXISTS idx_pinned_reports_user_id;
+
+DROP INDEX CONCURRENTLY IF EXISTS idx_pinned_reports_pinned_at;
+CREATE INDEX CONCURRENTLY idx_pinned_reports_pinned_at
+    ON pinned_reports (pinned_at);
@@ -0,0 +1,2 @@
+COMMENT ON INDEX idx_reports_validated_by_unresolved IS NULL;
+COMMENT ON INDEX idx_reports_resolved_by_unresolved IS NULL;
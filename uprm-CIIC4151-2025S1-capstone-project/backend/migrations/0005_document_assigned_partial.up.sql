@@ -0,0 +1,9 @@
+-- 0002 says the assigned count BitmapOrs its two indexes. It does not:
+-- ReportsDAO.get_assigned_reports_count sums one COUNT(*) per branch, each
+-- an index-only scan of that branch's partial index. Recorded on the
+-- indexes themselves, since applied scripts are never edited.
+
+COMMENT ON INDEX idx_reports_validated_by_unresolved IS
+    'Assigned listing, validated_by branch: ordered page scan and its own COUNT(*)';
+COMMENT ON INDEX idx_reports_resolved_by_unresolved IS
+    'Assigned listing, resolved_by branch: ordered page scan and its own COUNT(*)';
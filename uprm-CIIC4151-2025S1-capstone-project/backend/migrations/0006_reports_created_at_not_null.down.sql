@@ -0,0 +1,2 @@
+-- Backfilled timestamps are kept
+ALTER TABLE reports ALTER COLUMN created_at DROP NOT NULL;
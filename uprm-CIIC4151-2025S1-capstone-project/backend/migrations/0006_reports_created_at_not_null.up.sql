@@ -0,0 +1,10 @@
+-- Keyset cursors encode created_at and row-value comparisons skip NULLs,
+-- so a report without one broke or vanished from every listing. Rows
+-- written without it get the earliest moment they are known to have
+-- existed, then the column is made NOT NULL.
+
+UPDATE reports
+SET created_at = COALESCE(LEAST(resolved_at, updated_at), LOCALTIMESTAMP)
+WHERE created_at IS NULL;
+
+ALTER TABLE reports ALTER COLUMN created_at SET NOT NULL;
@@ -0,0 +1,99 @@
+import base64
+import binascii
+import json
+from datetime import datetime
+
+
+class InvalidCursorError(ValueError):
+    """Raised when an after/before token cannot be decoded."""
+
+
+def encode_cursor(created_at, report_id) -> str:
+    """
+    Build an opaque keyset cursor from a row's (created_at, id) sort key.
+
+    Args:
+        created_at (datetime): Row creation timestamp (reports.created_at
+            is NOT NULL, so every row has one)
+        report_id (int): Row ID (tie-breaker)
+
+    Returns:
+        str: URL-safe cursor token
+    """
+    payload = json.dumps([created_at.isoformat(), report_id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(token: str):
+    """
+    Decode a cursor produced by encode_cursor().
+
+    Args:
+        token (str): Cursor token from the client
+
+    Returns:
+        tuple[datetime, int]: (created_at, id) sort key
+
+    Raises:
+        InvalidCursorError: If the token is malformed
+    """
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        created_at, report_id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return datetime.fromisoformat(created_at), int(report_id)
+    except (binascii.Error, ValueError, TypeError, UnicodeDecodeError) as e:
+        raise InvalidCursorError("Invalid cursor") from e
+
+
+def keyset_clause(order_dir: str, after=None, before=None):
+    """
+    Translate an after/before cursor into a row-value predicate on
+    (created_at, id) so the composite index can seek instead of OFFSET.
+
+    Args:
+        order_dir (str): 'ASC' or 'DESC', the requested page order
+        after (tuple | None): Decoded cursor; return rows following it
+        before (tuple | None): Decoded cursor; return rows preceding it
+
+    Returns:
+        tuple: (sql or None, params, scan order, reverse) where `reverse`
+        means the fetched rows must be flipped back into `order_dir`.
+    """
+    flipped = "ASC" if order_dir == "DESC" else "DESC"
+    if after is not None:
+        op = "<" if order_dir == "DESC" else ">"
+        return f"(created_at, id) {op} (%s, %s)", list(after), order_dir, False
+    if before is not None:
+        op = ">" if order_dir == "DESC" else "<"
+        return f"(created_at, id) {op} (%s, %s)", list(before), flipped, True
+    return None, [], order_dir, False
+
+
+def decode_cursors(after: str | None, before: str | None):
+    """Decode after/before tokens; raises InvalidCursorError on bad input."""
+    if after and before:
+        raise InvalidCursorError("Use only one of: after, before")
+    return (
+        decode_cursor(after) if after else None,
+        decode_cursor(before) if before else None,
+    )
+
+
+def page_cursors(rows, limit, page, after, before):
+    """
+    Trim the extra look-ahead row (DAOs are asked for limit + 1) and
+    build next/prev cursors from the first and last rows of the page.
+
+    Rows must carry id at [0] and created_at at [8] (the report row shape).
+    """
+    has_more = len(rows) > limit
+    if has_more:
+        rows = rows[1:] if before else rows[:limit]
+    if not rows:
+        return rows, None, None
+
+    has_next = has_more if not before else True
+    has_prev = bool(after) or (has_more if before else page > 1)
+    next_cursor = encode_cursor(rows[-1][8], rows[-1][0]) if has_next else None
+    prev_cursor = encode_cursor(rows[0][8], rows[0][0]) if has_prev else None
+    return rows, next_cursor, prev_cursor
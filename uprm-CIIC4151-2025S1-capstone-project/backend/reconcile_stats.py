@@ -0,0 +1,23 @@
+"""
+Repair drift in the materialized report statistics.
+
+Rebuilds report_counters, reporter_counters and report_rollups from the
+reports table.
+Run periodically (e.g. a cron or Heroku Scheduler job):
+
+    python reconcile_stats.py
+"""
+from dao.d_reports import ReportsDAO
+
+
+def main():
+    dao = ReportsDAO()
+    try:
+        drifted = dao.reconcile_report_counters()
+        print(f"Report counters reconciled ({drifted} rows corrected)")
+    finally:
+        dao.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,183 @@
+import os
+import threading
+import time
+
+import geohash
+
+# Finest geohash precision kept in the index (~38 m x 19 m cells)
+GRID_MAX_PRECISION = 8
+# Rebuild at least this often even without local writes (other workers)
+GRID_TTL = float(os.getenv("REPORT_GRID_TTL", "300"))
+# After a local write, rebuild at most this often (seconds); requests in
+# between are served the previous grid
+GRID_REBUILD_INTERVAL = float(os.getenv("REPORT_GRID_REBUILD_INTERVAL", "10"))
+
+
+def precision_for_zoom(zoom: int) -> int:
+    """Map a web-map zoom level (0-20) to a geohash precision (1-8)."""
+    zoom = max(0, min(int(zoom), 20))
+    if zoom <= 2:
+        return 1
+    if zoom <= 4:
+        return 2
+    if zoom <= 7:
+        return 3
+    if zoom <= 9:
+        return 4
+    if zoom <= 12:
+        return 5
+    if zoom <= 14:
+        return 6
+    if zoom <= 17:
+        return 7
+    return 8
+
+
+class ReportGridIndex:
+    """
+    In-process geohash grid of report counts for map clustering.
+
+    Built from per-location (category, status) counts; every precision
+    level from 1 to GRID_MAX_PRECISION is precomputed so a viewport query
+    only looks up the cells of the requested level that cover it.
+
+    Writes only mark the grid dirty. A dirty grid is rebuilt by the first
+    request after GRID_REBUILD_INTERVAL; concurrent requests keep serving
+    the previous grid meanwhile instead of waiting for the rebuild.
+    """
+
+    def __init__(self, ttl=GRID_TTL, rebuild_interval=GRID_REBUILD_INTERVAL):
+        self.ttl = ttl
+        self.rebuild_interval = rebuild_interval
+        self._levels = None
+        self._built_at = 0.0
+        self._dirty = False
+        self._lock = threading.Lock()
+
+    def invalidate(self):
+        """Mark the grid stale after a write; never waits for a rebuild."""
+        self._dirty = True
+
+    def reset(self):
+        """Drop the grid, so the next request rebuilds it (benchmarks)."""
+        with self._lock:
+            self._levels = None
+
+    def _needs_rebuild(self):
+        if self._levels is None:
+            return True
+        age = time.monotonic() - self._built_at
+        return age >= self.ttl or (self._dirty and age >= self.rebuild_interval)
+
+    def _rebuild(self, loader):
+        self._dirty = False  # writes during the rebuild mark it again
+        levels = self._build(loader())
+        self._levels, self._built_at = levels, time.monotonic()
+
+    def get_levels(self, loader):
+        """
+        Return the precomputed levels, rebuilding with loader() when stale.
+
+        Only the first build blocks; later rebuilds are done by one request
+        while the others get the grid being replaced.
+
+        Args:
+            loader: Callable returning rows of
+                (latitude, longitude, category, status, report_count)
+        """
+        if self._levels is None:
+            with self._lock:
+                if self._levels is None:
+                    self._rebuild(loader)
+        elif self._needs_rebuild() and self._lock.acquire(blocking=False):
+            try:
+                if self._needs_rebuild():
+                    self._rebuild(loader)
+            finally:
+                self._lock.release()
+        return self._levels
+
+    @staticmethod
+    def _build(rows):
+        levels = {p: {} for p in range(1, GRID_MAX_PRECISION + 1)}
+        for latitude, longitude, category, status, report_count in rows:
+            lat, lon = float(latitude), float(longitude)
+            leaf = geohash.encode(lat, lon, GRID_MAX_PRECISION)
+            for precision in range(1, GRID_MAX_PRECISION + 1):
+                cell = levels[precision].setdefault(
+                    leaf[:precision], {"lat_sum": 0.0, "lon_sum": 0.0, "counts": {}}
+                )
+                cell["lat_sum"] += lat * report_count
+                cell["lon_sum"] += lon * report_count
+                key = (category, status)
+                cell["counts"][key] = cell["counts"].get(key, 0) + report_count
+        return levels
+
+    @staticmethod
+    def query(levels, min_lat, min_lon, max_lat, max_lon, zoom, category=None, status=None):
+        """
+        Clusters for the cells of the zoom's precision that overlap the viewport.
+
+        Returns:
+            list[dict]: One entry per non-empty cell
+        """
+        precision = precision_for_zoom(zoom)
+        level = levels[precision]
+        # Look up the cells covering the viewport; walk the level instead
+        # only when the viewport spans more cells than hold data
+        if geohash.covering_count(min_lat, min_lon, max_lat, max_lon, precision) <= len(level):
+            cells = (
+                (h, level[h])
+                for h in geohash.covering(min_lat, min_lon, max_lat, max_lon, precision)
+                if h in level
+            )
+        else:
+            cells = level.items()
+
+        clusters = []
+        for cell_hash, cell in cells:
+            cell_min_lat, cell_min_lon, cell_max_lat, cell_max_lon = geohash.bounds(cell_hash)
+            if (
+                cell_max_lat < min_lat
+                or cell_min_lat > max_lat
+                or cell_max_lon < min_lon
+                or cell_min_lon > max_lon
+            ):
+                continue
+
+            by_category = {}
+            by_status = {}
+            total = 0
+            for (cat, st), n in cell["counts"].items():
+                if (category and cat != category) or (status and st != status):
+                    continue
+                by_category[cat] = by_category.get(cat, 0) + n
+                by_status[st] = by_status.get(st, 0) + n
+                total += n
+            if not total:
+                continue
+
+            all_reports = sum(cell["counts"].values())
+            clusters.append(
+                {
+                    "geohash": cell_hash,
+                    "count": total,
+                    # report-weighted centroid, so markers sit over the reports
+                    "latitude": cell["lat_sum"] / all_reports,
+                    "longitude": cell["lon_sum"] / all_reports,
+                    "bounds": {
+                        "min_lat": cell_min_lat,
+                        "min_lon": cell_min_lon,
+                        "max_lat": cell_max_lat,
+                        "max_lon": cell_max_lon,
+                    },
+                    "by_category": by_category,
+                    "by_status": by_status,
+                }
+            )
+        clusters.sort(key=lambda c: c["count"], reverse=True)
+        return clusters
+
+
+# Shared by every request in the process; marked dirty on report/location writes
+report_grid = ReportGridIndex()
@@ -0,0 +1,322 @@
+"""
+Content-addressed storage for uploaded images.
+
+Uploads are streamed to a temporary file in fixed-size chunks while being
+hashed with SHA-256, then moved to <root>/<h[0:2]>/<h[2:4]>/<h>.<ext>.
+Identical content always maps to the same path, so retried uploads are
+stored once.
+
+Metadata (EXIF, XMP, ...) is stripped before the final hash is taken (see
+images.strip_metadata), so the stored original never carries GPS or
+device tags.
+
+Resumable uploads keep a partial file plus a small JSON state file per
+session in a temp folder. Clients append byte ranges with PATCH, query the
+current offset after a dropped connection, and the file is hashed and
+moved into place once every byte has arrived.
+"""
+
+import fcntl
+import hashlib
+import json
+import os
+import re
+import time
+import uuid
+
+from images import strip_metadata
+
+# Allowed image types
+ALLOWED_EXTENSIONS = {"png", "jpg", "jpeg", "gif", "webp"}
+
+CHUNK_SIZE = 64 * 1024
+UPLOAD_MAX_BYTES = int(os.getenv("UPLOAD_MAX_BYTES", str(10 * 1024 * 1024)))
+# Resumable sessions untouched for this long are discarded
+UPLOAD_SESSION_TTL = float(os.getenv("UPLOAD_SESSION_TTL", str(24 * 3600)))
+
+# How GET /uploads/... is answered:
+#   app        - the worker sends the file (sendfile when the server supports it)
+#   x-accel    - empty response with X-Accel-Redirect for an nginx internal location
+#   x-sendfile - empty response with X-Sendfile (Apache mod_xsendfile, lighttpd)
+UPLOAD_SERVE_MODE = os.getenv("UPLOAD_SERVE_MODE", "app")
+UPLOAD_ACCEL_PREFIX = os.getenv("UPLOAD_ACCEL_PREFIX", "/protected-uploads/")
+# Content-addressed files never change; other uploads get a shorter lifetime
+UPLOAD_IMMUTABLE_MAX_AGE = 365 * 24 * 3600
+UPLOAD_MAX_AGE = int(os.getenv("UPLOAD_MAX_AGE", "86400"))
+
+# ab/cd/<sha256>[_<variant>].<ext>
+_CONTENT_ADDRESSED = re.compile(
+    r"^([0-9a-f]{2})/([0-9a-f]{2})/(\1\2[0-9a-f]{60})(?:_[a-z]+)?\.[a-z0-9]+$"
+)
+
+
+_SHA256 = re.compile(r"^[0-9a-fA-F]{64}$")
+
+
+class UploadError(ValueError):
+    """Raised for uploads that cannot be accepted (type, size, offsets)."""
+
+
+class UploadTooLargeError(UploadError):
+    """Raised when an upload exceeds UPLOAD_MAX_BYTES."""
+
+
+class OffsetMismatchError(UploadError):
+    """Raised when a chunk does not start at the session's current offset."""
+
+    def __init__(self, offset):
+        super().__init__(f"Expected chunk starting at byte {offset}")
+        self.offset = offset
+
+
+def allowed_file(filename: str) -> bool:
+    return "." in filename and filename.rsplit(".", 1)[1].lower() in ALLOWED_EXTENSIONS
+
+
+def extension_of(filename):
+    """Lower-case extension of an allowed file name, else raise UploadError."""
+    if not isinstance(filename, str) or not allowed_file(filename):
+        raise UploadError("Unsupported file type")
+    ext = filename.rsplit(".", 1)[1].lower()
+    return "jpg" if ext == "jpeg" else ext
+
+
+def normalize_digest(digest):
+    """Lower-case SHA-256 hex digest; UploadError unless it is 64 hex digits."""
+    if not isinstance(digest, str) or not _SHA256.match(digest):
+        raise UploadError("sha256 must be 64 hexadecimal characters")
+    return digest.lower()
+
+
+def content_path(digest, ext):
+    """Relative storage path for a SHA-256 hex digest, e.g. ab/cd/abcd....jpg."""
+    return f"{digest[0:2]}/{digest[2:4]}/{digest}.{ext}"
+
+
+def is_content_addressed(rel_path):
+    """True for stored originals and their variants (immutable by construction)."""
+    return _CONTENT_ADDRESSED.match(rel_path) is not None
+
+
+def _copy_stream(stream, out, hasher=None, limit=UPLOAD_MAX_BYTES, written=0):
+    """Copy stream to out in chunks; returns the new total byte count."""
+    while True:
+        chunk = stream.read(CHUNK_SIZE)
+        if not chunk:
+            return written
+        written += len(chunk)
+        if written > limit:
+            raise UploadTooLargeError("File too large")
+        if hasher is not None:
+            hasher.update(chunk)
+        out.write(chunk)
+
+
+def _file_digest(path):
+    hasher = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b""):
+            hasher.update(chunk)
+    return hasher.hexdigest()
+
+
+def _strip(tmp_root, path, ext, digest):
+    """
+    Strip metadata from a received file before it is committed.
+
+    Returns:
+        tuple: (path, digest) of the file to commit; a new temp file (and
+        `path` removed) if anything was stripped, else the inputs
+    """
+    clean_path = os.path.join(tmp_root, f"{uuid.uuid4().hex}.tmp")
+    if not strip_metadata(path, clean_path, ext):
+        return path, digest
+    os.remove(path)
+    return clean_path, _file_digest(clean_path)
+
+
+def _commit(root, tmp_path, digest, ext):
+    """
+    Move a fully written temp file to its content address.
+
+    Returns:
+        tuple: (relative path, deduplicated flag)
+    """
+    rel_path = content_path(digest, ext)
+    final_path = os.path.join(root, rel_path)
+    if os.path.exists(final_path):
+        os.remove(tmp_path)
+        return rel_path, True
+    os.makedirs(os.path.dirname(final_path), exist_ok=True)
+    os.replace(tmp_path, final_path)
+    return rel_path, False
+
+
+def store_stream(stream, ext, root, tmp_root):
+    """
+    Stream an upload to disk, hashing as it is written.
+
+    Args:
+        stream: File-like object with read(n)
+        ext (str): Validated file extension
+        root (str): Upload folder (content-addressed files live here)
+        tmp_root (str): Temp folder on the same filesystem as root
+
+    Returns:
+        tuple: (relative path, deduplicated flag, size in bytes)
+    """
+    os.makedirs(tmp_root, exist_ok=True)
+    tmp_path = os.path.join(tmp_root, f"{uuid.uuid4().hex}.tmp")
+    hasher = hashlib.sha256()
+    try:
+        with open(tmp_path, "wb") as out:
+            size = _copy_stream(stream, out, hasher)
+        if size == 0:
+            raise UploadError("Empty file")
+        tmp_path, digest = _strip(tmp_root, tmp_path, ext, hasher.hexdigest())
+        rel_path, deduplicated = _commit(root, tmp_path, digest, ext)
+        return rel_path, deduplicated, size
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def find_existing(root, digest, ext):
+    """Relative path of already-stored content with this digest, or None."""
+    rel_path = content_path(normalize_digest(digest), ext)
+    return rel_path if os.path.exists(os.path.join(root, rel_path)) else None
+
+
+# =============================================================================
+# RESUMABLE SESSIONS
+# =============================================================================
+
+
+class UploadSessions:
+    """Resumable upload sessions stored as <id>.part + <id>.json in tmp_root."""
+
+    def __init__(self, root, tmp_root):
+        self.root = root
+        self.tmp_root = tmp_root
+
+    def _paths(self, session_id):
+        if not session_id or not all(c in "0123456789abcdef" for c in session_id):
+            raise KeyError(session_id)
+        base = os.path.join(self.tmp_root, session_id)
+        return f"{base}.part", f"{base}.json"
+
+    def _state(self, session_id):
+        part_path, state_path = self._paths(session_id)
+        try:
+            with open(state_path) as f:
+                state = json.load(f)
+            state["offset"] = os.path.getsize(part_path)
+        except (OSError, ValueError):
+            raise KeyError(session_id)
+        return state
+
+    def create(self, filename, size, sha256=None):
+        """
+        Start a resumable upload.
+
+        Args:
+            filename (str): Original name (used for the extension)
+            size (int): Total size in bytes
+            sha256 (str, optional): Expected digest, verified on completion
+
+        Returns:
+            dict: Session state (id, size, offset, ext, sha256)
+        """
+        ext = extension_of(filename)
+        if sha256 is not None:
+            sha256 = normalize_digest(sha256)
+        if not isinstance(size, int) or isinstance(size, bool) or size <= 0:
+            raise UploadError("size must be a positive integer")
+        if size > UPLOAD_MAX_BYTES:
+            raise UploadTooLargeError("File too large")
+
+        self.cleanup()
+        os.makedirs(self.tmp_root, exist_ok=True)
+        session_id = uuid.uuid4().hex
+        part_path, state_path = self._paths(session_id)
+        state = {
+            "id": session_id,
+            "size": size,
+            "ext": ext,
+            "sha256": sha256,
+        }
+        open(part_path, "wb").close()
+        with open(state_path, "w") as f:
+            json.dump(state, f)
+        state["offset"] = 0
+        return state
+
+    def status(self, session_id):
+        """Session state with the current offset; KeyError if unknown."""
+        return self._state(session_id)
+
+    def append(self, session_id, start, stream):
+        """
+        Append a chunk that must begin at the current offset.
+
+        Returns:
+            dict: Updated state; includes "path" and "deduplicated" once the
+            last byte has arrived and the file was committed
+        """
+        state = self._state(session_id)
+        part_path, state_path = self._paths(session_id)
+        with open(part_path, "ab") as out:
+            # Serialize writers of the same session (e.g. a client retrying
+            # while its previous request is still draining). Completion
+            # happens under the lock too, so a retried last chunk waits for
+            # it and then finds the session gone instead of a moved file.
+            fcntl.flock(out, fcntl.LOCK_EX)
+            if not os.path.exists(state_path):
+                raise KeyError(session_id)
+            state["offset"] = out.seek(0, os.SEEK_END)
+            if start != state["offset"]:
+                raise OffsetMismatchError(state["offset"])
+            state["offset"] = _copy_stream(
+                stream, out, limit=state["size"], written=state["offset"]
+            )
+            if state["offset"] < state["size"]:
+                return state
+
+            out.flush()
+            # The client's digest covers the bytes it sent, before stripping
+            digest = _file_digest(part_path)
+            if state["sha256"] and state["sha256"] != digest:
+                self.discard(session_id)
+                raise UploadError("Checksum mismatch")
+
+            os.remove(state_path)
+            path, digest = _strip(self.tmp_root, part_path, state["ext"], digest)
+            state["path"], state["deduplicated"] = _commit(
+                self.root, path, digest, state["ext"]
+            )
+            return state
+
+    def discard(self, session_id):
+        for path in self._paths(session_id):
+            if os.path.exists(path):
+                os.remove(path)
+
+    def cleanup(self, ttl=UPLOAD_SESSION_TTL):
+        """Remove sessions whose partial file has not changed within ttl seconds."""
+        if not os.path.isdir(self.tmp_root):
+            return
+        cutoff = time.time() - ttl
+        for name in os.listdir(self.tmp_root):
+            stem, _, suffix = name.partition(".")
+            if suffix not in ("part", "tmp"):
+                continue
+            try:
+                if os.path.getmtime(os.path.join(self.tmp_root, name)) >= cutoff:
+                    continue
+                if suffix == "part":
+                    self.discard(stem)
+                else:
+                    os.remove(os.path.join(self.tmp_root, name))
+            except (OSError, KeyError):
+                pass
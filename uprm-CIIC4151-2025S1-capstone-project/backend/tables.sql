@@ -1,4 +1,10 @@
 -- Drop tables in correct order to handle foreign key dependencies
+DROP TABLE IF EXISTS report_counters;
+
+DROP TABLE IF EXISTS reporter_counters;
+
+DROP TABLE IF EXISTS report_rollups;
+
 DROP TABLE IF EXISTS pinned_reports;
 
 DROP TABLE IF EXISTS department_admins;
@@ -15,6 +21,9 @@ DROP TABLE IF EXISTS users;
 
 DROP TABLE IF EXISTS admin_codes;
 
+-- Migration history (migrate.py); indexes from migrations/ go with the tables
+DROP TABLE IF EXISTS schema_migrations;
+
 -- Users table with suspended and pinned attributes
 CREATE TABLE users (
     id SERIAL PRIMARY KEY,
@@ -88,14 +97,26 @@ CREATE TABLE reports (
     created_by INTEGER REFERENCES users (id) NOT NULL,
     validated_by INTEGER REFERENCES administrators (id),
     resolved_by INTEGER REFERENCES administrators (id),
-    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
     resolved_at TIMESTAMP,
     location INTEGER REFERENCES location (id),
     image_url VARCHAR,
     rating INTEGER CHECK (
         rating >= 1
         AND rating <= 5
-    )
+    ),
+    -- Row version for ETags; bumped by trg_reports_updated_at on every UPDATE
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    -- Full-text search document: Spanish + English stems for ranked search,
+    -- 'simple' (unstemmed) lexemes for prefix/typeahead matching
+    search_vector TSVECTOR GENERATED ALWAYS AS (
+        setweight(to_tsvector('spanish', coalesce(title, '')), 'A') ||
+        setweight(to_tsvector('english', coalesce(title, '')), 'A') ||
+        setweight(to_tsvector('simple', coalesce(title, '')), 'A') ||
+        setweight(to_tsvector('spanish', coalesce(description, '')), 'B') ||
+        setweight(to_tsvector('english', coalesce(description, '')), 'B') ||
+        setweight(to_tsvector('simple', coalesce(description, '')), 'B')
+    ) STORED
 );
 
 -- Department admins junction table
@@ -135,12 +156,160 @@ CREATE INDEX idx_reports_created_by ON reports (created_by);
 
 CREATE INDEX idx_reports_created_at ON reports (created_at);
 
+-- Per-admin statistics (see handled_reports_sql in dao/d_reports.py)
+CREATE INDEX idx_reports_validated_by ON reports (validated_by);
+
+CREATE INDEX idx_reports_resolved_by ON reports (resolved_by);
+
+-- Full-text search over title + description
+CREATE INDEX idx_reports_search_vector ON reports USING GIN (search_vector);
+
+-- Keyset pagination: ORDER BY created_at, id with (created_at, id) < / > cursor
+CREATE INDEX idx_reports_created_at_id ON reports (created_at, id);
+
 CREATE INDEX idx_administrators_department ON administrators (department);
 
+-- Bounding-box prefilter for nearby-location search
+CREATE INDEX idx_location_lat_lon ON location (latitude, longitude);
+
 CREATE INDEX idx_pinned_reports_user_id ON pinned_reports (user_id);
 
 CREATE INDEX idx_pinned_reports_report_id ON pinned_reports (report_id);
 
+-- Materialized report statistics, maintained by trigger on every report
+-- write so /stats/overview and /admin/dashboard read a few dozen rows
+-- instead of scanning reports. Repair drift with reconcile_stats.py.
+CREATE TABLE report_counters (
+    category VARCHAR(50) NOT NULL,
+    status VARCHAR(20) NOT NULL,
+    report_count BIGINT NOT NULL DEFAULT 0,
+    rated_count BIGINT NOT NULL DEFAULT 0,
+    rating_sum BIGINT NOT NULL DEFAULT 0,
+    PRIMARY KEY (category, status)
+);
+
+-- Reports per creator; one row per user with at least one report
+CREATE TABLE reporter_counters (
+    user_id INTEGER PRIMARY KEY,
+    report_count BIGINT NOT NULL DEFAULT 0
+);
+
+CREATE OR REPLACE FUNCTION report_counters_apply(
+    p_category VARCHAR, p_status VARCHAR, p_rating INTEGER,
+    p_created_by INTEGER, p_sign INTEGER
+) RETURNS VOID AS $$
+BEGIN
+    INSERT INTO report_counters AS rc (category, status, report_count, rated_count, rating_sum)
+    VALUES (
+        COALESCE(p_category, 'unknown'),
+        COALESCE(p_status, 'unknown'),
+        p_sign,
+        CASE WHEN p_rating IS NULL THEN 0 ELSE p_sign END,
+        COALESCE(p_rating, 0) * p_sign
+    )
+    ON CONFLICT (category, status) DO UPDATE
+    SET report_count = rc.report_count + EXCLUDED.report_count,
+        rated_count = rc.rated_count + EXCLUDED.rated_count,
+        rating_sum = rc.rating_sum + EXCLUDED.rating_sum;
+
+    IF p_created_by IS NOT NULL THEN
+        INSERT INTO reporter_counters AS uc (user_id, report_count)
+        VALUES (p_created_by, p_sign)
+        ON CONFLICT (user_id) DO UPDATE
+        SET report_count = uc.report_count + EXCLUDED.report_count;
+
+        DELETE FROM reporter_counters
+        WHERE user_id = p_created_by AND report_count <= 0;
+    END IF;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION report_counters_trg() RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP = 'UPDATE'
+       AND OLD.category IS NOT DISTINCT FROM NEW.category
+       AND OLD.status IS NOT DISTINCT FROM NEW.status
+       AND OLD.rating IS NOT DISTINCT FROM NEW.rating
+       AND OLD.created_by IS NOT DISTINCT FROM NEW.created_by THEN
+        RETURN NULL;
+    END IF;
+
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        PERFORM report_counters_apply(OLD.category, OLD.status, OLD.rating, OLD.created_by, -1);
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        PERFORM report_counters_apply(NEW.category, NEW.status, NEW.rating, NEW.created_by, 1);
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER trg_report_counters
+AFTER INSERT OR DELETE OR UPDATE OF category, status, rating, created_by ON reports
+FOR EACH ROW EXECUTE FUNCTION report_counters_trg();
+
+-- Reports created per hour/day bucket by (category, current status), for
+-- trend charts; department is derived from category when querying
+CREATE TABLE report_rollups (
+    granularity VARCHAR(4) NOT NULL CHECK (granularity IN ('hour', 'day')),
+    bucket_start TIMESTAMP NOT NULL,
+    category VARCHAR(50) NOT NULL,
+    status VARCHAR(20) NOT NULL,
+    report_count BIGINT NOT NULL DEFAULT 0,
+    PRIMARY KEY (granularity, bucket_start, category, status)
+);
+
+CREATE OR REPLACE FUNCTION report_rollups_apply(
+    p_created_at TIMESTAMP, p_category VARCHAR, p_status VARCHAR, p_sign INTEGER
+) RETURNS VOID AS $$
+BEGIN
+    IF p_created_at IS NULL THEN
+        RETURN;
+    END IF;
+
+    INSERT INTO report_rollups AS rr (granularity, bucket_start, category, status, report_count)
+    SELECT g, date_trunc(g, p_created_at), COALESCE(p_category, 'unknown'),
+           COALESCE(p_status, 'unknown'), p_sign
+    FROM unnest(ARRAY['hour', 'day']) AS g
+    ON CONFLICT (granularity, bucket_start, category, status) DO UPDATE
+    SET report_count = rr.report_count + EXCLUDED.report_count;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION report_rollups_trg() RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP = 'UPDATE'
+       AND OLD.created_at IS NOT DISTINCT FROM NEW.created_at
+       AND OLD.category IS NOT DISTINCT FROM NEW.category
+       AND OLD.status IS NOT DISTINCT FROM NEW.status THEN
+        RETURN NULL;
+    END IF;
+
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        PERFORM report_rollups_apply(OLD.created_at, OLD.category, OLD.status, -1);
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        PERFORM report_rollups_apply(NEW.created_at, NEW.category, NEW.status, 1);
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER trg_report_rollups
+AFTER INSERT OR DELETE OR UPDATE OF created_at, category, status ON reports
+FOR EACH ROW EXECUTE FUNCTION report_rollups_trg();
+
+CREATE OR REPLACE FUNCTION reports_touch_updated_at() RETURNS TRIGGER AS $$
+BEGIN
+    NEW.updated_at = clock_timestamp();
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER trg_reports_updated_at
+BEFORE UPDATE ON reports
+FOR EACH ROW EXECUTE FUNCTION reports_touch_updated_at();
+
 -- Insert admin codes for user promotion
 INSERT INTO
     admin_codes (code, department)